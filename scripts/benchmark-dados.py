@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos scripts de dados (gerador de mocks, converter-excel-para-json e import-sap-data)
+
+Gera planilhas no formato do rel-SAP.xlsx a partir do GeradorDadosSAP, executa cada
+etapa do pipeline em um processo separado (sem acesso ao SAP) e registra tempo,
+linhas/s e pico de memória em um arquivo JSONL que pode ser comparado entre commits.
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, SCRIPT_DIR)
+
+from silic_dados import EscritorJSONIncremental, Metricas
+
+CACHE_DIR = os.path.join(BASE_DIR, '.cache', 'benchmark')
+
+COLUNAS_SAP = [
+    'Contrato', 'Denominação do contrato', 'Denom.tipo contrato', 'Início do contrato',
+    'Fim da validade', 'Rescisão em', 'Parceiro de negócios', 'Tipo ID Fiscal', 'NºID fiscal',
+    'Nome/ender.', 'Denom.função PN', 'Rua', 'Nº', 'Bairro', 'Local', 'Região', 'Código postal',
+    'Endereço de e-mail', 'Nº telefone', 'Telefone celular', 'Início da relação', 'Fim da relação'
+]
+
+ETAPAS = [
+    'gerador-json', 'gerador-json-lote', 'leitura-xlsx', 'leitura-xlsx-blocos', 'leitura-cache',
+    'converter-colunar', 'converter-por-linha', 'import-sap'
+]
+
+
+def carregar_script(nome):
+    """Importa um dos scripts com hífen no nome (ex.: import-sap-data.py) como módulo"""
+    caminho = os.path.join(SCRIPT_DIR, f"{nome}.py")
+    spec = importlib.util.spec_from_file_location(nome.replace('-', '_'), caminho)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def data_sap(texto):
+    """DD/MM/YYYY -> datetime, como as células de data do relatório SAP"""
+    return datetime.strptime(texto, '%d/%m/%Y') if texto else None
+
+
+def gerar_planilha_sap(caminho, num_linhas, semente):
+    """Gera um xlsx com as colunas do rel-SAP.xlsx a partir dos registros do GeradorDadosSAP"""
+    from openpyxl import Workbook
+
+    random.seed(semente)
+    gerador = carregar_script('gerar-dados-mockados').GeradorDadosSAP()
+
+    workbook = Workbook(write_only=True)
+    aba = workbook.create_sheet()
+    aba.append(COLUNAS_SAP)
+
+    # Só os campos usados nas linhas do SAP, para não manter os locadores inteiros em memória
+    locadores = {}
+    for secao, registro in gerador.gerar_registros(num_linhas):
+        if secao == 'locadores':
+            endereco = registro['endereco']
+            locadores[registro['id']] = (
+                'BR2' if registro['tipoIdFiscal'] == 'CNPJ' else 'CPF',
+                int(registro['numeroIdFiscal']), registro['nomeEndereco'], registro['funcaoPN'],
+                endereco['rua'], endereco['numero'], endereco['bairro'], endereco['cidade'],
+                endereco['regiao'], endereco['cep'], registro['email'],
+                int(registro['telefone']), int(registro['telefoneCelular']),
+                registro['inicioRelacao'], registro['fimRelacao']
+            )
+            continue
+        contrato = registro['contrato']
+        aba.append([
+            contrato['numero'], contrato['denominacao'], contrato['tipoContrato'],
+            data_sap(contrato['inicioContrato']), data_sap(contrato['fimValidade']),
+            data_sap(contrato['rescisaoEm']), contrato['parceiroNegocio'],
+            *locadores[registro['locadorId']]
+        ])
+    workbook.save(caminho)
+
+
+def obter_planilha(num_linhas, semente):
+    """Caminho da planilha sintética, gerada apenas na primeira vez"""
+    caminho = os.path.join(CACHE_DIR, 'dados', f"rel-SAP-{num_linhas}-s{semente}.xlsx")
+    if not os.path.exists(caminho):
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        print(f"🏗️  Gerando planilha sintética com {num_linhas:,} linhas...".replace(',', '.'))
+        temporario = caminho + '.tmp.xlsx'
+        gerar_planilha_sap(temporario, num_linhas, semente)
+        os.replace(temporario, caminho)
+    return caminho
+
+
+def _escrever(registros, saida, metricas):
+    with EscritorJSONIncremental(saida) as escritor:
+        for secao, registro in registros:
+            with metricas.medir('escrita'):
+                escritor.escrever(secao, registro)
+        with metricas.medir('escrita'):
+            escritor.finalizar({})
+    return escritor.contagens['imoveis']
+
+
+def executar_etapa(etapa, planilha, num_linhas, semente, saida):
+    """Executa uma etapa no processo atual e devolve (linhas, resumo das métricas)"""
+    from silic_dados.leitura_xlsx import LeitorPlanilha
+
+    metricas = Metricas()
+    if etapa == 'gerador-json':
+        random.seed(semente)
+        gerador = carregar_script('gerar-dados-mockados').GeradorDadosSAP()
+        registros = metricas.iterar('geracao', gerador.gerar_registros(num_linhas))
+        linhas = _escrever(registros, saida, metricas)
+    elif etapa == 'gerador-json-lote':
+        gerador = carregar_script('gerar-dados-mockados').GeradorDadosSAP()
+        registros = metricas.iterar('geracao', gerador.gerar_registros_em_lote(num_linhas, semente))
+        linhas = _escrever(registros, saida, metricas)
+    elif etapa in ('leitura-xlsx', 'leitura-xlsx-blocos'):
+        with metricas.medir('leitura'):
+            leitor = LeitorPlanilha(planilha, 10000 if etapa == 'leitura-xlsx-blocos' else None)
+            linhas = sum(len(bloco) for bloco in leitor.blocos())
+    elif etapa == 'leitura-cache':
+        from silic_dados.cache_planilha import CachePlanilha
+
+        cache = CachePlanilha(os.path.join(CACHE_DIR, 'planilhas'))
+        # A primeira leitura (fora da medição) garante que a entrada esteja no cache
+        for _ in LeitorPlanilha(planilha, cache=cache).blocos():
+            pass
+        metricas = Metricas()
+        with metricas.medir('leitura'):
+            leitor = LeitorPlanilha(planilha, cache=cache)
+            linhas = sum(len(bloco) for bloco in leitor.blocos())
+    elif etapa in ('converter-colunar', 'converter-por-linha'):
+        converter = carregar_script('converter-excel-para-json')
+        mapear = converter.mapear_colunar if etapa == 'converter-colunar' else converter.mapear_por_linha
+        with metricas.medir('leitura'):
+            leitor = LeitorPlanilha(planilha)
+        blocos = metricas.iterar('leitura', leitor.blocos())
+        linhas = _escrever(metricas.iterar('mapeamento', mapear(blocos, metricas)), saida, metricas)
+    elif etapa == 'import-sap':
+        importador = carregar_script('import-sap-data')
+        # O pipeline já mede cada etapa (leitura, validação, normalização, ..., mapeamento)
+        registros = importador.converter_dados_sap(planilha, metricas=metricas)
+        linhas = _escrever(registros, saida, metricas)
+    else:
+        raise ValueError(f"Etapa desconhecida: {etapa}")
+    return linhas, metricas.resumo()
+
+
+def _executar_isolado(etapa, planilha, num_linhas, semente, saida):
+    """Ponto de entrada no processo filho: mede também o pico de memória (RSS) do processo"""
+    with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+        linhas, resumo = executar_etapa(etapa, planilha, num_linhas, semente, saida)
+    try:
+        import resource
+        pico_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        if sys.platform == 'darwin':  # ru_maxrss em bytes no macOS
+            pico_mb /= 1024
+    except ImportError:
+        pico_mb = None
+    return linhas, resumo, pico_mb
+
+
+def commit_atual():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def carregar_resultados(caminho):
+    if not os.path.exists(caminho):
+        return []
+    with open(caminho, encoding='utf-8') as f:
+        return [json.loads(linha) for linha in f if linha.strip()]
+
+
+def comparar(resultados, commit_base, commit_atual_):
+    """Tabela de linhas/s e pico de memória entre dois commits (último resultado de cada)"""
+    por_chave = {}
+    for r in resultados:
+        por_chave[(r['commit'], r['etapa'], r['linhas'])] = r
+    chaves = sorted({(e, n) for c, e, n in por_chave if c in (commit_base, commit_atual_)},
+                    key=lambda k: (ETAPAS.index(k[0]) if k[0] in ETAPAS else len(ETAPAS), k[1]))
+
+    print(f"{'etapa':<22}{'linhas':>10}{'linhas/s base':>16}{'linhas/s atual':>16}{'Δ':>9}{'pico MB':>17}")
+    for etapa, linhas in chaves:
+        base = por_chave.get((commit_base, etapa, linhas))
+        atual = por_chave.get((commit_atual_, etapa, linhas))
+        taxa_base = f"{base['linhasPorSegundo']:,.0f}" if base else '-'
+        taxa_atual = f"{atual['linhasPorSegundo']:,.0f}" if atual else '-'
+        delta = f"{atual['linhasPorSegundo'] / base['linhasPorSegundo'] - 1:+.0%}" if base and atual else ''
+        pico = ' → '.join(
+            f"{r['picoMemoriaMB']:.0f}" if r and r['picoMemoriaMB'] else '-' for r in (base, atual)
+        )
+        print(f"{etapa:<22}{linhas:>10,}{taxa_base:>16}{taxa_atual:>16}{delta:>9}{pico:>17}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark offline dos scripts de dados do SILIC')
+    parser.add_argument('--tamanhos', default='1000,10000,100000,1000000',
+                        help='Números de linhas separados por vírgula')
+    parser.add_argument('--etapas', default=','.join(ETAPAS),
+                        help=f"Etapas a executar, separadas por vírgula ({', '.join(ETAPAS)})")
+    parser.add_argument('--semente', type=int, default=42, help='Semente dos dados sintéticos')
+    parser.add_argument('--resultados', default=os.path.join(CACHE_DIR, 'resultados.jsonl'),
+                        help='Arquivo JSONL onde os resultados são acrescentados')
+    parser.add_argument('--comparar', nargs='+', metavar='COMMIT',
+                        help='Só compara resultados já gravados: COMMIT_BASE [COMMIT_ATUAL]')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    if args.comparar:
+        commit_base = args.comparar[0]
+        commit_novo = args.comparar[1] if len(args.comparar) > 1 else commit_atual()
+        comparar(carregar_resultados(args.resultados), commit_base, commit_novo)
+        return
+
+    tamanhos = [int(t) for t in args.tamanhos.split(',')]
+    etapas = args.etapas.split(',')
+    commit = commit_atual()
+    saida = os.path.join(CACHE_DIR, 'saida.json')
+    os.makedirs(CACHE_DIR, exist_ok=True)
+
+    print("=" * 70)
+    print(f"⏱️  BENCHMARK DOS SCRIPTS DE DADOS (commit {commit or 'desconhecido'})")
+    print("=" * 70)
+
+    for num_linhas in tamanhos:
+        planilha = obter_planilha(num_linhas, args.semente)
+        for etapa in etapas:
+            # Um processo novo por etapa, para que o pico de memória seja só o dela
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+                inicio = time.perf_counter()
+                linhas, resumo, pico_mb = executor.submit(
+                    _executar_isolado, etapa, planilha, num_linhas, args.semente, saida
+                ).result()
+            duracao = resumo['duracaoTotal']
+            resultado = {
+                'commit': commit,
+                'data': datetime.now().isoformat(),
+                'etapa': etapa,
+                'linhas': num_linhas,
+                'duracao': duracao,
+                'duracaoComProcesso': round(time.perf_counter() - inicio, 6),
+                'linhasPorSegundo': round(linhas / duracao, 1) if duracao else None,
+                'picoMemoriaMB': round(pico_mb, 1) if pico_mb else None,
+                'etapas': resumo['etapas'],
+            }
+            with open(args.resultados, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(resultado, ensure_ascii=False) + '\n')
+            print(f"  • {etapa:<22}{num_linhas:>10,} linhas  {duracao:8.2f}s  "
+                  f"{resultado['linhasPorSegundo'] or 0:>12,.0f} linhas/s  "
+                  f"{resultado['picoMemoriaMB'] or 0:>8.0f} MB")
+
+    if os.path.exists(saida):
+        os.remove(saida)
+    print(f"\n💾 Resultados acrescentados em: {args.resultados}")
+    print("   Compare commits com: --comparar <commit_base> [<commit_atual>]")
+
+
+if __name__ == '__main__':
+    main()
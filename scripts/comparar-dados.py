@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Compara dois snapshots do dados-sap.json e lista os imóveis e locadores inseridos,
+removidos e alterados (com os campos alterados), lendo os dois em streaming
+(ver silic_dados.comparacao)
+
+Exemplos:
+    # O que mudou desde o snapshot guardado antes da importação
+    python3 scripts/comparar-dados.py --anterior /tmp/dados-sap-anterior.json --atual public/dados-sap.json
+
+    # Todas as mudanças em JSON Lines, com o registro completo dos inseridos e removidos
+    python3 scripts/comparar-dados.py --anterior /tmp/dados-sap-anterior.json --saida /tmp/mudancas.jsonl --registros
+"""
+
+import argparse
+from collections import Counter
+
+from silic_dados import Metricas
+from silic_dados.comparacao import ComparacaoSnapshots
+from silic_dados.mesclagem import LogMudancas
+
+ROTULOS = {'imoveis': 'Imóveis', 'locadores': 'Locadores'}
+SIMBOLOS = {'inserido': '+', 'removido': '-', 'atualizado': '~'}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Compara dois snapshots do dados-sap.json')
+    parser.add_argument('--anterior', required=True, help='Snapshot anterior (ex.: cópia feita antes da importação)')
+    parser.add_argument('--atual', default='public/dados-sap.json',
+                        help='Snapshot atual (padrão: public/dados-sap.json)')
+    parser.add_argument('--saida', default=None,
+                        help='Grava todas as mudanças em JSON Lines, no formato do log da mesclagem')
+    parser.add_argument('--registros', action='store_true',
+                        help='Inclui na --saida o registro completo dos inseridos e removidos')
+    parser.add_argument('--limite', type=int, default=20,
+                        help='Máximo de mudanças listadas no terminal (0 para nenhuma; padrão: 20)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    metricas = Metricas()
+    try:
+        with metricas.medir('indexacao'):
+            comparacao = ComparacaoSnapshots(args.anterior, incluir_registros=args.registros)
+        mudancas = comparacao.comparar(args.atual)
+        log = LogMudancas(args.saida) if args.saida else None
+        listadas = []
+        campos_alterados = Counter()
+        outras = []
+        try:
+            for mudanca in metricas.iterar('comparacao', mudancas):
+                if log:
+                    log(mudanca)
+                if mudanca['chave'] is None:
+                    outras.append(mudanca)
+                    continue
+                if len(listadas) < args.limite:
+                    listadas.append(mudanca)
+                if mudanca['acao'] == 'atualizado':
+                    campos_alterados.update(mudanca['campos'].keys())
+        finally:
+            if log:
+                log.fechar()
+    except FileNotFoundError as e:
+        print(f"❌ Erro: Arquivo {e.filename} não encontrado!")
+        return
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+
+    print(f"🔍 {args.anterior} → {args.atual}")
+    for secao, contagem in comparacao.contagens.items():
+        print(f"   • {ROTULOS.get(secao, secao)}: {contagem['inseridos']:,} inseridos, "
+              f"{contagem['atualizados']:,} atualizados, {contagem['removidos']:,} removidos, "
+              f"{contagem['inalterados']:,} inalterados")
+    if campos_alterados:
+        print(f"   • Campos mais alterados: "
+              f"{', '.join(f'{campo} ({n:,})' for campo, n in campos_alterados.most_common(10))}")
+    for mudanca in outras:
+        print(f"   • {mudanca['secao']} alterados: {', '.join(mudanca['campos'])}")
+    if listadas:
+        print()
+        for mudanca in listadas:
+            descricao = mudanca['chave'] or mudanca['secao']
+            if mudanca['acao'] == 'atualizado':
+                descricao += f": {', '.join(mudanca['campos'])}"
+            print(f"   {SIMBOLOS[mudanca['acao']]} {descricao}")
+    if args.saida:
+        print(f"📝 Mudanças: {args.saida}")
+    print()
+    metricas.imprimir()
+
+
+if __name__ == '__main__':
+    main()
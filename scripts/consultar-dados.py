@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Consultas de filtro, agrupamento e contagem sobre o dados-sap.json (ver silic_dados.consulta)
+
+Exemplos:
+    # Contratos que vencem nos próximos 90 dias, por UF
+    python3 scripts/consultar-dados.py --vence-em 90 --agrupar estado
+
+    # Locadores com mais de 3 imóveis
+    python3 scripts/consultar-dados.py --agrupar locadorId --minimo 4
+
+    # Imóveis ativos de SP e RJ por ano de fim da validade
+    python3 scripts/consultar-dados.py --onde estado=SP,RJ --onde status=ativo --agrupar fimValidade:ano
+"""
+
+import argparse
+import json
+from datetime import date, timedelta
+
+from silic_dados import Metricas
+from silic_dados.consulta import CAMPOS, ErroConsulta, Filtro, carregar_tabela
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Consulta o portfólio gravado em dados-sap.json')
+    parser.add_argument('--dados', default='public/dados-sap.json',
+                        help='dados-sap.json (ou <saida>.colunar.json) a consultar')
+    parser.add_argument('--onde', action='append', default=[], metavar='FILTRO',
+                        help='Filtro campo<op>valor, repetível (ex.: estado=SP,RJ  status!=ativo  '
+                             'fimValidade<=+90  fimValidade>=2025-01-01). '
+                             f"Campos: {', '.join(CAMPOS)}")
+    parser.add_argument('--vence-em', type=int, default=None, metavar='DIAS',
+                        help='Atalho para fimValidade entre a data de referência e DIAS dias depois')
+    parser.add_argument('--data-referencia', type=date.fromisoformat, default=None,
+                        help='Data usada em "hoje" e nos deslocamentos +N/-N (AAAA-MM-DD; padrão: hoje)')
+    parser.add_argument('--agrupar', action='append', default=[], metavar='CAMPO',
+                        help='Agrupa a contagem pelo campo, repetível; datas aceitam campo:dia|mes|ano')
+    parser.add_argument('--minimo', type=int, default=1,
+                        help='Só mostra os grupos com pelo menos N imóveis')
+    parser.add_argument('--limite', type=int, default=50,
+                        help='Máximo de grupos exibidos (0 para todos; padrão: 50)')
+    parser.add_argument('--json', action='store_true',
+                        help='Imprime o resultado em JSON, sem tabela nem tempos')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    referencia = args.data_referencia or date.today()
+    metricas = Metricas()
+    try:
+        filtros = [Filtro.interpretar(texto, referencia) for texto in args.onde]
+        if args.vence_em is not None:
+            filtros.append(Filtro('fimValidade', '>=', [referencia]))
+            filtros.append(Filtro('fimValidade', '<=', [referencia + timedelta(days=args.vence_em)]))
+
+        with metricas.medir('leitura'):
+            tabela = carregar_tabela(args.dados)
+        with metricas.medir('consulta'):
+            posicoes = tabela.filtrar(filtros)
+            grupos = tabela.agrupar(posicoes, args.agrupar, args.minimo)
+    except FileNotFoundError:
+        print(f"❌ Erro: Arquivo {args.dados} não encontrado!")
+        return
+    except ErroConsulta as e:
+        print(f"❌ {e}")
+        return
+
+    exibidos = grupos[:args.limite] if args.limite else grupos
+    nomes_agrupados = [campo.partition(':')[0] for campo in args.agrupar]
+    if 'locadorId' in nomes_agrupados:
+        coluna = nomes_agrupados.index('locadorId')
+        nomes = [tabela.locadores.get(chave[coluna]) for chave, _ in exibidos]
+    else:
+        nomes = None
+
+    if args.json:
+        resultado = []
+        for i, (chave, quantidade) in enumerate(exibidos):
+            linha = dict(zip(args.agrupar, chave))
+            if nomes is not None:
+                linha['nomeLocador'] = nomes[i]
+            linha['imoveis'] = quantidade
+            resultado.append(linha)
+        print(json.dumps({
+            'total': tabela.total, 'encontrados': len(posicoes), 'grupos': len(grupos), 'resultado': resultado
+        }, ensure_ascii=False, indent=2))
+        return
+
+    print(f"🔎 {len(posicoes):,} de {tabela.total:,} imóveis atendem aos filtros"
+          + (f" ({', '.join(map(repr, filtros))})" if filtros else ''))
+    if args.agrupar:
+        print(f"📊 {len(grupos):,} grupos" + (f", exibindo {len(exibidos)}" if len(exibidos) < len(grupos) else ''))
+        cabecalho = args.agrupar + (['nome'] if nomes is not None else []) + ['imóveis']
+        linhas = [
+            [('—' if v is None else str(v)) for v in chave]
+            + ([nomes[i] or '—'] if nomes is not None else [])
+            + [f"{quantidade:,}"]
+            for i, (chave, quantidade) in enumerate(exibidos)
+        ]
+        larguras = [max(len(c), *(len(l[j]) for l in linhas)) if linhas else len(c) for j, c in enumerate(cabecalho)]
+        print()
+        print('   ' + '  '.join(c.ljust(w) for c, w in zip(cabecalho, larguras)))
+        for linha in linhas:
+            print('   ' + '  '.join(v.rjust(w) if j == len(linha) - 1 else v.ljust(w)
+                                    for j, (v, w) in enumerate(zip(linha, larguras))))
+    print()
+    metricas.imprimir()
+
+
+if __name__ == '__main__':
+    main()
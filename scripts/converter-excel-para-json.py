@@ -1,182 +1,310 @@
 #!/usr/bin/env python3
 """
-Script para converter planilha Excel (rel-SAP.xlsx) para JSON (dados-sap.json)
+Script para converter planilha Excel (rel-SAP.xlsx) para JSON (dados-sap.json), na estrutura
+REISCNBP + REISBU lida pelo SAPDataLoader (padrão) ou no formato plano próximo das colunas do SAP
 """
 
-import pandas as pd
-import json
-from datetime import datetime
+import argparse
 import os
+import time
 
-def limpar_valor(valor):
-    """Limpa e converte valores, tratando NaN"""
-    if pd.isna(valor):
-        return None
-    if isinstance(valor, (int, float)):
-        return valor
-    return str(valor).strip()
+from silic_dados import (
+    EscritorColunar, EscritorJSONIncremental, EscritorPaginado, EscritorSQLite, IndiceDados, IndiceVencimentos,
+    Metricas, RelatorioProgresso
+)
+from silic_dados.cache_planilha import DIRETORIO_PADRAO, LIMITE_PADRAO_MB, CachePlanilha
+from silic_dados.contexto import ContextoExecucao, data_execucao
+from silic_dados.datas import NormalizadorDatas, descrever_invalidas
+from silic_dados.denominacao import descrever_cache, estatisticas_cache, interpretar_denominacao, registrar_cache
+from silic_dados.locadores import CAMINHO_MAPA_PADRAO, DeduplicadorLocadores
+from silic_dados.mapeamento import determinar_status_edificio, mapear_planilha, mapear_sap, metadados_reis
+from silic_dados.paginacao import AGRUPAMENTOS
+from silic_dados.pipeline import deduplicar, gravar, limpar_valor, normalizar, pipeline_sap
+from silic_dados.validacao import ErroValidacao, ValidadorPlanilha, descrever_rejeitadas
 
-def converter_data(data_str):
-    """Converte string de data para formato ISO"""
-    if pd.isna(data_str) or data_str is None:
-        return None
-    
-    try:
-        # Tenta diferentes formatos de data
-        if isinstance(data_str, datetime):
-            return data_str.isoformat()
-        
-        # Tenta converter string
-        data_str = str(data_str).strip()
-        
-        # Formato DD/MM/YYYY
-        if '/' in data_str:
-            partes = data_str.split('/')
-            if len(partes) == 3:
-                dia, mes, ano = partes
-                return f"{ano}-{mes.zfill(2)}-{dia.zfill(2)}"
-        
-        return data_str
-    except:
+
+def mapear_por_linha(blocos, metricas=None, contexto=None, locadores=None):
+    """Caminho de referência: processa linha a linha com df.iterrows(), gerando (seção, registro)"""
+    metricas = metricas if metricas is not None else Metricas()
+    contexto = contexto if contexto is not None else ContextoExecucao()
+    locadores = locadores if locadores is not None else DeduplicadorLocadores()
+    cache_antes = estatisticas_cache()
+    datas = NormalizadorDatas()
+
+    # Processar cada linha
+    for idx, row in (item for df in blocos for item in df.iterrows()):
+        # Gerar ID único para o imóvel
+        imovel_id = f"imovel_{str(idx + 1).zfill(6)}"
+
+        # Processar locador - mapeamento das colunas SAP
+        nome_locador = limpar_valor(row.get('Nome/ender.', ''))
+        cpf_cnpj = limpar_valor(row.get('NºID fiscal', ''))
+        tipo_id = limpar_valor(row.get('Tipo ID Fiscal', ''))
+
+        # Criar ou encontrar locador (ID estável pelo CPF/CNPJ ou, sem ele, pelo nome)
+        locador_obj_id, novo = locadores.identificar(cpf_cnpj, nome_locador)
+
+        if novo:
+            # Determinar tipo de pessoa baseado no Tipo ID Fiscal
+            tipo_pessoa = 'juridica' if tipo_id and 'BR2' in str(tipo_id) else 'fisica'
+
+            locador = {
+                "id": locador_obj_id,
+                "nome": nome_locador,
+                "tipo": tipo_pessoa,
+                "tipoIdFiscal": tipo_id,
+                "documento": cpf_cnpj,
+                "email": limpar_valor(row.get('Endereço de e-mail', None)),
+                "telefone": limpar_valor(row.get('Nº telefone', None)),
+                "telefoneCelular": limpar_valor(row.get('Telefone celular', None)),
+                "endereco": {
+                    "logradouro": limpar_valor(row.get('Rua', '')),
+                    "numero": limpar_valor(row.get('Nº', '')),
+                    "bairro": limpar_valor(row.get('Bairro', '')),
+                    "cidade": limpar_valor(row.get('Local', '')),
+                    "estado": limpar_valor(row.get('Região', '')),
+                    "cep": limpar_valor(row.get('Código postal', ''))
+                },
+                "funcao": limpar_valor(row.get('Denom.função PN', '')),
+                "parceiroNegocio": limpar_valor(row.get('Parceiro de negócios', '')),
+                "inicioRelacao": datas.normalizar(row.get('Início da relação'), 'Início da relação'),
+                "fimRelacao": datas.normalizar(row.get('Fim da relação'), 'Fim da relação'),
+                "status": "ativo",
+                "dataRegistro": contexto.carimbo
+            }
+
+            yield 'locadores', locador
+        elif locador_obj_id:
+            metricas.contar('locadoresDeduplicados')
+
+        # Processar imóvel - mapeamento das colunas SAP
+        codigo_contrato = limpar_valor(row.get('Contrato', ''))
+        denominacao = limpar_valor(row.get('Denominação do contrato', ''))
+        tipo_contrato_denom = limpar_valor(row.get('Denom.tipo contrato', ''))
+
+        # Extrair local, cidade e estado da denominação (ex.: CT - AG CIDADE, UF)
+        partes = interpretar_denominacao(denominacao)
+        fim_validade = datas.normalizar(row.get('Fim da validade'), 'Fim da validade')
+        rescisao = datas.normalizar(row.get('Rescisão em'), 'Rescisão em')
+
+        imovel = {
+            "id": imovel_id,
+            "codigo": codigo_contrato,
+            "denominacao": denominacao,
+            "tipoContrato": tipo_contrato_denom or 'Contrato de Locação - Imóveis',
+            "local": partes.local,
+            "cidade": partes.cidade,
+            "estado": partes.uf,
+            "endereco": limpar_valor(row.get('Rua', '')),
+            "numero": limpar_valor(row.get('Nº', '')),
+            "bairro": limpar_valor(row.get('Bairro', '')),
+            "cep": limpar_valor(row.get('Código postal', '')),
+            "utilizacaoPrincipal": "Próprio",  # Pode ser ajustado conforme regra de negócio
+            "status": determinar_status_edificio({'Rescisão em': rescisao, 'Fim da validade': fim_validade}, contexto),
+            "inicioValidade": datas.normalizar(row.get('Início do contrato'), 'Início do contrato'),
+            "objetoValidoAte": fim_validade,
+            "rescisaoEm": rescisao,
+            "parceiroNegocio": limpar_valor(row.get('Parceiro de negócios', '')),
+            "inscricaoIPTU": None,
+            "numeroITR": None,
+            "area": None,
+            "valorAluguel": None,
+            "locadorId": locador_obj_id,
+            "dataRegistro": contexto.carimbo
+        }
+
+        yield 'imoveis', imovel
+    registrar_cache(metricas, cache_antes)
+    datas.registrar(metricas)
+
+def mapear_colunar(blocos, metricas=None, contexto=None, locadores=None):
+    """
+    Caminho colunar: as etapas de normalização, deduplicação e mapeamento do pipeline
+    (silic_dados.pipeline) sobre blocos já lidos. Produz exatamente a mesma saída de
+    mapear_por_linha. O deduplicador de locadores é mantido entre os blocos.
+    """
+    metricas = metricas if metricas is not None else Metricas()
+    return mapear_planilha(deduplicar(normalizar(blocos, metricas), locadores), metricas, contexto)
+
+def criar_cache(args):
+    """CachePlanilha configurado pelos argumentos, ou None com --sem-cache"""
+    if args.sem_cache:
         return None
+    return CachePlanilha(args.diretorio_cache, args.limite_cache_mb, atualizar=args.atualizar_cache)
 
-def main():
-    # Caminhos
+def parse_args():
+    parser = argparse.ArgumentParser(description='Converte rel-SAP.xlsx para dados-sap.json')
     base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    excel_path = os.path.join(base_dir, 'public', 'rel-SAP.xlsx')
-    json_path = os.path.join(base_dir, 'public', 'dados-sap.json')
+    parser.add_argument('--entrada', default=os.path.join(base_dir, 'public', 'rel-SAP.xlsx'),
+                        help='Planilha SAP de entrada')
+    parser.add_argument('--saida', default=os.path.join(base_dir, 'public', 'dados-sap.json'),
+                        help='Arquivo JSON de saída')
+    parser.add_argument('--formato', choices=('reis', 'planilha'), default='reis',
+                        help='Estrutura dos registros: reis (REISCNBP + REISBU, lida pelo SAPDataLoader) '
+                             'ou planilha (formato plano, próximo das colunas do SAP) (padrão: reis)')
+    parser.add_argument('--por-linha', action='store_true',
+                        help='Usa o caminho de referência linha a linha (df.iterrows); só com --formato planilha')
+    parser.add_argument('--compacto', action='store_true',
+                        help='Grava o JSON sem indentação (produção)')
+    parser.add_argument('--tamanho-bloco', type=int, default=None,
+                        help='Lê o xlsx em blocos de N linhas, sem carregar a aba inteira')
+    parser.add_argument('--limite-memoria-mb', type=float, default=None,
+                        help='Reduz o tamanho do bloco para que cada bloco caiba neste limite')
+    parser.add_argument('--sem-validacao', action='store_true',
+                        help='Não valida as linhas (CPF/CNPJ, CEP, UF, datas) nem grava <saida>.rejeitados.csv')
+    parser.add_argument('--sem-cache', action='store_true',
+                        help='Lê sempre o xlsx, sem usar nem gravar o cache da planilha interpretada')
+    parser.add_argument('--atualizar-cache', action='store_true',
+                        help='Relê o xlsx mesmo que ele esteja no cache e regrava a entrada')
+    parser.add_argument('--diretorio-cache', default=DIRETORIO_PADRAO,
+                        help=f'Onde guardar as planilhas interpretadas (padrão: {DIRETORIO_PADRAO})')
+    parser.add_argument('--limite-cache-mb', type=float, default=LIMITE_PADRAO_MB,
+                        help=f'Tamanho máximo do diretório do cache; as entradas mais antigas são apagadas '
+                             f'(padrão: {LIMITE_PADRAO_MB})')
+    parser.add_argument('--silencioso', action='store_true',
+                        help='Não exibe o progresso durante a conversão')
+    parser.add_argument('--sem-indice', action='store_true',
+                        help='Não grava o índice auxiliar (<saida>.indice.json) usado pelo front-end')
+    parser.add_argument('--sem-vencimentos', action='store_true',
+                        help='Não grava a linha do tempo de vencimentos (<saida>.vencimentos.json) '
+                             'usada pelo relatorio-vencimentos')
+    parser.add_argument('--paginar', type=int, default=None, metavar='N',
+                        help='Também grava páginas de N registros em <saida>/ e o manifesto <saida>.manifesto.json')
+    parser.add_argument('--paginar-por', choices=AGRUPAMENTOS, default='registros',
+                        help='Agrupa as páginas de imóveis só por quantidade ou por estado (padrão: registros)')
+    parser.add_argument('--colunar', action='store_true',
+                        help='Também grava <saida>.colunar.json, formato colunar compacto (ver silic_dados.colunar)')
+    parser.add_argument('--sqlite', action='store_true',
+                        help='Também grava o banco SQLite (ex.: public/dados-sap.sqlite) com as tabelas contrato, edificio '
+                             'e locador (ver silic_dados.banco)')
+    parser.add_argument('--data-execucao', type=data_execucao, default=None,
+                        help='Instante gravado em dataRegistro/dataImportacao (ISO; padrão: agora), '
+                             'para gerar o mesmo JSON em execuções repetidas')
+    parser.add_argument('--mapa-locadores', default=CAMINHO_MAPA_PADRAO,
+                        help='Mapa documento/nome -> ID dos locadores mantido entre execuções '
+                             f'(padrão: {CAMINHO_MAPA_PADRAO})')
+    parser.add_argument('--sem-mapa-locadores', action='store_true',
+                        help='Não lê nem grava o mapa de IDs dos locadores')
+    parser.add_argument('--resumo-json', default=None,
+                        help='Grava em JSON o tempo por etapa e os contadores da execução')
+    args = parser.parse_args()
+    if args.por_linha and args.formato != 'planilha':
+        parser.error('--por-linha só se aplica a --formato planilha')
+    if args.sqlite and args.formato != 'reis':
+        parser.error('--sqlite só se aplica a --formato reis')
+    return args
+
+def main():
+    args = parse_args()
+    excel_path = args.entrada
+    json_path = args.saida
     
     print(f"📂 Lendo planilha: {excel_path}")
     
     try:
-        # Ler a planilha Excel
-        df = pd.read_excel(excel_path, sheet_name=0)
-        
-        print(f"✅ Planilha lida com sucesso!")
-        print(f"📊 Total de linhas: {len(df)}")
-        print(f"📋 Colunas encontradas: {', '.join(df.columns.tolist())}")
-        
-        # Estrutura de dados
-        dados = {
-            "imoveis": [],
-            "locadores": [],
-            "metadados": {
-                "dataImportacao": datetime.now().isoformat(),
-                "fonte": "rel-SAP.xlsx",
-                "totalRegistros": len(df)
-            }
-        }
+        # Montar o pipeline: leitura → validação → normalização → deduplicação → mapeamento
+        metricas = Metricas()
+        contexto = ContextoExecucao(args.data_execucao)
+        locadores = DeduplicadorLocadores(None if args.sem_mapa_locadores else args.mapa_locadores)
+        validador = None if args.sem_validacao else ValidadorPlanilha(planilha=excel_path)
+        if args.formato == 'reis':
+            mapear = lambda lotes: mapear_sap(lotes, 'reis', metricas, contexto)
+        elif args.por_linha:
+            mapear = lambda blocos: mapear_por_linha(blocos, metricas, contexto, locadores)
+        else:
+            mapear = lambda lotes: mapear_planilha(lotes, metricas, contexto)
+        leitor, pipeline = pipeline_sap(
+            excel_path, mapear, metricas, args.tamanho_bloco, args.limite_memoria_mb, criar_cache(args),
+            validador, locadores, por_lote=not args.por_linha
+        )
         
-        # Mapear locadores únicos
-        locadores_map = {}
-        locador_id = 1
+        if leitor.do_cache:
+            print("♻️  Planilha inalterada desde a última leitura: usando o cache")
+        else:
+            print(f"✅ Planilha {'aberta para leitura em blocos' if args.tamanho_bloco else 'lida com sucesso'}!")
+        print(f"📊 Total de linhas: {leitor.total_estimado}")
+        print(f"📋 Colunas encontradas: {', '.join(leitor.colunas)}")
         
-        # Processar cada linha
-        for idx, row in df.iterrows():
-            # Gerar ID único para o imóvel
-            imovel_id = f"imovel_{str(idx + 1).zfill(6)}"
-            
-            # Processar locador - mapeamento das colunas SAP
-            nome_locador = limpar_valor(row.get('Nome/ender.', ''))
-            cpf_cnpj = limpar_valor(row.get('NºID fiscal', ''))
-            tipo_id = limpar_valor(row.get('Tipo ID Fiscal', ''))
-            
-            # Criar ou encontrar locador
-            chave_locador = f"{nome_locador}_{cpf_cnpj}"
-            
-            if chave_locador not in locadores_map and nome_locador:
-                locador_obj_id = f"locador_{str(locador_id).zfill(6)}"
-                
-                # Determinar tipo de pessoa baseado no Tipo ID Fiscal
-                tipo_pessoa = 'juridica' if tipo_id and 'BR2' in str(tipo_id) else 'fisica'
-                
-                locador = {
-                    "id": locador_obj_id,
-                    "nome": nome_locador,
-                    "tipo": tipo_pessoa,
-                    "tipoIdFiscal": tipo_id,
-                    "documento": cpf_cnpj,
-                    "email": limpar_valor(row.get('Endereço de e-mail', None)),
-                    "telefone": limpar_valor(row.get('Nº telefone', None)),
-                    "telefoneCelular": limpar_valor(row.get('Telefone celular', None)),
-                    "endereco": {
-                        "logradouro": limpar_valor(row.get('Rua', '')),
-                        "numero": limpar_valor(row.get('Nº', '')),
-                        "bairro": limpar_valor(row.get('Bairro', '')),
-                        "cidade": limpar_valor(row.get('Local', '')),
-                        "estado": limpar_valor(row.get('Região', '')),
-                        "cep": limpar_valor(row.get('Código postal', ''))
-                    },
-                    "funcao": limpar_valor(row.get('Denom.função PN', '')),
-                    "parceiroNegocio": limpar_valor(row.get('Parceiro de negócios', '')),
-                    "inicioRelacao": converter_data(row.get('Início da relação', None)),
-                    "fimRelacao": converter_data(row.get('Fim da relação', None)),
-                    "status": "ativo",
-                    "dataRegistro": datetime.now().isoformat()
-                }
-                
-                dados["locadores"].append(locador)
-                locadores_map[chave_locador] = locador_obj_id
-                locador_id += 1
-            
-            # Processar imóvel - mapeamento das colunas SAP
-            codigo_contrato = limpar_valor(row.get('Contrato', ''))
-            denominacao = limpar_valor(row.get('Denominação do contrato', ''))
-            tipo_contrato_denom = limpar_valor(row.get('Denom.tipo contrato', ''))
-            
-            # Extrair cidade e estado da denominação (formato: CT - AG CIDADE, UF)
-            cidade = ''
-            estado = ''
-            if denominacao:
-                partes = denominacao.split(',')
-                if len(partes) >= 2:
-                    estado = partes[-1].strip()
-                    cidade_parte = partes[-2].split('-')[-1].strip() if '-' in partes[-2] else partes[-2].strip()
-                    # Remover "AG " se existir
-                    cidade = cidade_parte.replace('AG ', '').strip()
-            
-            imovel = {
-                "id": imovel_id,
-                "codigo": codigo_contrato,
-                "denominacao": denominacao,
-                "tipoContrato": tipo_contrato_denom or 'Contrato de Locação - Imóveis',
-                "local": cidade,
-                "cidade": cidade,
-                "estado": estado,
-                "endereco": limpar_valor(row.get('Rua', '')),
-                "numero": limpar_valor(row.get('Nº', '')),
-                "bairro": limpar_valor(row.get('Bairro', '')),
-                "cep": limpar_valor(row.get('Código postal', '')),
-                "utilizacaoPrincipal": "Próprio",  # Pode ser ajustado conforme regra de negócio
-                "status": "Ativo",  # Pode ser derivado das datas de validade
-                "inicioValidade": converter_data(row.get('Início do contrato', None)),
-                "objetoValidoAte": converter_data(row.get('Fim da validade', None)),
-                "rescisaoEm": converter_data(row.get('Rescisão em', None)),
-                "parceiroNegocio": limpar_valor(row.get('Parceiro de negócios', '')),
-                "inscricaoIPTU": None,
-                "numeroITR": None,
-                "area": None,
-                "valorAluguel": None,
-                "locadorId": locadores_map.get(chave_locador, None) if nome_locador else None,
-                "dataRegistro": datetime.now().isoformat()
-            }
-            
-            dados["imoveis"].append(imovel)
-        
-        # Salvar JSON
+        # Processar linhas, gravando cada registro assim que é produzido
         print(f"\n💾 Salvando JSON: {json_path}")
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(dados, f, ensure_ascii=False, indent=2)
+        inicio = time.perf_counter()
+        progresso = RelatorioProgresso(total=leitor.total_estimado, metricas=metricas, ativo=not args.silencioso)
+        indice = None if args.sem_indice else IndiceDados()
+        paginas = EscritorPaginado(json_path, args.paginar, args.paginar_por) if args.paginar else None
+        colunar = EscritorColunar(json_path) if args.colunar else None
+        vencimentos = None if args.sem_vencimentos else IndiceVencimentos(json_path)
+        banco = EscritorSQLite(json_path) if args.sqlite else None
+
+        def ao_gravar(secao, registro):
+            if secao == 'imoveis':
+                progresso.avancar()
+
+        with EscritorJSONIncremental(json_path, compacto=args.compacto, indice=indice,
+                                     paginas=paginas, colunar=colunar,
+                                     vencimentos=vencimentos, banco=banco) as escritor:
+            gravar(pipeline.executar(), escritor, metricas, ao_gravar)
+            progresso.concluir()
+            if args.formato == 'reis':
+                metadados = metadados_reis(contexto.carimbo, f"SAP - {os.path.basename(excel_path)}",
+                                           escritor.contagens['imoveis'], escritor.contagens['locadores'])
+            else:
+                metadados = {
+                    "dataImportacao": contexto.carimbo,
+                    "fonte": "rel-SAP.xlsx",
+                    "totalRegistros": leitor.linhas_lidas
+                }
+            with metricas.medir('escrita'):
+                escritor.finalizar(metadados)
+        duracao = time.perf_counter() - inicio
+        mapa_locadores = locadores.salvar()
+        rejeitados = None
+        if validador is not None:
+            rejeitados = validador.gravar(json_path)
+            validador.registrar(metricas)
+        metricas.contar('imoveis', escritor.contagens['imoveis'])
+        metricas.contar('locadores', escritor.contagens['locadores'])
         
         print(f"\n✅ Conversão concluída com sucesso!")
         print(f"📊 Resumo:")
-        print(f"   - Imóveis: {len(dados['imoveis'])}")
-        print(f"   - Locadores: {len(dados['locadores'])}")
+        print(f"   - Imóveis: {escritor.contagens['imoveis']}")
+        print(f"   - Locadores: {escritor.contagens['locadores']}")
+        print(f"   - Mapeamento e escrita ({args.formato}, {'linha a linha' if args.por_linha else 'por lote'}): "
+              f"{duracao:.2f}s ({leitor.linhas_lidas / duracao if duracao else 0:,.0f} linhas/s)")
         print(f"   - Arquivo gerado: {json_path}")
+        if escritor.caminho_indice:
+            print(f"   - Índice: {escritor.caminho_indice}")
+        if escritor.caminho_manifesto:
+            print(f"   - Manifesto das páginas: {escritor.caminho_manifesto}")
+        if escritor.caminho_colunar:
+            print(f"   - Formato colunar: {escritor.caminho_colunar}")
+        if escritor.caminho_vencimentos:
+            print(f"   - Linha do tempo de vencimentos: {escritor.caminho_vencimentos}")
+        if escritor.caminho_banco:
+            print(f"   - Banco SQLite: {escritor.caminho_banco}")
+        if mapa_locadores:
+            print(f"   - Mapa de IDs dos locadores: {mapa_locadores}")
+        if rejeitados:
+            print(f"   🚫 Linhas rejeitadas na validação: {validador.total_rejeitadas} (ver {rejeitados})")
+            for linha in descrever_rejeitadas(metricas.contadores):
+                print(f"      • {linha}")
+        cache = descrever_cache(metricas.contadores)
+        if cache:
+            print(f"   - Cache de denominações: {cache}")
+        invalidas = metricas.contadores.get('datasInvalidas')
+        if invalidas:
+            print(f"   ⚠️  Datas não reconhecidas (gravadas como null): {invalidas}")
+            for linha in descrever_invalidas(metricas.contadores):
+                print(f"      • {linha}")
+        metricas.imprimir()
+        if args.resumo_json:
+            metricas.salvar(args.resumo_json)
+            print(f"   • Resumo em JSON: {args.resumo_json}")
         
     except FileNotFoundError:
         print(f"❌ Erro: Arquivo não encontrado: {excel_path}")
         print(f"   Certifique-se de que o arquivo rel-SAP.xlsx está na pasta public/")
+    except ErroValidacao as e:
+        print(f"❌ {e}")
     except Exception as e:
         print(f"❌ Erro ao processar arquivo: {str(e)}")
         import traceback
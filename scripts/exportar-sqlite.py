@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Reexporta o dados-sap.json (e seus arquivos auxiliares) a partir do banco SQLite
+gravado com --sqlite pelos importadores ou pelo gerador de mocks (ver silic_dados.banco)
+
+Exemplo:
+    python3 scripts/exportar-sqlite.py --banco public/dados-sap.sqlite --saida public/dados-sap.json
+"""
+
+import argparse
+
+from silic_dados import EscritorColunar, EscritorJSONIncremental, IndiceDados, IndiceVencimentos, Metricas
+from silic_dados.banco import conectar, iterar_banco, ler_metadados
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Reexporta o dados-sap.json a partir do banco SQLite')
+    parser.add_argument('--banco', default='public/dados-sap.sqlite', help='Banco SQLite de entrada')
+    parser.add_argument('--saida', default='public/dados-sap.json', help='Arquivo JSON de saída')
+    parser.add_argument('--compacto', action='store_true',
+                        help='Grava o JSON sem indentação (produção)')
+    parser.add_argument('--sem-indice', action='store_true',
+                        help='Não grava o índice auxiliar (<saida>.indice.json) usado pelo front-end')
+    parser.add_argument('--sem-vencimentos', action='store_true',
+                        help='Não grava a linha do tempo de vencimentos (<saida>.vencimentos.json) '
+                             'usada pelo relatorio-vencimentos')
+    parser.add_argument('--colunar', action='store_true',
+                        help='Também grava <saida>.colunar.json, formato colunar compacto (ver silic_dados.colunar)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    metricas = Metricas()
+    try:
+        conexao = conectar(args.banco)
+    except FileNotFoundError:
+        print(f"❌ Erro: Banco {args.banco} não encontrado!")
+        return
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+
+    print(f"🗄️  Lendo banco: {args.banco}")
+    indice = None if args.sem_indice else IndiceDados()
+    vencimentos = None if args.sem_vencimentos else IndiceVencimentos(args.saida)
+    colunar = EscritorColunar(args.saida) if args.colunar else None
+    try:
+        with EscritorJSONIncremental(args.saida, compacto=args.compacto, indice=indice, colunar=colunar,
+                                     vencimentos=vencimentos) as escritor:
+            for secao, registro in metricas.iterar('leitura', iterar_banco(conexao)):
+                with metricas.medir('escrita'):
+                    escritor.escrever(secao, registro)
+            with metricas.medir('escrita'):
+                escritor.finalizar(ler_metadados(conexao))
+    finally:
+        conexao.close()
+
+    print(f"✅ Arquivo salvo: {args.saida}")
+    print(f"   • Imóveis: {escritor.contagens['imoveis']:,}")
+    print(f"   • Locadores: {escritor.contagens['locadores']:,}")
+    for rotulo, caminho in (('Índice', escritor.caminho_indice), ('Formato colunar', escritor.caminho_colunar),
+                            ('Linha do tempo de vencimentos', escritor.caminho_vencimentos)):
+        if caminho:
+            print(f"   • {rotulo}: {caminho}")
+    print()
+    metricas.imprimir()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,25 @@
 #!/usr/bin/env python3
 """
 Gerador de dados mockados realistas para o protótipo SILIC
-Gera 100 imóveis com dados completos baseados na estrutura SAP
+Gera imóveis (100 por padrão) com dados completos baseados na estrutura SAP
 """
 
-import json
+import argparse
+import contextlib
+import os
 import random
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from silic_dados import (
+    EscritorColunar, EscritorFragmentos, EscritorJSONIncremental, EscritorPaginado, EscritorSQLite, IndiceDados,
+    Metricas, RelatorioProgresso, caminho_banco, caminho_colunar, caminho_indice, caminho_manifesto
+)
+from silic_dados.mapeamento import status_por_edificio, tipo_por_edificio
+from silic_dados.paginacao import AGRUPAMENTOS
 
 class GeradorDadosSAP:
     def __init__(self):
@@ -126,6 +138,30 @@ class GeradorDadosSAP:
         self.denominacoes_imovel = ['Imóvel Foreiro', 'Imóvel Próprio', 'Imóvel Alugado', 'Imóvel Cedido']
         
         self.estado_conservacao = ['Ótimo', 'Bom', 'Regular', 'Necessita Reforma']
+        
+        self.prefixos_cep = {
+            'AL': '570', 'PE': '500', 'BA': '400', 'CE': '600',
+            'SP': '011', 'RJ': '200', 'MG': '300', 'ES': '290',
+            'RN': '590', 'PB': '580', 'SE': '490', 'PI': '640',
+            'MA': '650', 'PR': '800', 'RS': '900', 'SC': '880',
+            'GO': '720', 'DF': '700', 'MS': '790', 'MT': '780'
+        }
+        
+        self.ddds = {
+            'AL': '82', 'PE': '81', 'BA': '71', 'CE': '85',
+            'SP': '11', 'RJ': '21', 'MG': '31', 'ES': '27',
+            'RN': '84', 'PB': '83', 'SE': '79', 'PI': '86',
+            'MA': '98', 'PR': '41', 'RS': '51', 'SC': '48',
+            'GO': '62', 'DF': '61', 'MS': '67', 'MT': '65'
+        }
+        
+        self.dominios_email = ['gmail.com', 'hotmail.com', 'yahoo.com.br', 'outlook.com', 'caixa.com.br']
+        
+        self.nomes_edificios = [
+            'PRAÇA DA REPÚBLICA', 'ELUMA 7º ANDAR',
+            'ELUMA - GIRET E GILOG 6 ANDAR A/B',
+            'CORPORATE CENTER', 'BUSINESS TOWER'
+        ]
 
     def gerar_cpf(self) -> str:
         """Gera um CPF fictício (apenas para demonstração)"""
@@ -137,27 +173,13 @@ class GeradorDadosSAP:
     
     def gerar_cep(self, cidade: str, uf: str) -> str:
         """Gera CEP baseado na região"""
-        prefixos = {
-            'AL': '570', 'PE': '500', 'BA': '400', 'CE': '600',
-            'SP': '011', 'RJ': '200', 'MG': '300', 'ES': '290',
-            'RN': '590', 'PB': '580', 'SE': '490', 'PI': '640',
-            'MA': '650', 'PR': '800', 'RS': '900', 'SC': '880',
-            'GO': '720', 'DF': '700', 'MS': '790', 'MT': '780'
-        }
-        prefixo = prefixos.get(uf, '000')
+        prefixo = self.prefixos_cep.get(uf, '000')
         sufixo = ''.join([str(random.randint(0, 9)) for _ in range(5)])
         return f"{prefixo}{sufixo[:2]}-{sufixo[2:]}"
     
     def gerar_telefone(self, uf: str, celular: bool = False) -> str:
         """Gera telefone com DDD correto"""
-        ddds = {
-            'AL': '82', 'PE': '81', 'BA': '71', 'CE': '85',
-            'SP': '11', 'RJ': '21', 'MG': '31', 'ES': '27',
-            'RN': '84', 'PB': '83', 'SE': '79', 'PI': '86',
-            'MA': '98', 'PR': '41', 'RS': '51', 'SC': '48',
-            'GO': '62', 'DF': '61', 'MS': '67', 'MT': '65'
-        }
-        ddd = ddds.get(uf, '11')
+        ddd = self.ddds.get(uf, '11')
         primeiro = '9' if celular else random.choice(['3', '2'])
         numero = ''.join([str(random.randint(0, 9)) for _ in range(8)])
         return f"55{ddd}{primeiro}{numero}"
@@ -165,8 +187,7 @@ class GeradorDadosSAP:
     def gerar_email(self, nome: str) -> str:
         """Gera email baseado no nome"""
         nome_limpo = nome.lower().replace(' ', '.').split('/')[0].strip()
-        dominios = ['gmail.com', 'hotmail.com', 'yahoo.com.br', 'outlook.com', 'caixa.com.br']
-        return f"{nome_limpo[:30]}@{random.choice(dominios)}"
+        return f"{nome_limpo[:30]}@{random.choice(self.dominios_email)}"
     
     def gerar_data(self, inicio: str, fim: str) -> str:
         """Gera data aleatória entre duas datas"""
@@ -222,82 +243,58 @@ class GeradorDadosSAP:
     
     def gerar_denominacao_contrato(self, cidade: str, uf: str) -> str:
         """Gera denominação do contrato seguindo padrões reais do banco de dados"""
+        return self.montar_denominacao_contrato(
+            cidade, uf, random.random(), random.randrange(len(self.nomes_locais)),
+            random.randint(939, 9999), random.randint(1000, 9999),
+            random.randrange(len(self.nomes_edificios)), random.random(), random.randrange(3),
+            random.random()
+        )
+    
+    def montar_denominacao_contrato(self, cidade: str, uf: str, rand: float, i_local: int,
+                                    num1: int, num2: int, i_edificio: int, sorteio: float,
+                                    i_instalacao: int, sorteio_formato: float) -> str:
+        """Monta a denominação a partir de valores já sorteados (usado também pelo modo em lote)"""
         # Distribuição de probabilidades baseada em amostra real
-        rand = random.random()
+        local = self.nomes_locais[i_local]
+        especifico = '{}' not in local
+        if not especifico:
+            local = local.format(cidade.split()[0].upper())
         
         if rand < 0.01:  # 1% - SIPAT
-            num1 = random.randint(939, 9999)
-            num2 = random.randint(1000, 9999)
             return f"SIPAT {num1} {num2} Contrato pág. GELOG"
         
         elif rand < 0.03:  # 2% - CONTRATO AG.
-            local = random.choice(self.nomes_locais)
-            if '{}' in local:
-                nome_cidade = cidade.split()[0].upper()
-                local = local.format(nome_cidade)
             return f"CONTRATO AG. {local}"
         
         elif rand < 0.08:  # 5% - CT - EDIFÍCIO
-            nomes_edificios = [
-                'PRAÇA DA REPÚBLICA', 'ELUMA 7º ANDAR', 
-                'ELUMA - GIRET E GILOG 6 ANDAR A/B',
-                'CORPORATE CENTER', 'BUSINESS TOWER'
-            ]
-            edificio = random.choice(nomes_edificios)
-            return f"CT - EDIFÍCIO {edificio}, {uf}"
+            return f"CT - EDIFÍCIO {self.nomes_edificios[i_edificio]}, {uf}"
         
         elif rand < 0.12:  # 4% - CT - AGÊNCIA (escrito por extenso)
-            local = random.choice(self.nomes_locais)
-            if '{}' in local:
-                nome_cidade = cidade.split()[0].upper()
-                local = local.format(nome_cidade)
             return f"CT - AGÊNCIA {local}, {uf}"
         
         elif rand < 0.15:  # 3% - CT - PAE
-            local = random.choice(self.nomes_locais)
-            if '{}' in local:
-                nome_cidade = cidade.split()[0].upper()
-                local = local.format(nome_cidade)
             return f"CT - PAE {local}, {uf}"
         
         elif rand < 0.20:  # 5% - CT - PAB
-            local = random.choice(self.nomes_locais)
-            if '{}' in local:
-                nome_cidade = cidade.split()[0].upper()
-                local = local.format(nome_cidade)
-            else:
-                # Para PAB, muitas vezes é "JUSTIÇA FEDERAL DE"
-                if random.random() < 0.5:
-                    return f"CT - PAB JUSTIÇA FEDERAL DE {cidade.upper()}, {uf}"
+            # Para PAB, muitas vezes é "JUSTIÇA FEDERAL DE"
+            if especifico and sorteio < 0.5:
+                return f"CT - PAB JUSTIÇA FEDERAL DE {cidade.upper()}, {uf}"
             return f"CT - PAB {local}, {uf}"
         
         elif rand < 0.30:  # 10% - CT - PA
-            local = random.choice(self.nomes_locais)
-            if '{}' in local:
-                nome_cidade = cidade.split()[0].upper()
-                local = local.format(nome_cidade)
-            else:
-                # Para PA, algumas vezes é instalação militar ou universidade
-                if random.random() < 0.3:
-                    instalacoes = [
-                        f"UFPA", f"QG CMSE 2º EXERCITO",
-                        f"BATALHÃO {cidade.upper()}"
-                    ]
-                    local = random.choice(instalacoes)
+            # Para PA, algumas vezes é instalação militar ou universidade
+            if especifico and sorteio < 0.3:
+                instalacoes = ["UFPA", "QG CMSE 2º EXERCITO", f"BATALHÃO {cidade.upper()}"]
+                local = instalacoes[i_instalacao]
             return f"CT - PA {local}, {uf}"
         
         else:  # 70% - CT - AG (padrão mais comum)
-            # Usa nomes de locais variados
-            if random.random() < 0.6:  # 60% usa nomes específicos
-                local = random.choice(self.nomes_locais)
-                if '{}' in local:
-                    nome_cidade = cidade.split()[0].upper()
-                    local = local.format(nome_cidade)
-            else:  # 40% usa apenas o nome da cidade
+            # 60% usa nomes específicos, 40% usa apenas o nome da cidade
+            if sorteio >= 0.6:
                 local = cidade.upper()
             
             # Algumas entradas têm formatação ligeiramente diferente
-            if random.random() < 0.02:  # 2% tem hífen diferente
+            if sorteio_formato < 0.02:  # 2% tem hífen diferente
                 return f"CT- AG. {local}/{uf}"
             
             return f"CT - AG {local}, {uf}"
@@ -395,16 +392,16 @@ class GeradorDadosSAP:
                 'numeroITR': f"CÓD. IMÓVEL {random.randint(1000, 9999)}",
                 'grupoAutorizacoes': random.randint(7000, 7999)
             },
-            'locadorId': f"locador_{str(locador_id).zfill(6)}"
+            'locadorId': f"locador_{str(locador_id).zfill(6)}",
+            # Já derivados, como nos importadores, para o SAPDataLoader não recalcular
+            'tipo': tipo_por_edificio(tipo_edificio_nome),
+            'status': status_por_edificio(status)
         }
     
-    def gerar_dados_completos(self, num_imoveis: int = 100) -> Dict:
-        """Gera dataset completo com imóveis e locadores"""
+    def gerar_registros(self, num_imoveis: int = 100, verboso: bool = False) -> Iterator[Tuple[str, Dict]]:
+        """Gera os registros (seção, registro) de locadores e imóveis um a um"""
         print(f"🏗️  Gerando {num_imoveis} imóveis com dados realistas...")
         
-        locadores = []
-        imoveis = []
-        
         # Gerar locadores (aproximadamente 40% do número de imóveis)
         num_locadores = int(num_imoveis * 0.4)
         cidades_locadores = random.choices(self.cidades_brasil, k=num_locadores)
@@ -412,76 +409,527 @@ class GeradorDadosSAP:
         for i in range(1, num_locadores + 1):
             cidade, uf = cidades_locadores[i-1]
             eh_pj = random.random() < 0.3  # 30% PJ, 70% PF
-            locador = self.gerar_locador(i, eh_pj, cidade, uf)
-            locadores.append(locador)
-            print(f"  ✓ Locador {i}/{num_locadores} gerado")
+            yield 'locadores', self.gerar_locador(i, eh_pj, cidade, uf)
+            if verboso:
+                print(f"  ✓ Locador {i}/{num_locadores} gerado")
         
         # Gerar imóveis (alguns locadores terão múltiplos imóveis)
         for i in range(1, num_imoveis + 1):
             # Selecionar locador aleatório
             id_locador = random.randint(1, num_locadores)
-            imovel = self.gerar_imovel(i, id_locador)
-            imoveis.append(imovel)
-            print(f"  ✓ Imóvel {i}/{num_imoveis} gerado")
+            yield 'imoveis', self.gerar_imovel(i, id_locador)
+            if verboso:
+                print(f"  ✓ Imóvel {i}/{num_imoveis} gerado")
+    
+    def gerar_registros_em_lote(self, num_imoveis: int = 100, semente: Optional[int] = None,
+                                tamanho_lote: int = 50000) -> Iterator[Tuple[str, Dict]]:
+        """
+        Mesmo formato e distribuições de gerar_registros, mas sorteando com NumPy todos os
+        campos de um lote de uma vez e só montando os dicionários no laço
+        """
+        print(f"🏗️  Gerando {num_imoveis} imóveis com dados realistas (em lote)...")
+        num_locadores = int(num_imoveis * 0.4)
+        yield from self.gerar_intervalo_em_lote(
+            range(1, num_imoveis + 1), range(1, num_locadores + 1), num_locadores, semente, tamanho_lote
+        )
+    
+    def gerar_intervalo_em_lote(self, imoveis: range, locadores: range, total_locadores: int,
+                                semente=None, tamanho_lote: int = 50000) -> Iterator[Tuple[str, Dict]]:
+        """
+        Gera só os locadores e imóveis com os IDs informados; os imóveis sorteiam o locador
+        entre todos os total_locadores, para que partes geradas em separado formem um dataset só
+        """
+        import numpy as np
+        
+        rng = np.random.default_rng(semente)
+        for inicio in range(locadores.start, locadores.stop, tamanho_lote):
+            quantidade = min(tamanho_lote, locadores.stop - inicio)
+            for locador in self._lote_locadores(rng, inicio, quantidade):
+                yield 'locadores', locador
+        
+        for inicio in range(imoveis.start, imoveis.stop, tamanho_lote):
+            quantidade = min(tamanho_lote, imoveis.stop - inicio)
+            for imovel in self._lote_imoveis(rng, inicio, quantidade, total_locadores):
+                yield 'imoveis', imovel
+    
+    @staticmethod
+    def _sortear_digitos(rng, quantidade: int, num_digitos: int) -> List[str]:
+        """Strings de dígitos aleatórios montadas direto dos bytes ASCII"""
+        digitos = rng.integers(0, 10, (quantidade, num_digitos), dtype='uint8') + ord('0')
+        return digitos.view(f'S{num_digitos}').ravel().astype(f'U{num_digitos}').tolist()
+    
+    @staticmethod
+    def _sortear_datas(rng, quantidade: int, inicio, fim) -> List[str]:
+        """Datas DD/MM/YYYY uniformes entre inicio e fim (inclusive); aceita datas ou arrays de datas"""
+        import numpy as np
+        
+        inicio = np.asarray(inicio, dtype='datetime64[D]')
+        dias = (np.asarray(fim, dtype='datetime64[D]') - inicio).astype('int64')
+        datas = (inicio + rng.integers(0, dias + 1, quantidade)).astype('U10').tolist()
+        return [f"{d[8:10]}/{d[5:7]}/{d[:4]}" for d in datas]
+    
+    def _sortear_ceps(self, rng, ufs: List[str]) -> List[str]:
+        sufixos = self._sortear_digitos(rng, len(ufs), 5)
+        return [f"{self.prefixos_cep.get(uf, '000')}{s[:2]}-{s[2:]}" for uf, s in zip(ufs, sufixos)]
+    
+    def _sortear_telefones(self, rng, ufs: List[str], celular: bool) -> List[str]:
+        numeros = self._sortear_digitos(rng, len(ufs), 8)
+        if celular:
+            primeiros = ['9'] * len(ufs)
+        else:
+            primeiros = [('3', '2')[i] for i in rng.integers(0, 2, len(ufs)).tolist()]
+        return [f"55{self.ddds.get(uf, '11')}{p}{n}" for uf, p, n in zip(ufs, primeiros, numeros)]
+    
+    def _lote_locadores(self, rng, inicio: int, quantidade: int) -> List[Dict]:
+        cidades = [self.cidades_brasil[i] for i in rng.integers(0, len(self.cidades_brasil), quantidade).tolist()]
+        ufs = [uf for _, uf in cidades]
+        eh_pj = (rng.random(quantidade) < 0.3).tolist()  # 30% PJ, 70% PF
+        nomes_pj = rng.integers(0, len(self.nomes_pj), quantidade).tolist()
+        nomes_pf = rng.integers(0, len(self.nomes_pf), quantidade).tolist()
+        cnpjs = self._sortear_digitos(rng, quantidade, 14)
+        cpfs = self._sortear_digitos(rng, quantidade, 11)
+        logradouros = rng.integers(0, len(self.logradouros), quantidade).tolist()
+        ruas = rng.integers(0, len(self.nomes_ruas), quantidade).tolist()
+        numeros = rng.integers(1, 10000, quantidade).tolist()
+        bairros = rng.integers(0, len(self.bairros), quantidade).tolist()
+        ceps = self._sortear_ceps(rng, ufs)
+        dominios = rng.integers(0, len(self.dominios_email), quantidade).tolist()
+        telefones = self._sortear_telefones(rng, ufs, False)
+        celulares = self._sortear_telefones(rng, ufs, True)
+        inicios_relacao = self._sortear_datas(rng, quantidade, '1990-01-01', '2020-12-31')
+        fins_relacao = self._sortear_datas(rng, quantidade, '2025-01-01', '9999-12-31')
         
+        locadores = []
+        for j in range(quantidade):
+            id_locador = inicio + j
+            cidade, uf = cidades[j]
+            pj = eh_pj[j]
+            nome_base = self.nomes_pj[nomes_pj[j]] if pj else self.nomes_pf[nomes_pf[j]]
+            rua = f"{self.logradouros[logradouros[j]]} {self.nomes_ruas[ruas[j]]}"
+            nome_limpo = nome_base.lower().replace(' ', '.').split('/')[0].strip()
+            locadores.append({
+                'id': f"locador_{str(id_locador).zfill(6)}",
+                'parceiroNegocio': 900127000 + id_locador,
+                'tipoIdFiscal': 'CNPJ' if pj else 'CPF',
+                'numeroIdFiscal': cnpjs[j] if pj else cpfs[j],
+                'nome': nome_base,
+                'nomeEndereco': f"{nome_base} / {rua} {numeros[j]} / {cidade} - {uf}",
+                'funcaoPN': 'Proponente Credor',
+                'tipo': 'juridica' if pj else 'fisica',
+                'endereco': {
+                    'rua': rua,
+                    'numero': numeros[j],
+                    'bairro': self.bairros[bairros[j]],
+                    'cidade': cidade,
+                    'regiao': uf,
+                    'cep': ceps[j]
+                },
+                'email': f"{nome_limpo[:30]}@{self.dominios_email[dominios[j]]}",
+                'telefone': telefones[j],
+                'telefoneCelular': celulares[j],
+                'inicioRelacao': inicios_relacao[j],
+                'fimRelacao': fins_relacao[j],
+                'status': 'ativo'
+            })
+        return locadores
+    
+    def _lote_imoveis(self, rng, inicio: int, quantidade: int, num_locadores: int) -> List[Dict]:
+        import numpy as np
+        
+        cidades = [self.cidades_brasil[i] for i in rng.integers(0, len(self.cidades_brasil), quantidade).tolist()]
+        ufs = [uf for _, uf in cidades]
+        ids_locador = rng.integers(1, num_locadores + 1, quantidade).tolist()
+        denominacoes = [
+            self.montar_denominacao_contrato(cidade, uf, *sorteio)
+            for (cidade, uf), sorteio in zip(cidades, zip(
+                rng.random(quantidade).tolist(),
+                rng.integers(0, len(self.nomes_locais), quantidade).tolist(),
+                rng.integers(939, 10000, quantidade).tolist(),
+                rng.integers(1000, 10000, quantidade).tolist(),
+                rng.integers(0, len(self.nomes_edificios), quantidade).tolist(),
+                rng.random(quantidade).tolist(),
+                rng.integers(0, 3, quantidade).tolist(),
+                rng.random(quantidade).tolist()
+            ))
+        ]
+        inicios_contrato = self._sortear_datas(rng, quantidade, '1990-01-01', '2020-12-31')
+        
+        # Mesmos pesos e faixas de datas por status de gerar_imovel
+        pesos = np.array([60, 5, 10, 15, 10])
+        status = rng.choice(len(self.status_opcoes), quantidade, p=pesos / pesos.sum())
+        faixas_fim = np.array([
+            ['2025-01-01', '2030-12-31'], ['2020-01-01', '2023-12-31'], ['2025-01-01', '2030-12-31'],
+            ['2024-01-01', '2025-12-31'], ['2020-01-01', '2023-12-31']
+        ], dtype='datetime64[D]')[status]
+        faixas_rescisao = np.array([
+            ['2020-01-01', '2020-01-01'], ['2020-01-01', '2023-12-31'], ['2020-01-01', '2020-01-01'],
+            ['2024-01-01', '2025-06-30'], ['2020-01-01', '2023-12-31']
+        ], dtype='datetime64[D]')[status]
+        fins_validade = self._sortear_datas(rng, quantidade, faixas_fim[:, 0], faixas_fim[:, 1])
+        rescisoes = self._sortear_datas(rng, quantidade, faixas_rescisao[:, 0], faixas_rescisao[:, 1])
+        status = [self.status_opcoes[i] for i in status.tolist()]
+        
+        tipos_edificio = rng.integers(0, len(self.tipos_edificio), quantidade).tolist()
+        funcoes = rng.integers(0, len(self.funcoes_edificio), quantidade).tolist()
+        logradouros = rng.integers(0, len(self.logradouros), quantidade).tolist()
+        ruas = rng.integers(0, len(self.nomes_ruas), quantidade).tolist()
+        numeros = rng.integers(1, 10000, quantidade).tolist()
+        bairros = rng.integers(0, len(self.bairros), quantidade).tolist()
+        ceps = self._sortear_ceps(rng, ufs)
+        inicios_validade_obj = self._sortear_datas(rng, quantidade, '1980-01-01', '2000-12-31')
+        utilizacoes = (rng.random(quantidade) < 0.7).tolist()  # 70% Próprio, 30% Terceiro
+        criadores = rng.integers(100000, 1000000, quantidade).tolist()
+        conservacoes = rng.integers(0, len(self.estado_conservacao), quantidade).tolist()
+        denominacoes_imovel = rng.integers(0, len(self.denominacoes_imovel), quantidade).tolist()
+        apolices = rng.integers(1, 6, quantidade).tolist()
+        inscricoes_iptu = rng.integers(100000, 1000000, quantidade).tolist()
+        numeros_itr = rng.integers(1000, 10000, quantidade).tolist()
+        grupos = rng.integers(7000, 8000, quantidade).tolist()
+        
+        imoveis = []
+        for j in range(quantidade):
+            id_imovel = inicio + j
+            cidade, uf = cidades[j]
+            situacao = status[j]
+            fim_validade = fins_validade[j]
+            rua = f"{self.logradouros[logradouros[j]]} {self.nomes_ruas[ruas[j]]}"
+            tipo_edificio_cod, tipo_edificio_nome = self.tipos_edificio[tipos_edificio[j]]
+            funcao_cod, funcao_nome = self.funcoes_edificio[funcoes[j]]
+            imoveis.append({
+                'id': f"imovel_{str(id_imovel).zfill(6)}",
+                # Dados REISCNBP - Contrato
+                'contrato': {
+                    'numero': 10000000 + id_imovel,
+                    'denominacao': denominacoes[j],
+                    'tipoContrato': 'Contrato de Locação - Imóveis',
+                    'inicioContrato': inicios_contrato[j],
+                    'fimValidade': fim_validade,
+                    'rescisaoEm': None if situacao in ('Ativo', 'Em Mobilização') else rescisoes[j],
+                    'parceiroNegocio': 900127000 + ids_locador[j]
+                },
+                # Dados REISBU - Edifício
+                'edificio': {
+                    'codigo': 20000000 + id_imovel,
+                    'denominacao': f"ED - AG {cidade}, {uf}",
+                    'status': situacao,
+                    'cep': ceps[j],
+                    'local': cidade,
+                    'rua': rua,
+                    'numero': numeros[j],
+                    'bairro': self.bairros[bairros[j]],
+                    'regiao': uf,
+                    'inicioValidadeObj': inicios_validade_obj[j],
+                    'objetoValidoAte': '31/12/9999' if situacao == 'Ativo' else fim_validade,
+                    'tipoEdificio': {
+                        'codigo': tipo_edificio_cod,
+                        'nome': tipo_edificio_nome
+                    },
+                    'criadoPor': f"C{criadores[j]}",
+                    'chavePais': 'BR',
+                    'endereco': f"AG {cidade}, {uf} / {rua} {numeros[j]} / {cidade} - {uf}",
+                    'estadoConservacao': self.estado_conservacao[conservacoes[j]],
+                    'funcao': {
+                        'codigo': funcao_cod,
+                        'nome': funcao_nome
+                    },
+                    'denominacaoImovel': self.denominacoes_imovel[denominacoes_imovel[j]],
+                    'utilizacaoPrincipal': 'Próprio' if utilizacoes[j] else 'Terceiro',
+                    'tipoApolice': apolices[j],
+                    'inscricaoIPTU': f"IM: INSC. {inscricoes_iptu[j]}",
+                    'numeroITR': f"CÓD. IMÓVEL {numeros_itr[j]}",
+                    'grupoAutorizacoes': grupos[j]
+                },
+                'locadorId': f"locador_{str(ids_locador[j]).zfill(6)}",
+                'tipo': tipo_por_edificio(tipo_edificio_nome),
+                'status': status_por_edificio(situacao)
+            })
+        return imoveis
+    
+    def gerar_metadados(self, total_imoveis: int, total_locadores: int) -> Dict:
+        """Metadados do dataset gerado"""
         return {
-            'imoveis': imoveis,
-            'locadores': locadores,
-            'metadados': {
-                'dataGeracao': datetime.now().isoformat(),
-                'fonte': 'Gerador automático de dados mockados',
-                'versao': '2.0',
-                'totalImoveis': len(imoveis),
-                'totalLocadores': len(locadores),
-                'estrutura': 'SAP REISCNBP + REISBU'
-            }
+            'dataGeracao': datetime.now().isoformat(),
+            'fonte': 'Gerador automático de dados mockados',
+            'versao': '2.0',
+            'totalImoveis': total_imoveis,
+            'totalLocadores': total_locadores,
+            'estrutura': 'SAP REISCNBP + REISBU'
         }
+    
+    def gerar_dados_completos(self, num_imoveis: int = 100, em_lote: bool = False,
+                              semente: Optional[int] = None) -> Dict:
+        """Gera dataset completo com imóveis e locadores"""
+        dados = {'imoveis': [], 'locadores': []}
+        if em_lote:
+            registros = self.gerar_registros_em_lote(num_imoveis, semente)
+        else:
+            random.seed(semente)
+            registros = self.gerar_registros(num_imoveis)
+        for secao, registro in registros:
+            dados[secao].append(registro)
+        dados['metadados'] = self.gerar_metadados(len(dados['imoveis']), len(dados['locadores']))
+        return dados
+
+def contar_imovel(imovel: Dict, status_count: Dict, uf_count: Dict):
+    status = imovel['edificio']['status']
+    status_count[status] = status_count.get(status, 0) + 1
+    uf = imovel['edificio']['regiao']
+    uf_count[uf] = uf_count.get(uf, 0) + 1
+
+def somar_contagens(destino: Dict, origem: Dict):
+    for chave, valor in origem.items():
+        destino[chave] = destino.get(chave, 0) + valor
+
+def planejar_partes(num_imoveis: int, tamanho_parte: int) -> List[Tuple[range, range]]:
+    """
+    Divide os IDs de imóveis e locadores em partes de tamanho fixo. A divisão não
+    depende do número de workers, então a mesma semente gera sempre o mesmo dataset
+    """
+    partes = []
+    for inicio in range(0, num_imoveis, tamanho_parte):
+        fim = min(inicio + tamanho_parte, num_imoveis)
+        partes.append((range(inicio + 1, fim + 1), range(int(inicio * 0.4) + 1, int(fim * 0.4) + 1)))
+    return partes
+
+def gerar_parte(imoveis: range, locadores: range, total_locadores: int, semente, destino: str,
+                compacto: bool, tamanho_lote: int, metadados_parte: Optional[Dict] = None,
+                com_indice: bool = True):
+    """
+    Gera uma parte num processo do pool. Com metadados_parte grava um dados-sap.json
+    próprio em destino; sem, grava fragmentos <destino>.<seção>.part para o processo
+    principal juntar. Devolve as contagens, os caminhos gravados, o índice dos fragmentos
+    e as métricas do worker
+    """
+    gerador = GeradorDadosSAP()
+    metricas = Metricas()
+    status_count, uf_count = {}, {}
+    arquivo_proprio = metadados_parte is not None
+    indice = IndiceDados() if com_indice else None
+    if arquivo_proprio:
+        escritor = EscritorJSONIncremental(destino, compacto=compacto, indice=indice)
+    else:
+        escritor = EscritorFragmentos(destino, compacto=compacto, indice=indice)
+    
+    with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo), escritor:
+        registros = gerador.gerar_intervalo_em_lote(imoveis, locadores, total_locadores, semente, tamanho_lote)
+        for secao, registro in metricas.iterar('geracao', registros):
+            with metricas.medir('escrita'):
+                escritor.escrever(secao, registro)
+            if secao == 'imoveis':
+                contar_imovel(registro, status_count, uf_count)
+        if arquivo_proprio:
+            metadados = gerador.gerar_metadados(escritor.contagens['imoveis'], escritor.contagens['locadores'])
+            with metricas.medir('escrita'):
+                escritor.finalizar({**metadados, **metadados_parte})
+    
+    if arquivo_proprio:
+        # O índice da parte já foi gravado ao lado do arquivo; não precisa voltar ao processo principal
+        caminhos = {secao: destino for secao in escritor.secoes}
+        return escritor.contagens, caminhos, None, status_count, uf_count, metricas.etapas
+    return escritor.contagens, escritor.caminhos, indice, status_count, uf_count, metricas.etapas
+
+def gerar_em_partes(gerador: GeradorDadosSAP, num_imoveis: int, output_path: str, semente: Optional[int],
+                    workers: Optional[int], tamanho_parte: int, tamanho_lote: int, compacto: bool,
+                    por_parte: bool, metricas: Metricas, progresso: RelatorioProgresso,
+                    com_indice: bool = True):
+    """
+    Gera o dataset em partes num pool de processos, cada parte com uma semente derivada
+    da principal (SeedSequence.spawn). IDs e parceiroNegocio são globais, então as partes
+    não se repetem. Sem por_parte os fragmentos são juntados, na ordem das partes, em
+    um único output_path; com por_parte cada parte vira <saida>.parte-NNNN.json
+    """
+    import numpy as np
+    
+    partes = planejar_partes(num_imoveis, tamanho_parte)
+    sementes = np.random.SeedSequence(semente)
+    print(f"🎲 Semente: {sementes.entropy} ({len(partes)} partes de até {tamanho_parte} imóveis)")
+    
+    total_locadores = int(num_imoveis * 0.4)
+    base, extensao = os.path.splitext(output_path)
+    if por_parte:
+        temporario = None
+        destinos = [f"{base}.parte-{i + 1:04d}{extensao}" for i in range(len(partes))]
+        metadados_partes = [
+            {'parte': i + 1, 'totalPartes': len(partes), 'semente': sementes.entropy}
+            for i in range(len(partes))
+        ]
+    else:
+        temporario = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(output_path)))
+        destinos = [os.path.join(temporario, f"parte-{i + 1:04d}") for i in range(len(partes))]
+        metadados_partes = [None] * len(partes)
+    
+    status_count, uf_count, totais = {}, {}, {'imoveis': 0, 'locadores': 0}
+    try:
+        if por_parte:
+            escritor = contextlib.nullcontext()
+        else:
+            indice = IndiceDados() if com_indice else None
+            escritor = EscritorJSONIncremental(output_path, compacto=compacto, indice=indice)
+        with ProcessPoolExecutor(max_workers=workers) as executor, escritor:
+            resultados = executor.map(
+                gerar_parte, [imoveis for imoveis, _ in partes], [locadores for _, locadores in partes],
+                [total_locadores] * len(partes), sementes.spawn(len(partes)), destinos,
+                [compacto] * len(partes), [tamanho_lote] * len(partes), metadados_partes,
+                [com_indice] * len(partes)
+            )
+            for contagens, caminhos, indice_parte, status_parte, ufs_parte, etapas in resultados:
+                metricas.incorporar(etapas, {})
+                somar_contagens(status_count, status_parte)
+                somar_contagens(uf_count, ufs_parte)
+                somar_contagens(totais, contagens)
+                if not por_parte:
+                    with metricas.medir('juncao'):
+                        for secao, caminho in caminhos.items():
+                            escritor.anexar(secao, caminho, contagens[secao], indice_parte)
+                            os.remove(caminho)
+                progresso.avancar(contagens['imoveis'] + contagens['locadores'])
+            progresso.concluir()
+            
+            metadados = gerador.gerar_metadados(totais['imoveis'], totais['locadores'])
+            metadados['semente'] = sementes.entropy
+            if por_parte:
+                print(f"\n💾 Dados salvos em {len(destinos)} arquivos: {base}.parte-NNNN{extensao}")
+            else:
+                print(f"\n💾 Salvando dados em: {output_path}")
+                with metricas.medir('escrita'):
+                    escritor.finalizar(metadados)
+    finally:
+        if temporario:
+            shutil.rmtree(temporario, ignore_errors=True)
+    return metadados, status_count, uf_count
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Gera dados mockados no formato SAP (REISCNBP + REISBU)')
+    parser.add_argument('--imoveis', type=int, default=100,
+                        help='Quantidade de imóveis a gerar (padrão: 100)')
+    parser.add_argument('--semente', type=int, default=None,
+                        help='Semente dos sorteios, para gerar sempre o mesmo dataset')
+    parser.add_argument('--em-lote', action='store_true',
+                        help='Sorteia os campos em lote com NumPy (recomendado para milhões de linhas)')
+    parser.add_argument('--tamanho-lote', type=int, default=50000,
+                        help='Registros sorteados por lote no modo --em-lote (padrão: 50000)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Gera em partes num pool de processos com N workers (implica --em-lote)')
+    parser.add_argument('--tamanho-parte', type=int, default=100000,
+                        help='Imóveis por parte na geração em paralelo (padrão: 100000)')
+    parser.add_argument('--por-parte', action='store_true',
+                        help='Grava um arquivo por parte (<saida>.parte-NNNN.json) em vez de juntar tudo')
+    parser.add_argument('--saida', default=None,
+                        help='Arquivo JSON de saída (padrão: public/dados-sap.json)')
+    parser.add_argument('--compacto', action='store_true',
+                        help='Grava o JSON sem indentação (produção)')
+    parser.add_argument('--verboso', action='store_true',
+                        help='Imprime uma linha por registro gerado')
+    parser.add_argument('--silencioso', action='store_true',
+                        help='Não exibe o progresso durante a geração')
+    parser.add_argument('--sem-indice', action='store_true',
+                        help='Não grava o índice auxiliar (<saida>.indice.json) usado pelo front-end')
+    parser.add_argument('--paginar', type=int, default=None, metavar='N',
+                        help='Também grava páginas de N registros em <saida>/ e o manifesto <saida>.manifesto.json')
+    parser.add_argument('--paginar-por', choices=AGRUPAMENTOS, default='registros',
+                        help='Agrupa as páginas de imóveis só por quantidade ou por estado (padrão: registros)')
+    parser.add_argument('--colunar', action='store_true',
+                        help='Também grava <saida>.colunar.json, formato colunar compacto (ver silic_dados.colunar)')
+    parser.add_argument('--sqlite', action='store_true',
+                        help='Também grava o banco SQLite (ex.: public/dados-sap.sqlite) com as tabelas contrato, edificio '
+                             'e locador (ver silic_dados.banco)')
+    parser.add_argument('--resumo-json', default=None,
+                        help='Grava em JSON o tempo por etapa e os contadores da execução')
+    args = parser.parse_args()
+    if (args.paginar or args.colunar or args.sqlite) and (args.workers is not None or args.por_parte):
+        parser.error('--paginar/--colunar/--sqlite não podem ser combinados com --workers/--por-parte')
+    return args
 
 def main():
+    args = parse_args()
+    
     print("=" * 70)
     print("🏢 GERADOR DE DADOS MOCKADOS - SILIC 2.0")
     print("=" * 70)
     print()
     
     gerador = GeradorDadosSAP()
-    dados = gerador.gerar_dados_completos(100)
     
     # Salvar JSON (usar path absoluto a partir do diretório do script)
-    import os
     script_dir = os.path.dirname(os.path.abspath(__file__))
-    output_path = os.path.join(script_dir, '..', 'public', 'dados-sap.json')
-    print(f"\n💾 Salvando dados em: {output_path}")
+    output_path = args.saida or os.path.join(script_dir, '..', 'public', 'dados-sap.json')
     
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(dados, f, ensure_ascii=False, indent=2)
+    # Cada registro é gravado assim que gerado; só as contagens ficam em memória
+    status_count = {}
+    uf_count = {}
+    num_imoveis = args.imoveis
+    metricas = Metricas()
+    progresso = RelatorioProgresso(total=num_imoveis + int(num_imoveis * 0.4), rotulo='registros',
+                                   ativo=not (args.silencioso or args.verboso))
+    if args.workers is not None or args.por_parte:
+        metadados, status_count, uf_count = gerar_em_partes(
+            gerador, num_imoveis, output_path, args.semente, args.workers, args.tamanho_parte,
+            args.tamanho_lote, args.compacto, args.por_parte, metricas, progresso, not args.sem_indice
+        )
+    else:
+        indice = None if args.sem_indice else IndiceDados()
+        paginas = EscritorPaginado(output_path, args.paginar, args.paginar_por) if args.paginar else None
+        colunar = EscritorColunar(output_path) if args.colunar else None
+        banco = EscritorSQLite(output_path) if args.sqlite else None
+        with EscritorJSONIncremental(output_path, compacto=args.compacto, indice=indice,
+                                     paginas=paginas, colunar=colunar, banco=banco) as escritor:
+            if args.em_lote:
+                registros = gerador.gerar_registros_em_lote(num_imoveis, args.semente, args.tamanho_lote)
+            else:
+                random.seed(args.semente)
+                registros = gerador.gerar_registros(num_imoveis, args.verboso)
+            registros = metricas.iterar('geracao', registros)
+            for secao, registro in registros:
+                with metricas.medir('escrita'):
+                    escritor.escrever(secao, registro)
+                progresso.avancar()
+                if secao == 'imoveis':
+                    contar_imovel(registro, status_count, uf_count)
+            
+            progresso.concluir()
+            
+            print(f"\n💾 Salvando dados em: {output_path}")
+            metadados = gerador.gerar_metadados(escritor.contagens['imoveis'], escritor.contagens['locadores'])
+            with metricas.medir('escrita'):
+                escritor.finalizar(metadados)
+    metricas.contar('imoveis', metadados['totalImoveis'])
+    metricas.contar('locadores', metadados['totalLocadores'])
     
     print("\n" + "=" * 70)
     print("✅ GERAÇÃO CONCLUÍDA COM SUCESSO!")
     print("=" * 70)
     print(f"\n📊 Resumo:")
-    print(f"   • Imóveis gerados: {dados['metadados']['totalImoveis']}")
-    print(f"   • Locadores gerados: {dados['metadados']['totalLocadores']}")
-    print(f"   • Arquivo: {output_path}")
+    print(f"   • Imóveis gerados: {metadados['totalImoveis']}")
+    print(f"   • Locadores gerados: {metadados['totalLocadores']}")
+    if args.por_parte:
+        base, extensao = os.path.splitext(output_path)
+        print(f"   • Arquivos: {base}.parte-NNNN{extensao}")
+    else:
+        print(f"   • Arquivo: {output_path}")
+        if not args.sem_indice:
+            print(f"   • Índice: {caminho_indice(output_path)}")
+        if args.paginar:
+            print(f"   • Manifesto das páginas: {caminho_manifesto(output_path)}")
+        if args.colunar:
+            print(f"   • Formato colunar: {caminho_colunar(output_path)}")
+        if args.sqlite:
+            print(f"   • Banco SQLite: {caminho_banco(output_path)}")
     print(f"\n🎯 Status dos imóveis:")
     
-    status_count = {}
-    for imovel in dados['imoveis']:
-        status = imovel['edificio']['status']
-        status_count[status] = status_count.get(status, 0) + 1
-    
     for status, count in sorted(status_count.items()):
-        percentual = (count / len(dados['imoveis'])) * 100
+        percentual = (count / metadados['totalImoveis']) * 100
         print(f"   • {status}: {count} ({percentual:.1f}%)")
     
     print("\n🌎 Distribuição por estado:")
-    uf_count = {}
-    for imovel in dados['imoveis']:
-        uf = imovel['edificio']['regiao']
-        uf_count[uf] = uf_count.get(uf, 0) + 1
-    
     for uf, count in sorted(uf_count.items(), key=lambda x: x[1], reverse=True)[:10]:
         print(f"   • {uf}: {count} imóveis")
     
+    print()
+    metricas.imprimir()
+    if args.resumo_json:
+        metricas.salvar(args.resumo_json)
+        print(f"   • Resumo em JSON: {args.resumo_json}")
+    
     print("\n" + "=" * 70)
 
 if __name__ == "__main__":
@@ -1,175 +1,220 @@
 #!/usr/bin/env python3
 """
-Script para importar dados do SAP (rel-SAP.xlsx) e converter para o formato do protótipo SILIC 2.0
+Script para importar dados do SAP (rel-SAP.xlsx) e converter para o formato do SILIC 2.0:
+a estrutura REISCNBP + REISBU lida pelo SAPDataLoader (padrão) ou o formato plano do protótipo
 """
 
-import pandas as pd
-import json
-from datetime import datetime
-import hashlib
-import re
+import argparse
+import contextlib
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
 
-def limpar_cpf_cnpj(documento):
-    """Remove formatação de CPF/CNPJ"""
-    if pd.isna(documento):
-        return ""
-    return re.sub(r'[^\d]', '', str(int(documento)))
+from silic_dados import (
+    DeduplicadorLocadores, EscritorColunar, EscritorJSONIncremental, EscritorPaginado, EscritorSQLite, IndiceDados,
+    IndiceVencimentos, Metricas, RelatorioProgresso
+)
+from silic_dados.cache_planilha import DIRETORIO_PADRAO, LIMITE_PADRAO_MB, CachePlanilha
+from silic_dados.contexto import ContextoExecucao, data_execucao
+from silic_dados.denominacao import descrever_cache
+from silic_dados.incremental import EstadoIncremental
+from silic_dados.locadores import CAMINHO_MAPA_PADRAO
+from silic_dados.mapeamento import FORMATOS, mapear_sap, metadados_reis
+from silic_dados.paginacao import AGRUPAMENTOS
+from silic_dados.pipeline import gravar, pipeline_sap
+from silic_dados.validacao import COLUNAS_OBRIGATORIAS, ErroValidacao, ValidadorPlanilha, descrever_rejeitadas
 
-def formatar_telefone(telefone):
-    """Formata telefone removendo código do país se necessário"""
-    if pd.isna(telefone):
-        return ""
-    tel = str(int(telefone))
-    # Remove código do país (55) se presente
-    if tel.startswith('55') and len(tel) > 11:
-        tel = tel[2:]
-    return tel
+# Além das obrigatórias, os formatos de silic_dados.mapeamento leem estas colunas
+COLUNAS_USADAS = COLUNAS_OBRIGATORIAS + (
+    'Parceiro de negócios', 'Tipo ID Fiscal', 'Denom.função PN', 'Rua', 'Nº', 'Bairro', 'Local', 'Região',
+    'Código postal', 'Nº telefone',
+)
 
-def gerar_id(seed):
-    """Gera um ID único baseado em uma seed"""
-    return hashlib.md5(str(seed).encode()).hexdigest()[:12]
-
-def determinar_tipo_imovel(denominacao):
-    """Determina o tipo do imóvel baseado na denominação"""
-    denominacao_lower = denominacao.lower()
+def converter_dados_sap(excel_path, tamanho_bloco=None, limite_memoria_mb=None, incremental=None,
+                        metricas=None, verboso=False, progresso=None, contexto=None, locadores=None,
+                        cache=None, validador=None, formato='reis'):
+    """
+    Converte dados do Excel SAP para o formato informado (ver silic_dados.mapeamento.FORMATOS),
+    gerando os registros (seção, registro) à medida que passam pelo pipeline
+    (silic_dados.pipeline). Com tamanho_bloco, a planilha é lida em blocos em vez de inteira.
+    Com incremental (EstadoIncremental), contratos inalterados desde a última
+    execução reaproveitam os registros anteriores sem serem remapeados.
+    O tempo de cada etapa é somado em metricas; verboso imprime uma linha por registro.
+    Se informado, progresso (RelatorioProgresso) recebe o total de linhas da planilha.
+    contexto (ContextoExecucao) fornece o instante usado nas datas e no status.
+    locadores (DeduplicadorLocadores) resolve o ID estável de cada locador.
+    cache (CachePlanilha) evita reinterpretar o xlsx se ele não mudou.
+    validador (ValidadorPlanilha) confere as colunas e tira as linhas inválidas
+    antes do mapeamento.
+    """
+    metricas = metricas if metricas is not None else Metricas()
+    contexto = contexto if contexto is not None else ContextoExecucao()
     
-    if 'ag ' in denominacao_lower or 'agência' in denominacao_lower:
-        return 'comercial'
-    elif 'residencial' in denominacao_lower or 'casa' in denominacao_lower or 'apartamento' in denominacao_lower:
-        return 'residencial'
-    elif 'terreno' in denominacao_lower or 'lote' in denominacao_lower:
-        return 'terreno'
-    elif 'galpão' in denominacao_lower or 'industrial' in denominacao_lower:
-        return 'industrial'
-    else:
-        return 'comercial'  # Default para agências
-
-def determinar_status_contrato(row):
-    """Determina o status do contrato baseado nas datas"""
-    hoje = datetime.now()
+    def mapear(lotes):
+        return mapear_sap(lotes, formato, metricas, contexto, incremental, verboso, leitor.total_estimado)
     
-    # Se tem data de rescisão, está inativo/vendido
-    if pd.notna(row['Rescisão em']):
-        return 'vendido'
+    print("📂 Lendo arquivo Excel do SAP...")
+    leitor, pipeline = pipeline_sap(excel_path, mapear, metricas, tamanho_bloco, limite_memoria_mb, cache,
+                                    validador, locadores)
+    if leitor.do_cache:
+        print("♻️  Planilha inalterada desde a última leitura: usando o cache")
+    total = leitor.total_estimado
+    if progresso is not None:
+        progresso.total = total
     
-    # Verifica se o contrato está vigente
-    fim_validade = row['Fim da validade']
-    if pd.notna(fim_validade):
-        if fim_validade < hoje:
-            return 'manutencao'  # Contrato vencido
-        else:
-            return 'ocupado'  # Contrato vigente
+    print(f"✅ {total} registros encontrados\n")
     
-    return 'disponivel'
+    if incremental is not None:
+        incremental.definir_colunas(leitor.colunas, formato)
+    
+    yield from pipeline.executar()
+
+def listar_planilhas(entrada):
+    """Resolve --entrada (arquivo, diretório ou padrão glob) em uma lista ordenada de planilhas"""
+    if os.path.isdir(entrada):
+        caminhos = glob.glob(os.path.join(entrada, '*.xlsx'))
+    elif any(c in entrada for c in '*?['):
+        caminhos = glob.glob(entrada)
+    else:
+        return [entrada]
+    # Ignora os arquivos de trava que o Excel cria ao lado da planilha aberta
+    return sorted(c for c in caminhos if not os.path.basename(c).startswith('~$'))
 
-def converter_dados_sap(excel_path):
+def processar_planilha(excel_path, tamanho_bloco=None, limite_memoria_mb=None, contexto=None, mapa_locadores=None,
+                       cache=None, validar=False, formato='reis'):
     """
-    Converte dados do Excel SAP para o formato do protótipo SILIC 2.0
+    Converte uma planilha inteira num processo do pool e devolve a lista de
+    (seção, registro) junto com as métricas do worker, os IDs de locadores
+    que ele atribuiu e que ainda não estavam no mapa e, com validar, as
+    linhas reprovadas e a contagem por motivo
     """
-    print("📂 Lendo arquivo Excel do SAP...")
-    df = pd.read_excel(excel_path)
-    
-    print(f"✅ {len(df)} registros encontrados\n")
-    
-    imoveis = []
-    locadores = []
-    locadores_ids = {}  # Cache para evitar duplicatas
-    
-    for idx, row in df.iterrows():
-        print(f"🔄 Processando registro {idx + 1}/{len(df)}: {row['Denominação do contrato']}")
-        
-        # === PROCESSAR LOCADOR ===
-        documento = limpar_cpf_cnpj(row['NºID fiscal'])
-        
-        # Verifica se locador já foi processado
-        if documento not in locadores_ids:
-            locador_id = gerar_id(f"locador_{documento}")
-            
-            # Extrai nome do campo "Nome/ender." (formato: NOME / ENDEREÇO)
-            nome_completo = row['Nome/ender.']
-            nome = nome_completo.split('/')[0].strip() if '/' in nome_completo else nome_completo
-            
-            locador = {
-                'id': locador_id,
-                'nome': nome,
-                'tipo': 'fisica' if row['Tipo ID Fiscal'] == 'CPF' else 'juridica',
-                'documento': documento,
-                'email': None,  # Não disponível no arquivo
-                'telefone': formatar_telefone(row['Nº telefone']) if pd.notna(row['Nº telefone']) else None,
-                'endereco': {
-                    'logradouro': row['Rua'] if pd.notna(row['Rua']) else None,
-                    'numero': str(row['Nº']) if pd.notna(row['Nº']) else None,
-                    'bairro': row['Bairro'] if pd.notna(row['Bairro']) else None,
-                    'cidade': row['Local'] if pd.notna(row['Local']) else None,
-                    'estado': row['Região'] if pd.notna(row['Região']) else None,
-                    'cep': row['Código postal'] if pd.notna(row['Código postal']) else None,
-                },
-                'status': 'ativo' if row['Denom.função PN'] == 'Proponente Credor' else 'inativo',
-                'dataRegistro': datetime.now().isoformat(),
-                'dataAtualizacao': datetime.now().isoformat()
-            }
-            
-            locadores.append(locador)
-            locadores_ids[documento] = locador_id
-            print(f"  👤 Locador criado: {nome} ({documento})")
-        else:
-            locador_id = locadores_ids[documento]
-            print(f"  👤 Locador já existente: {documento}")
-        
-        # === PROCESSAR IMÓVEL ===
-        imovel_id = gerar_id(f"imovel_{row['Contrato']}")
-        
-        # Extrai informações do endereço do imóvel da denominação do contrato
-        # Formato típico: "CT - AG VIÇOSA DE ALAGOAS, AL"
-        denominacao = row['Denominação do contrato']
-        partes = denominacao.split(',')
-        
-        if len(partes) >= 2:
-            cidade_estado = partes[0].replace('CT - AG ', '').replace('CT - ', '').strip()
-            estado = partes[1].strip() if len(partes) > 1 else ''
-        else:
-            cidade_estado = denominacao.replace('CT - AG ', '').replace('CT - ', '').strip()
-            estado = ''
-        
-        imovel = {
-            'id': imovel_id,
-            'codigo': str(row['Contrato']),
-            'endereco': denominacao,  # Usa a denominação completa como endereço
-            'bairro': row['Bairro'] if pd.notna(row['Bairro']) else 'Centro',
-            'cidade': cidade_estado,
-            'cep': row['Código postal'] if pd.notna(row['Código postal']) else '',
-            'estado': estado,
-            'tipo': determinar_tipo_imovel(denominacao),
-            'status': determinar_status_contrato(row),
-            'area': None,  # Não disponível no arquivo
-            'valor': None,  # Não disponível no arquivo
-            'descricao': f"Contrato nº {row['Contrato']} - {row['Denom.tipo contrato']}",
-            'fotos': [],
-            'caracteristicas': {
-                'contratoInicio': row['Início do contrato'].isoformat() if pd.notna(row['Início do contrato']) else None,
-                'contratoFim': row['Fim da validade'].isoformat() if pd.notna(row['Fim da validade']) else None,
-                'tipoContrato': row['Denom.tipo contrato'],
-                'parceiroNegocio': str(row['Parceiro de negócios']),
-            },
-            'locadorId': locador_id,
-            'dataRegistro': row['Início do contrato'].isoformat() if pd.notna(row['Início do contrato']) else datetime.now().isoformat(),
-            'dataAtualizacao': datetime.now().isoformat()
-        }
-        
-        imoveis.append(imovel)
-        print(f"  🏢 Imóvel criado: {denominacao} (Código: {row['Contrato']})")
-        print()
-    
-    return {
-        'imoveis': imoveis,
-        'locadores': locadores,
-        'metadados': {
-            'dataImportacao': datetime.now().isoformat(),
-            'fonte': 'SAP - rel-SAP.xlsx',
-            'totalImoveis': len(imoveis),
-            'totalLocadores': len(locadores)
-        }
-    }
+    metricas = Metricas()
+    locadores = DeduplicadorLocadores(mapa_locadores)
+    validador = ValidadorPlanilha(COLUNAS_USADAS, excel_path) if validar else None
+    with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+        registros = list(converter_dados_sap(excel_path, tamanho_bloco, limite_memoria_mb, metricas=metricas,
+                                             contexto=contexto, locadores=locadores, cache=cache,
+                                             validador=validador, formato=formato))
+    rejeitadas = (validador.rejeitadas, validador.motivos) if validador is not None else ([], {})
+    return registros, metricas.etapas, metricas.contadores, locadores.novos, rejeitadas
+
+def converter_planilhas_em_paralelo(planilhas, tamanho_bloco=None, limite_memoria_mb=None, workers=None,
+                                    metricas=None, contexto=None, locadores=None, cache=None, validador=None,
+                                    formato='reis'):
+    """
+    Converte várias planilhas (uma por regional) em um pool de processos e junta
+    os resultados na ordem das planilhas, não na ordem em que os processos terminam,
+    para que a saída seja determinística. Cada worker parte do mesmo mapa de
+    locadores (locadores.caminho_mapa), então o mesmo CPF/CNPJ recebe o mesmo ID em
+    todas as planilhas e os repetidos são deduplicados pelo ID; os IDs novos voltam
+    para locadores. Imóveis do mesmo Contrato em mais de uma planilha (exportações
+    que se sobrepõem) também são deduplicados pelo ID: fica o da primeira planilha. As métricas dos workers são somadas às de metricas (tempo de
+    CPU, não de relógio). Todos os workers usam o mesmo contexto, então os
+    carimbos de data coincidem. Com validador, cada worker valida a sua planilha
+    e as linhas reprovadas são juntadas em validador.
+    """
+    metricas = metricas if metricas is not None else Metricas()
+    contexto = contexto if contexto is not None else ContextoExecucao()
+    locadores = locadores if locadores is not None else DeduplicadorLocadores()
+    imoveis_emitidos = set()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        resultados = executor.map(
+            processar_planilha, planilhas,
+            [tamanho_bloco] * len(planilhas), [limite_memoria_mb] * len(planilhas), [contexto] * len(planilhas),
+            [locadores.caminho_mapa] * len(planilhas), [cache] * len(planilhas),
+            [validador is not None] * len(planilhas), [formato] * len(planilhas)
+        )
+        for excel_path, (registros, etapas, contadores, novos, rejeitadas) in zip(planilhas, resultados):
+            metricas.incorporar(etapas, contadores)
+            locadores.incorporar(novos)
+            if validador is not None:
+                validador.incorporar(*rejeitadas)
+            total_imoveis = repetidos = 0
+            for secao, registro in registros:
+                if secao == 'locadores':
+                    if not locadores.emitir(registro['id']):
+                        metricas.contar('locadoresDeduplicados')
+                        continue
+                else:
+                    if registro['id'] in imoveis_emitidos:
+                        metricas.contar('imoveisDeduplicados')
+                        repetidos += 1
+                        continue
+                    imoveis_emitidos.add(registro['id'])
+                    total_imoveis += 1
+                yield secao, registro
+            print(f"✅ {excel_path}: {total_imoveis} imóveis"
+                  + (f" ({repetidos} já vistos em planilhas anteriores)" if repetidos else ''))
+
+def criar_cache(args):
+    """CachePlanilha configurado pelos argumentos, ou None com --sem-cache"""
+    if args.sem_cache:
+        return None
+    return CachePlanilha(args.diretorio_cache, args.limite_cache_mb, atualizar=args.atualizar_cache)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Importa rel-SAP.xlsx para o formato do SILIC 2.0')
+    parser.add_argument('--entrada', default='public/rel-SAP.xlsx',
+                        help='Planilha SAP de entrada, diretório ou padrão glob (ex.: "regionais/*.xlsx")')
+    parser.add_argument('--saida', default='public/dados-sap.json', help='Arquivo JSON de saída')
+    parser.add_argument('--formato', choices=FORMATOS, default='reis',
+                        help='Estrutura dos registros: reis (REISCNBP + REISBU, lida pelo SAPDataLoader) '
+                             'ou prototipo (formato plano anterior) (padrão: reis)')
+    parser.add_argument('--compacto', action='store_true',
+                        help='Grava o JSON sem indentação (produção)')
+    parser.add_argument('--tamanho-bloco', type=int, default=None,
+                        help='Lê o xlsx em blocos de N linhas, sem carregar a aba inteira')
+    parser.add_argument('--limite-memoria-mb', type=float, default=None,
+                        help='Reduz o tamanho do bloco para que cada bloco caiba neste limite')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Reprocessa apenas os contratos novos ou alterados desde a última execução')
+    parser.add_argument('--arquivo-impressoes', default='.cache/import-sap/impressoes.json',
+                        help='Onde guardar as impressões digitais por contrato (modo incremental)')
+    parser.add_argument('--mapa-locadores', default=CAMINHO_MAPA_PADRAO,
+                        help='Mapa documento/nome -> ID dos locadores mantido entre execuções '
+                             f'(padrão: {CAMINHO_MAPA_PADRAO})')
+    parser.add_argument('--sem-mapa-locadores', action='store_true',
+                        help='Não lê nem grava o mapa de IDs dos locadores')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Processos usados com várias planilhas (padrão: número de CPUs)')
+    parser.add_argument('--verboso', action='store_true',
+                        help='Imprime uma linha por registro processado')
+    parser.add_argument('--sem-validacao', action='store_true',
+                        help='Não valida as linhas (CPF/CNPJ, CEP, UF, datas) nem grava <saida>.rejeitados.csv')
+    parser.add_argument('--sem-cache', action='store_true',
+                        help='Lê sempre o xlsx, sem usar nem gravar o cache da planilha interpretada')
+    parser.add_argument('--atualizar-cache', action='store_true',
+                        help='Relê o xlsx mesmo que ele esteja no cache e regrava a entrada')
+    parser.add_argument('--diretorio-cache', default=DIRETORIO_PADRAO,
+                        help=f'Onde guardar as planilhas interpretadas (padrão: {DIRETORIO_PADRAO})')
+    parser.add_argument('--limite-cache-mb', type=float, default=LIMITE_PADRAO_MB,
+                        help=f'Tamanho máximo do diretório do cache; as entradas mais antigas são apagadas '
+                             f'(padrão: {LIMITE_PADRAO_MB})')
+    parser.add_argument('--silencioso', action='store_true',
+                        help='Não exibe o progresso durante a importação')
+    parser.add_argument('--sem-indice', action='store_true',
+                        help='Não grava o índice auxiliar (<saida>.indice.json) usado pelo front-end')
+    parser.add_argument('--sem-vencimentos', action='store_true',
+                        help='Não grava a linha do tempo de vencimentos (<saida>.vencimentos.json) '
+                             'usada pelo relatorio-vencimentos')
+    parser.add_argument('--paginar', type=int, default=None, metavar='N',
+                        help='Também grava páginas de N registros em <saida>/ e o manifesto <saida>.manifesto.json')
+    parser.add_argument('--paginar-por', choices=AGRUPAMENTOS, default='registros',
+                        help='Agrupa as páginas de imóveis só por quantidade ou por estado (padrão: registros)')
+    parser.add_argument('--colunar', action='store_true',
+                        help='Também grava <saida>.colunar.json, formato colunar compacto (ver silic_dados.colunar)')
+    parser.add_argument('--sqlite', action='store_true',
+                        help='Também grava o banco SQLite (ex.: public/dados-sap.sqlite) com as tabelas contrato, edificio '
+                             'e locador (ver silic_dados.banco)')
+    parser.add_argument('--data-execucao', type=data_execucao, default=None,
+                        help='Instante usado nas datas de registro e no status por vencimento (ISO; padrão: agora), '
+                             'para gerar o mesmo JSON em execuções repetidas')
+    parser.add_argument('--resumo-json', default=None,
+                        help='Grava em JSON o tempo por etapa e os contadores da execução')
+    args = parser.parse_args()
+    if args.sqlite and args.formato != 'reis':
+        parser.error('--sqlite só se aplica a --formato reis')
+    return args
 
 def main():
     """Função principal"""
@@ -178,36 +223,128 @@ def main():
     print("=" * 80)
     print()
     
-    excel_path = 'public/rel-SAP.xlsx'
-    output_path = 'public/dados-sap.json'
+    args = parse_args()
+    excel_path = args.entrada
+    output_path = args.saida
+    planilhas = listar_planilhas(excel_path)
+    
+    if not planilhas:
+        print(f"❌ Erro: Nenhuma planilha encontrada em {excel_path}")
+        return
+    if len(planilhas) > 1 and args.incremental:
+        print("❌ Erro: O modo incremental aceita apenas uma planilha por vez")
+        return
     
     try:
-        # Converter dados
-        dados = converter_dados_sap(excel_path)
+        # Converter dados, gravando cada registro assim que é produzido
+        tipos = {}
+        status_list = {}
         
-        # Salvar JSON
-        print("💾 Salvando dados convertidos...")
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(dados, f, ensure_ascii=False, indent=2)
+        metricas = Metricas()
+        contexto = ContextoExecucao(args.data_execucao)
+        cache_planilha = criar_cache(args)
+        validador = None if args.sem_validacao else ValidadorPlanilha(COLUNAS_USADAS, planilhas[0])
+        locadores = DeduplicadorLocadores(None if args.sem_mapa_locadores else args.mapa_locadores)
+        
+        indice = None if args.sem_indice else IndiceDados()
+        paginas = EscritorPaginado(output_path, args.paginar, args.paginar_por) if args.paginar else None
+        colunar = EscritorColunar(output_path) if args.colunar else None
+        vencimentos = None if args.sem_vencimentos else IndiceVencimentos(output_path)
+        banco = EscritorSQLite(output_path) if args.sqlite else None
+        with EscritorJSONIncremental(output_path, compacto=args.compacto, indice=indice,
+                                     paginas=paginas, colunar=colunar,
+                                     vencimentos=vencimentos, banco=banco) as escritor:
+            incremental = None
+            if args.incremental:
+                with metricas.medir('leitura'):
+                    incremental = EstadoIncremental(args.arquivo_impressoes, output_path, contexto)
+                if incremental.aviso:
+                    print(f"⚠️  {incremental.aviso}: reprocessando todos os contratos\n")
+            progresso = RelatorioProgresso(metricas=metricas, ativo=not (args.silencioso or args.verboso))
+            if len(planilhas) > 1:
+                print(f"📂 {len(planilhas)} planilhas encontradas, processando em paralelo...\n")
+                registros = converter_planilhas_em_paralelo(
+                    planilhas, args.tamanho_bloco, args.limite_memoria_mb, args.workers, metricas, contexto,
+                    locadores, cache_planilha, validador, args.formato
+                )
+            else:
+                registros = converter_dados_sap(
+                    planilhas[0], args.tamanho_bloco, args.limite_memoria_mb, incremental,
+                    metricas, args.verboso, progresso, contexto, locadores, cache_planilha, validador,
+                    args.formato
+                )
+            
+            def contabilizar(secao, registro):
+                if secao == 'imoveis':
+                    tipos[registro['tipo']] = tipos.get(registro['tipo'], 0) + 1
+                    status_list[registro['status']] = status_list.get(registro['status'], 0) + 1
+                    progresso.avancar()
+            
+            gravar(registros, escritor, metricas, contabilizar)
+            progresso.concluir()
+            
+            print("💾 Salvando dados convertidos...")
+            fonte = 'SAP - ' + ', '.join(os.path.basename(p) for p in planilhas)
+            if args.formato == 'reis':
+                metadados = metadados_reis(contexto.carimbo, fonte, escritor.contagens['imoveis'],
+                                           escritor.contagens['locadores'])
+            else:
+                metadados = {
+                    'dataImportacao': contexto.carimbo,
+                    'fonte': fonte,
+                    'totalImoveis': escritor.contagens['imoveis'],
+                    'totalLocadores': escritor.contagens['locadores']
+                }
+            with metricas.medir('escrita'):
+                escritor.finalizar(metadados)
+        if incremental is not None:
+            incremental.salvar()
+        mapa_locadores = locadores.salvar()
+        rejeitados = None
+        if validador is not None:
+            rejeitados = validador.gravar(output_path)
+            validador.registrar(metricas)
+        metricas.contar('imoveis', metadados['totalImoveis'])
+        metricas.contar('locadores', metadados['totalLocadores'])
         
         print(f"✅ Arquivo salvo: {output_path}")
+        if escritor.caminho_indice:
+            print(f"🗂️  Índice salvo: {escritor.caminho_indice}")
+        if escritor.caminho_manifesto:
+            print(f"📑 Manifesto das páginas: {escritor.caminho_manifesto}")
+        if escritor.caminho_colunar:
+            print(f"🧱 Formato colunar: {escritor.caminho_colunar}")
+        if escritor.caminho_vencimentos:
+            print(f"⏳ Linha do tempo de vencimentos: {escritor.caminho_vencimentos}")
+        if escritor.caminho_banco:
+            print(f"🗄️  Banco SQLite: {escritor.caminho_banco}")
+        if mapa_locadores:
+            print(f"🪪 Mapa de IDs dos locadores: {mapa_locadores}")
+        if rejeitados:
+            print(f"🚫 Linhas rejeitadas na validação: {validador.total_rejeitadas} (ver {rejeitados})")
+            for linha in descrever_rejeitadas(metricas.contadores):
+                print(f"   • {linha}")
         print()
+        if incremental is not None:
+            print("🔁 Importação incremental:")
+            print(f"   • Novos: {incremental.novos}")
+            print(f"   • Alterados: {incremental.alterados}")
+            print(f"   • Inalterados: {incremental.inalterados}")
+            print(f"   • Removidos: {incremental.removidos}")
+            print()
         print("=" * 80)
         print("📊 RESUMO DA IMPORTAÇÃO")
         print("=" * 80)
-        print(f"✅ Imóveis importados: {dados['metadados']['totalImoveis']}")
-        print(f"✅ Locadores importados: {dados['metadados']['totalLocadores']}")
-        print(f"📅 Data da importação: {dados['metadados']['dataImportacao']}")
+        print(f"✅ Imóveis importados: {metadados['totalImoveis']}")
+        print(f"✅ Locadores importados: {metadados['totalLocadores']}")
+        if metricas.contadores.get('imoveisDeduplicados'):
+            print(f"♻️  Imóveis repetidos entre planilhas (mantido o da primeira): "
+                  f"{metricas.contadores['imoveisDeduplicados']}")
+        print(f"📅 Data da importação: {contexto.carimbo}")
         print()
         
         # Mostrar estatísticas detalhadas
         print("📈 ESTATÍSTICAS DOS IMÓVEIS:")
-        tipos = {}
-        status_list = {}
-        
-        for imovel in dados['imoveis']:
-            tipos[imovel['tipo']] = tipos.get(imovel['tipo'], 0) + 1
-            status_list[imovel['status']] = status_list.get(imovel['status'], 0) + 1
         
         print("\nPor tipo:")
         for tipo, count in tipos.items():
@@ -217,6 +354,16 @@ def main():
         for status, count in status_list.items():
             print(f"  • {status.capitalize()}: {count}")
         
+        cache = descrever_cache(metricas.contadores)
+        if cache:
+            print(f"\n🧠 Cache de denominações: {cache}")
+        
+        print()
+        metricas.imprimir()
+        if args.resumo_json:
+            metricas.salvar(args.resumo_json)
+            print(f"   • Resumo em JSON: {args.resumo_json}")
+        
         print()
         print("=" * 80)
         print("🎉 IMPORTAÇÃO CONCLUÍDA COM SUCESSO!")
@@ -224,6 +371,8 @@ def main():
         
     except FileNotFoundError:
         print(f"❌ Erro: Arquivo {excel_path} não encontrado!")
+    except ErroValidacao as e:
+        print(f"❌ {e}")
     except Exception as e:
         print(f"❌ Erro durante importação: {str(e)}")
         import traceback
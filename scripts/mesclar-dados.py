@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Aplica uma nova importação do SAP sobre o dados-sap.json existente, preservando os
+campos que o SAP não fornece (ver silic_dados.mesclagem) e gravando o log de mudanças
+
+Exemplo:
+    # Importa para um arquivo temporário e mescla no dataset publicado
+    python3 scripts/import-sap-data.py --saida /tmp/importacao.json
+    python3 scripts/mesclar-dados.py --importacao /tmp/importacao.json --existente public/dados-sap.json
+"""
+
+import argparse
+import json
+import os
+
+from silic_dados import EscritorJSONIncremental, IndiceDados, IndiceVencimentos, MesclagemDados, Metricas
+from silic_dados.mesclagem import CAMPOS_PRESERVADOS, LogMudancas
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Mescla uma nova importação do SAP com o dados-sap.json existente')
+    parser.add_argument('--existente', default='public/dados-sap.json',
+                        help='Dataset atual, com as edições manuais (padrão: public/dados-sap.json)')
+    parser.add_argument('--importacao', required=True,
+                        help='JSON gerado pela nova importação (import-sap-data ou converter-excel-para-json)')
+    parser.add_argument('--saida', default=None,
+                        help='Arquivo JSON mesclado (padrão: sobrescreve o --existente)')
+    parser.add_argument('--log', default=None,
+                        help='Log de mudanças em JSON Lines (padrão: <saida sem .json>.mudancas.jsonl)')
+    parser.add_argument('--preservar', action='append', default=[], metavar='CAMPO',
+                        help='Campo a preservar além dos padrões, repetível; aceita caminhos com pontos '
+                             '(ex.: edificio.estadoConservacao). Padrões: '
+                             + '; '.join(f"{secao}: {', '.join(campos)}" for secao, campos in CAMPOS_PRESERVADOS.items()))
+    parser.add_argument('--remover-ausentes', action='store_true',
+                        help='Remove os imóveis e locadores que não vieram na importação (padrão: mantém)')
+    parser.add_argument('--compacto', action='store_true',
+                        help='Grava o JSON sem indentação (produção)')
+    parser.add_argument('--sem-indice', action='store_true',
+                        help='Não grava o índice auxiliar (<saida>.indice.json) usado pelo front-end')
+    parser.add_argument('--sem-vencimentos', action='store_true',
+                        help='Não grava a linha do tempo de vencimentos (<saida>.vencimentos.json) '
+                             'usada pelo relatorio-vencimentos')
+    return parser.parse_args()
+
+
+def carregar(caminho):
+    with open(caminho, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    args = parse_args()
+    saida = args.saida or args.existente
+    caminho_log = args.log or f"{os.path.splitext(saida)[0]}.mudancas.jsonl"
+    preservados = {secao: tuple(campos) + tuple(args.preservar) for secao, campos in CAMPOS_PRESERVADOS.items()}
+    metricas = Metricas()
+
+    try:
+        with metricas.medir('leitura'):
+            existente = carregar(args.existente) if os.path.exists(args.existente) else {}
+            importacao = carregar(args.importacao)
+    except FileNotFoundError:
+        print(f"❌ Erro: Arquivo {args.importacao} não encontrado!")
+        return
+    if not existente:
+        print(f"⚠️  {args.existente} não existe: o resultado será a própria importação")
+
+    log = LogMudancas(caminho_log)
+    try:
+        with metricas.medir('indexacao'):
+            mesclagem = MesclagemDados(existente, preservados, args.remover_ausentes, log)
+        indice = None if args.sem_indice else IndiceDados()
+        vencimentos = None if args.sem_vencimentos else IndiceVencimentos(saida)
+        with EscritorJSONIncremental(saida, compacto=args.compacto, indice=indice,
+                                     vencimentos=vencimentos) as escritor:
+            for secao, registro in metricas.iterar('mesclagem', mesclagem.mesclar(importacao)):
+                with metricas.medir('escrita'):
+                    escritor.escrever(secao, registro)
+            metadados = importacao.get('metadados')
+            if isinstance(metadados, dict):
+                for campo, secao in (('totalImoveis', 'imoveis'), ('totalLocadores', 'locadores')):
+                    if campo in metadados:
+                        metadados[campo] = escritor.contagens[secao]
+            with metricas.medir('escrita'):
+                escritor.finalizar(metadados)
+    finally:
+        log.fechar()
+
+    print(f"✅ Dataset mesclado: {saida}")
+    for secao, rotulo in (('imoveis', 'Imóveis'), ('locadores', 'Locadores')):
+        contagem = mesclagem.contagens[secao]
+        print(f"   • {rotulo}: {escritor.contagens[secao]:,} — {contagem['inseridos']:,} inseridos, "
+              f"{contagem['atualizados']:,} atualizados, {contagem['inalterados']:,} inalterados, "
+              + (f"{contagem['removidos']:,} removidos" if args.remover_ausentes
+                 else f"{contagem['mantidos']:,} mantidos sem vir na importação"))
+    print(f"   • Campos preservados do dataset atual: {mesclagem.campos_preservados:,}")
+    if mesclagem.ids_locador:
+        print(f"   • Locadores com o ID existente mantido: {len(mesclagem.ids_locador):,}")
+    print(f"📝 Log de mudanças: {caminho_log}")
+    print()
+    metricas.imprimir()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Relatório de contratos a vencer a partir da linha do tempo de vencimentos
+(<saida>.vencimentos.json, gravada pelos importadores; ver silic_dados.vencimentos)
+
+Exemplos:
+    # Contratos que vencem nos próximos 90 dias
+    python3 scripts/relatorio-vencimentos.py --dias 90
+
+    # Janela de 30 dias a partir de 01/07/2025, com as rescisões programadas e o status recalculado
+    python3 scripts/relatorio-vencimentos.py --dias 30 --data-referencia 2025-07-01 --rescisoes --recalcular-status
+"""
+
+import argparse
+import json
+from collections import Counter
+from datetime import date, timedelta
+
+from silic_dados import IndiceVencimentos, Metricas
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Lista os contratos que vencem nos próximos N dias')
+    parser.add_argument('--dados', default='public/dados-sap.json',
+                        help='dados-sap.json cuja linha do tempo (<dados>.vencimentos.json) será consultada')
+    parser.add_argument('--dias', type=int, default=90,
+                        help='Tamanho da janela, em dias a partir da data de referência (padrão: 90)')
+    parser.add_argument('--data-referencia', type=date.fromisoformat, default=None,
+                        help='Início da janela e data do status recalculado (AAAA-MM-DD; padrão: hoje)')
+    parser.add_argument('--rescisoes', action='store_true',
+                        help='Também lista as rescisões programadas dentro da janela')
+    parser.add_argument('--recalcular-status', action='store_true',
+                        help='Recalcula o status de todos os contratos na data de referência '
+                             'e mostra os que mudam em relação ao gravado')
+    parser.add_argument('--limite', type=int, default=20,
+                        help='Máximo de contratos listados em cada seção (0 para todos; padrão: 20)')
+    parser.add_argument('--json', action='store_true',
+                        help='Imprime o resultado em JSON, sem tabela nem tempos')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    referencia = args.data_referencia or date.today()
+    ate = referencia + timedelta(days=args.dias)
+    metricas = Metricas()
+    try:
+        with metricas.medir('leitura'):
+            linha_do_tempo = IndiceVencimentos.carregar(args.dados)
+    except FileNotFoundError:
+        print(f"❌ Erro: Arquivo {args.dados} não encontrado!")
+        return
+
+    with metricas.medir('consulta'):
+        vencendo = linha_do_tempo.vencendo(referencia, args.dias)
+        rescindindo = linha_do_tempo.rescindindo(referencia, ate) if args.rescisoes else None
+    mudancas = None
+    if args.recalcular_status:
+        with metricas.medir('status'):
+            mudancas = linha_do_tempo.mudancas_status(referencia)
+
+    if args.json:
+        resultado = {
+            'dataReferencia': referencia.isoformat(),
+            'ate': ate.isoformat(),
+            'totalContratos': len(linha_do_tempo),
+            'vencendo': [{'contrato': c, 'fimValidade': fim.isoformat(), 'status': s} for c, fim, s in vencendo],
+        }
+        if rescindindo is not None:
+            resultado['rescindindo'] = [
+                {'contrato': c, 'rescisaoEm': dia.isoformat() if dia else None} for c, dia in rescindindo
+            ]
+        if mudancas is not None:
+            resultado['mudancasStatus'] = [
+                {'contrato': c, 'statusGravado': antes, 'statusNaReferencia': depois} for c, antes, depois in mudancas
+            ]
+        print(json.dumps(resultado, ensure_ascii=False, indent=2))
+        return
+
+    limite = args.limite or None
+    print(f"📅 Referência: {referencia.strftime('%d/%m/%Y')} — janela de {args.dias} dias "
+          f"(até {ate.strftime('%d/%m/%Y')}), {len(linha_do_tempo):,} contratos")
+    print(f"⏳ {len(vencendo):,} contratos vencem na janela")
+    if vencendo:
+        por_mes = Counter(fim.strftime('%m/%Y') for _, fim, _ in vencendo)
+        print(f"   Por mês: {', '.join(f'{mes}: {n}' for mes, n in por_mes.items())}")
+        for contrato, fim, status in vencendo[:limite]:
+            print(f"   • {contrato}  {fim.strftime('%d/%m/%Y')}  {status or '—'}")
+        if limite and len(vencendo) > limite:
+            print(f"   ... e mais {len(vencendo) - limite:,}")
+
+    if rescindindo is not None:
+        print(f"\n🧾 {len(rescindindo):,} rescisões programadas na janela")
+        for contrato, dia in rescindindo[:limite]:
+            print(f"   • {contrato}  {dia.strftime('%d/%m/%Y') if dia else '—'}")
+        if limite and len(rescindindo) > limite:
+            print(f"   ... e mais {len(rescindindo) - limite:,}")
+
+    if mudancas is not None:
+        print(f"\n🔄 Status recalculado em {referencia.strftime('%d/%m/%Y')}: {len(mudancas):,} contratos mudam")
+        for (antes, depois), n in Counter((antes, depois) for _, antes, depois in mudancas).most_common():
+            print(f"   • {antes or '—'} → {depois}: {n:,}")
+    print()
+    metricas.imprimir()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,24 @@
+"""
+Rotinas compartilhadas pelos scripts de dados do SILIC (importadores SAP e gerador de mocks)
+
+Só os módulos que usam apenas a biblioteca padrão são reexportados aqui; os que
+dependem de pandas/openpyxl (ex.: silic_dados.leitura_xlsx) são importados pelo
+caminho completo, para que o gerador de mocks continue rodando sem essas dependências.
+"""
+
+from .banco import EscritorSQLite, caminho_banco
+from .colunar import EscritorColunar, caminho_colunar, ler_colunar, ler_colunas
+from .escrita_json import EscritorFragmentos, EscritorJSONIncremental
+from .indice import IndiceDados, caminho_indice
+from .locadores import DeduplicadorLocadores
+from .mesclagem import MesclagemDados
+from .paginacao import EscritorPaginado, caminho_manifesto
+from .progresso import Metricas, RelatorioProgresso
+from .vencimentos import IndiceVencimentos, caminho_vencimentos
+
+__all__ = [
+    'DeduplicadorLocadores', 'EscritorColunar', 'EscritorFragmentos', 'EscritorJSONIncremental', 'EscritorPaginado',
+    'EscritorSQLite', 'IndiceDados', 'IndiceVencimentos', 'MesclagemDados', 'Metricas', 'RelatorioProgresso',
+    'caminho_banco', 'caminho_colunar', 'caminho_indice', 'caminho_manifesto', 'caminho_vencimentos', 'ler_colunar',
+    'ler_colunas',
+]
@@ -0,0 +1,37 @@
+"""
+Gravação atômica dos arquivos auxiliares (índice, manifesto, colunar, vencimentos, mapas)
+
+O conteúdo é gravado num temporário no mesmo diretório do destino e movido por cima
+dele com os.replace, então quem lê o destino vê o arquivo antigo ou o novo inteiro,
+nunca um pela metade. Se a gravação falha, o temporário é apagado.
+"""
+
+import os
+import tempfile
+
+
+def permissoes_usuais(caminho: str, modo: int = 0o666):
+    """NamedTemporaryFile/mkdtemp criam com 0600/0700; aplica as permissões usuais (umask)"""
+    umask = os.umask(0)
+    os.umask(umask)
+    os.chmod(caminho, modo & ~umask)
+
+
+def gravar_atomico(destino: str, texto: str) -> str:
+    """Grava texto (UTF-8) em destino de forma atômica e devolve destino"""
+    diretorio = os.path.dirname(os.path.abspath(destino))
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=diretorio, suffix='.tmp', delete=False) as tmp:
+        try:
+            tmp.write(texto)
+        except BaseException:
+            tmp.close()
+            os.remove(tmp.name)
+            raise
+    try:
+        permissoes_usuais(tmp.name)
+        os.replace(tmp.name, destino)
+    except BaseException:
+        if os.path.exists(tmp.name):
+            os.remove(tmp.name)
+        raise
+    return destino
@@ -0,0 +1,274 @@
+"""
+Banco SQLite do portfólio (<saida>.sqlite)
+
+Alternativa ao dados-sap.json para quem não quer carregar o arquivo inteiro: os
+imóveis na estrutura REISCNBP + REISBU viram as tabelas contrato e edificio (1:1,
+pela posição do imóvel) e os locadores a tabela locador, com chave estrangeira
+contrato.locadorId -> locador.id e índices nos campos mais consultados (número do
+contrato, locador, parceiro de negócios, UF, cidade, status, fim da validade,
+CPF/CNPJ). O parceiroNegocio é só indexado: um locador deduplicado pelo CPF/CNPJ
+pode aparecer com mais de um parceiro de negócios no SAP.
+
+EscritorSQLite grava o banco junto com o JSON (EscritorJSONIncremental): inserções
+em lotes com executemany, numa única transação num arquivo temporário que substitui
+o destino no final, já em modo WAL para leitores concorrentes. As colunas de dados
+não declaram tipo, então o SQLite guarda cada valor como veio (inteiro, real ou
+texto) e iterar_banco devolve os mesmos registros, na mesma ordem, para reexportar
+o JSON que o front-end lê.
+"""
+
+import json
+import os
+import sqlite3
+from typing import Dict, Iterator, List, Optional, Tuple
+
+VERSAO_BANCO = 1
+
+# Campo do imóvel (na ordem do JSON) -> (tabela, coluna)
+CAMPOS_IMOVEL = (
+    ('id', 'contrato', 'imovelId'),
+    ('contrato.numero', 'contrato', 'numero'),
+    ('contrato.denominacao', 'contrato', 'denominacao'),
+    ('contrato.tipoContrato', 'contrato', 'tipoContrato'),
+    ('contrato.inicioContrato', 'contrato', 'inicioContrato'),
+    ('contrato.fimValidade', 'contrato', 'fimValidade'),
+    ('contrato.rescisaoEm', 'contrato', 'rescisaoEm'),
+    ('contrato.parceiroNegocio', 'contrato', 'parceiroNegocio'),
+    ('edificio.codigo', 'edificio', 'codigo'),
+    ('edificio.denominacao', 'edificio', 'denominacao'),
+    ('edificio.status', 'edificio', 'status'),
+    ('edificio.cep', 'edificio', 'cep'),
+    ('edificio.local', 'edificio', 'local'),
+    ('edificio.rua', 'edificio', 'rua'),
+    ('edificio.numero', 'edificio', 'numero'),
+    ('edificio.bairro', 'edificio', 'bairro'),
+    ('edificio.regiao', 'edificio', 'regiao'),
+    ('edificio.inicioValidadeObj', 'edificio', 'inicioValidadeObj'),
+    ('edificio.objetoValidoAte', 'edificio', 'objetoValidoAte'),
+    ('edificio.tipoEdificio.codigo', 'edificio', 'tipoEdificioCodigo'),
+    ('edificio.tipoEdificio.nome', 'edificio', 'tipoEdificioNome'),
+    ('edificio.criadoPor', 'edificio', 'criadoPor'),
+    ('edificio.chavePais', 'edificio', 'chavePais'),
+    ('edificio.endereco', 'edificio', 'endereco'),
+    ('edificio.estadoConservacao', 'edificio', 'estadoConservacao'),
+    ('edificio.funcao.codigo', 'edificio', 'funcaoCodigo'),
+    ('edificio.funcao.nome', 'edificio', 'funcaoNome'),
+    ('edificio.denominacaoImovel', 'edificio', 'denominacaoImovel'),
+    ('edificio.utilizacaoPrincipal', 'edificio', 'utilizacaoPrincipal'),
+    ('edificio.tipoApolice', 'edificio', 'tipoApolice'),
+    ('edificio.inscricaoIPTU', 'edificio', 'inscricaoIPTU'),
+    ('edificio.numeroITR', 'edificio', 'numeroITR'),
+    ('edificio.grupoAutorizacoes', 'edificio', 'grupoAutorizacoes'),
+    ('locadorId', 'contrato', 'locadorId'),
+    ('tipo', 'contrato', 'tipo'),
+    ('status', 'contrato', 'status'),
+)
+
+# Campo do locador (na ordem do JSON) -> coluna da tabela locador
+CAMPOS_LOCADOR = (
+    ('id', 'id'),
+    ('parceiroNegocio', 'parceiroNegocio'),
+    ('tipoIdFiscal', 'tipoIdFiscal'),
+    ('numeroIdFiscal', 'numeroIdFiscal'),
+    ('nome', 'nome'),
+    ('nomeEndereco', 'nomeEndereco'),
+    ('funcaoPN', 'funcaoPN'),
+    ('tipo', 'tipo'),
+    ('endereco.rua', 'enderecoRua'),
+    ('endereco.numero', 'enderecoNumero'),
+    ('endereco.bairro', 'enderecoBairro'),
+    ('endereco.cidade', 'enderecoCidade'),
+    ('endereco.regiao', 'enderecoRegiao'),
+    ('endereco.cep', 'enderecoCep'),
+    ('email', 'email'),
+    ('telefone', 'telefone'),
+    ('telefoneCelular', 'telefoneCelular'),
+    ('inicioRelacao', 'inicioRelacao'),
+    ('fimRelacao', 'fimRelacao'),
+    ('status', 'status'),
+)
+
+CHAVES_DECLARADAS = {
+    'locador': {'id': 'TEXT NOT NULL UNIQUE'},
+    'contrato': {
+        'imovelId': 'TEXT NOT NULL',
+        'locadorId': 'TEXT REFERENCES locador(id) DEFERRABLE INITIALLY DEFERRED',
+    },
+}
+
+INDICES = (
+    ('contrato', 'imovelId'), ('contrato', 'numero'), ('contrato', 'locadorId'), ('contrato', 'parceiroNegocio'),
+    ('contrato', 'fimValidade'), ('contrato', 'status'),
+    ('edificio', 'regiao'), ('edificio', 'local'), ('edificio', 'status'),
+    ('locador', 'numeroIdFiscal'), ('locador', 'parceiroNegocio'),
+)
+
+TAMANHO_LOTE = 5000
+
+
+def caminho_banco(caminho_dados: str) -> str:
+    """public/dados-sap.json -> public/dados-sap.sqlite"""
+    return f"{os.path.splitext(caminho_dados)[0]}.sqlite"
+
+
+def _colunas(tabela: str) -> List[str]:
+    if tabela == 'locador':
+        return [coluna for _, coluna in CAMPOS_LOCADOR]
+    return [coluna for _, t, coluna in CAMPOS_IMOVEL if t == tabela]
+
+
+def _criar_tabelas(conexao: sqlite3.Connection):
+    for tabela in ('locador', 'contrato', 'edificio'):
+        declaradas = CHAVES_DECLARADAS.get(tabela, {})
+        colunas = [f"{coluna} {declaradas.get(coluna, '')}".rstrip() for coluna in _colunas(tabela)]
+        if tabela == 'edificio':
+            # imovelId repete o do contrato para consultas sem junção
+            primeira = ['posicao INTEGER PRIMARY KEY REFERENCES contrato(posicao)', 'imovelId TEXT NOT NULL']
+        else:
+            primeira = ['posicao INTEGER PRIMARY KEY']
+        conexao.execute(f"CREATE TABLE {tabela} ({', '.join(primeira + colunas)})")
+    conexao.execute("CREATE TABLE metadados (versao INTEGER NOT NULL, dados TEXT)")
+
+
+def _valor(registro: Dict, caminho: str):
+    for chave in caminho.split('.'):
+        registro = registro[chave]
+    return registro
+
+
+class EscritorSQLite:
+    """Acumula os registros em lotes e grava <saida>.sqlite numa única transação"""
+
+    def __init__(self, caminho_dados: str, tamanho_lote: int = TAMANHO_LOTE):
+        self.caminho = caminho_banco(caminho_dados)
+        self.tamanho_lote = tamanho_lote
+        self.contagens = {'imoveis': 0, 'locadores': 0}
+        self._tmp = f"{self.caminho}.tmp"
+        for resto in (self._tmp, f"{self._tmp}-wal", f"{self._tmp}-shm"):
+            if os.path.exists(resto):
+                os.remove(resto)
+        self._conexao = sqlite3.connect(self._tmp, isolation_level=None)
+        self._conexao.execute('PRAGMA journal_mode=WAL')
+        self._conexao.execute('PRAGMA synchronous=NORMAL')
+        self._conexao.execute('PRAGMA foreign_keys=ON')
+        self._conexao.execute('BEGIN')
+        _criar_tabelas(self._conexao)
+        self._pendentes: Dict[str, List[tuple]] = {'locador': [], 'contrato': [], 'edificio': []}
+        self._campos = {
+            tabela: [campo for campo, t, _ in CAMPOS_IMOVEL if t == tabela] for tabela in ('contrato', 'edificio')
+        }
+        self._campos['locador'] = [campo for campo, _ in CAMPOS_LOCADOR]
+        self._insercoes = {}
+        for tabela in self._pendentes:
+            colunas = ['posicao'] + (['imovelId'] if tabela == 'edificio' else []) + _colunas(tabela)
+            self._insercoes[tabela] = (
+                f"INSERT INTO {tabela} ({', '.join(colunas)}) VALUES ({', '.join('?' * len(colunas))})"
+            )
+
+    def escrever(self, secao: str, registro: Dict):
+        try:
+            if secao == 'locadores':
+                posicao = self.contagens['locadores']
+                self._pendentes['locador'].append((posicao, *(_valor(registro, c) for c in self._campos['locador'])))
+            else:
+                posicao = self.contagens['imoveis']
+                self._pendentes['contrato'].append((posicao, *(_valor(registro, c) for c in self._campos['contrato'])))
+                self._pendentes['edificio'].append(
+                    (posicao, registro['id'], *(_valor(registro, c) for c in self._campos['edificio']))
+                )
+        except (KeyError, TypeError):
+            raise ValueError(
+                f"Registro {registro.get('id')} de '{secao}' fora da estrutura REISCNBP + REISBU; "
+                "o banco SQLite só aceita esse formato"
+            ) from None
+        self.contagens[secao] += 1
+        if len(self._pendentes['locador']) + len(self._pendentes['contrato']) >= self.tamanho_lote:
+            self._descarregar()
+
+    def _descarregar(self):
+        for tabela, linhas in self._pendentes.items():
+            if linhas:
+                self._conexao.executemany(self._insercoes[tabela], linhas)
+                linhas.clear()
+
+    def finalizar(self, metadados: Optional[Dict] = None) -> str:
+        """Cria os índices, confirma a transação e move o banco para o destino"""
+        self._descarregar()
+        for tabela, coluna in INDICES:
+            self._conexao.execute(f"CREATE INDEX idx_{tabela}_{coluna} ON {tabela} ({coluna})")
+        self._conexao.execute("INSERT INTO metadados (versao, dados) VALUES (?, ?)",
+                              (VERSAO_BANCO, json.dumps(metadados, ensure_ascii=False)))
+        try:
+            self._conexao.execute('COMMIT')
+        except sqlite3.IntegrityError as erro:
+            self.descartar()
+            raise ValueError(f"Banco SQLite não gravado: {erro} (imóvel com locadorId sem locador)") from erro
+        self._conexao.execute('ANALYZE')
+        # Fechar a última conexão faz o checkpoint do WAL no arquivo principal
+        self._conexao.close()
+        for resto in (f"{self.caminho}-wal", f"{self.caminho}-shm"):
+            if os.path.exists(resto):
+                os.remove(resto)
+        os.replace(self._tmp, self.caminho)
+        return self.caminho
+
+    def descartar(self):
+        """Desfaz a transação e remove o arquivo temporário"""
+        if self._conexao.in_transaction:
+            self._conexao.execute('ROLLBACK')
+        self._conexao.close()
+        for resto in (self._tmp, f"{self._tmp}-wal", f"{self._tmp}-shm"):
+            if os.path.exists(resto):
+                os.remove(resto)
+
+
+def _montar(pares: List[Tuple[str, object]]) -> Dict:
+    """Registro aninhado a partir de (campo com pontos, valor), na ordem dos campos"""
+    registro: Dict = {}
+    for campo, valor in pares:
+        *caminho, chave = campo.split('.')
+        destino = registro
+        for parte in caminho:
+            destino = destino.setdefault(parte, {})
+        destino[chave] = valor
+    return registro
+
+
+def conectar(caminho: str) -> sqlite3.Connection:
+    """Conexão de leitura a um banco gravado por EscritorSQLite, conferindo a versão"""
+    if not os.path.exists(caminho):
+        raise FileNotFoundError(caminho)
+    conexao = sqlite3.connect(caminho)
+    versao = conexao.execute("SELECT versao FROM metadados").fetchone()
+    if versao is None or versao[0] != VERSAO_BANCO:
+        conexao.close()
+        raise ValueError(f"{caminho}: versão {versao and versao[0]} do banco não suportada")
+    return conexao
+
+
+def ler_metadados(conexao: sqlite3.Connection) -> Optional[Dict]:
+    return json.loads(conexao.execute("SELECT dados FROM metadados").fetchone()[0])
+
+
+def iterar_banco(conexao: sqlite3.Connection, tamanho_lote: int = TAMANHO_LOTE) -> Iterator[Tuple[str, Dict]]:
+    """(seção, registro) de cada imóvel e locador, na ordem em que foram gravados"""
+    selecionadas = ', '.join(f"{tabela[0]}.{coluna}" for _, tabela, coluna in CAMPOS_IMOVEL)
+    campos = [campo for campo, _, _ in CAMPOS_IMOVEL]
+    cursor = conexao.execute(
+        f"SELECT {selecionadas} FROM contrato c JOIN edificio e ON e.posicao = c.posicao ORDER BY c.posicao"
+    )
+    while True:
+        linhas = cursor.fetchmany(tamanho_lote)
+        if not linhas:
+            break
+        for linha in linhas:
+            yield 'imoveis', _montar(list(zip(campos, linha)))
+
+    campos = [campo for campo, _ in CAMPOS_LOCADOR]
+    cursor = conexao.execute(f"SELECT {', '.join(_colunas('locador'))} FROM locador ORDER BY posicao")
+    while True:
+        linhas = cursor.fetchmany(tamanho_lote)
+        if not linhas:
+            break
+        for linha in linhas:
+            yield 'locadores', _montar(list(zip(campos, linha)))
@@ -0,0 +1,177 @@
+"""
+Cache da planilha SAP já interpretada
+
+Ler o xlsx é de longe a etapa mais lenta dos importadores. CachePlanilha guarda os
+DataFrames lidos em .cache/planilhas/ (pickle, gravado bloco a bloco) e os devolve
+nas execuções seguintes enquanto a planilha não mudar.
+
+A entrada é identificada pelo SHA-256 do conteúdo do arquivo. Para não recalcular o
+hash a cada execução, o hash de cada caminho fica anotado junto com o tamanho e o
+mtime do arquivo: se os dois não mudaram, o hash anotado é reaproveitado. Salvar a
+planilha sem alterá-la muda o mtime mas não o conteúdo, então o cache continua valendo.
+
+O diretório é limitado a limite_mb: ao gravar ou usar uma entrada, as usadas há
+mais tempo são apagadas. Os arquivos são pickles, então o diretório deve ser tratado como
+confiável (é gerado pela própria máquina, como o resto de .cache/).
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from .arquivos import gravar_atomico
+
+VERSAO_CACHE = 2
+
+DIRETORIO_PADRAO = os.path.join('.cache', 'planilhas')
+LIMITE_PADRAO_MB = 512
+
+_ARQUIVO_IMPRESSOES = 'impressoes.json'
+_TAMANHO_LEITURA = 1 << 20
+
+
+def hash_arquivo(caminho: str) -> str:
+    """SHA-256 do conteúdo do arquivo, lido em pedaços de 1 MB"""
+    h = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for pedaco in iter(lambda: f.read(_TAMANHO_LEITURA), b''):
+            h.update(pedaco)
+    return h.hexdigest()
+
+
+class EntradaCache:
+    """Uma planilha encontrada no cache: colunas, total de linhas e os blocos gravados"""
+
+    def __init__(self, caminho: str, colunas: List[str], total: int):
+        self.caminho = caminho
+        self.colunas = colunas
+        self.total = total
+
+    def blocos(self) -> Iterator[pd.DataFrame]:
+        with open(self.caminho, 'rb') as f:
+            while True:
+                try:
+                    yield pickle.load(f)
+                except EOFError:
+                    return
+
+
+class GravacaoCache:
+    """Grava os blocos de uma leitura à medida que passam; só vira entrada válida em concluir()"""
+
+    def __init__(self, cache: 'CachePlanilha', nome: str, colunas: List[str]):
+        self.cache = cache
+        self.nome = nome
+        self.colunas = colunas
+        self.total = 0
+        self._arquivo = tempfile.NamedTemporaryFile('wb', dir=cache.diretorio, suffix='.tmp', delete=False)
+
+    def adicionar(self, bloco: pd.DataFrame):
+        pickle.dump(bloco, self._arquivo, protocol=pickle.HIGHEST_PROTOCOL)
+        self.total += len(bloco)
+
+    def concluir(self):
+        self._arquivo.close()
+        caminho = self.cache._caminho(self.nome)
+        os.replace(self._arquivo.name, caminho + '.pkl')
+        gravar_atomico(caminho + '.json', json.dumps({
+            'versao': VERSAO_CACHE,
+            'pandas': pd.__version__,
+            'colunas': self.colunas,
+            'total': self.total,
+        }, ensure_ascii=False))
+        self.cache.podar(manter=caminho)
+
+    def descartar(self):
+        self._arquivo.close()
+        if os.path.exists(self._arquivo.name):
+            os.remove(self._arquivo.name)
+
+
+class CachePlanilha:
+    """Cache em disco das planilhas lidas, com limite de tamanho do diretório"""
+
+    def __init__(self, diretorio: str = DIRETORIO_PADRAO, limite_mb: float = LIMITE_PADRAO_MB,
+                 atualizar: bool = False):
+        self.diretorio = diretorio
+        self.limite = limite_mb * 1024 * 1024
+        self.atualizar = atualizar
+        os.makedirs(diretorio, exist_ok=True)
+
+    def _caminho(self, nome: str) -> str:
+        return os.path.join(self.diretorio, nome)
+
+    def _impressoes(self) -> Dict[str, list]:
+        try:
+            with open(self._caminho(_ARQUIVO_IMPRESSOES), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def chave(self, caminho_planilha: str) -> str:
+        """Hash do conteúdo da planilha, reaproveitando o anotado se tamanho e mtime não mudaram"""
+        caminho = os.path.abspath(caminho_planilha)
+        estado = os.stat(caminho)
+        impressoes = self._impressoes()
+        anotado = impressoes.get(caminho)
+        if anotado and anotado[:2] == [estado.st_size, estado.st_mtime_ns]:
+            return anotado[2]
+        conteudo = hash_arquivo(caminho)
+        impressoes[caminho] = [estado.st_size, estado.st_mtime_ns, conteudo]
+        gravar_atomico(self._caminho(_ARQUIVO_IMPRESSOES), json.dumps(impressoes, ensure_ascii=False))
+        return conteudo
+
+    def nome(self, caminho_planilha: str, modo: str) -> str:
+        """Nome da entrada: hash do conteúdo + modo de leitura ('inteira' ou 'blocos', que geram tipos diferentes)"""
+        return f"{self.chave(caminho_planilha)[:32]}-{modo}"
+
+    def abrir(self, nome: str) -> Optional[EntradaCache]:
+        """A entrada gravada, ou None se não existe, é de outra versão ou atualizar foi pedido"""
+        if self.atualizar:
+            return None
+        caminho = self._caminho(nome)
+        try:
+            with open(caminho + '.json', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('versao') != VERSAO_CACHE or meta.get('pandas') != pd.__version__:
+                return None
+            # Marca a entrada como usada agora, para a poda apagar primeiro as esquecidas
+            os.utime(caminho + '.pkl')
+        except (OSError, ValueError):
+            return None
+        self.podar(manter=caminho)
+        return EntradaCache(caminho + '.pkl', meta['colunas'], meta['total'])
+
+    def gravar(self, nome: str, colunas: List[str]) -> GravacaoCache:
+        return GravacaoCache(self, nome, colunas)
+
+    def podar(self, manter: Optional[str] = None):
+        """Apaga as entradas usadas há mais tempo até o diretório caber no limite, exceto manter (em uso)"""
+        entradas = []
+        for arquivo in os.listdir(self.diretorio):
+            if not arquivo.endswith('.pkl'):
+                continue
+            caminho = self._caminho(arquivo[:-len('.pkl')])
+            if caminho == manter:
+                continue
+            try:
+                estado = os.stat(caminho + '.pkl')
+                tamanho = estado.st_size + (os.path.getsize(caminho + '.json') if os.path.exists(caminho + '.json') else 0)
+            except OSError:
+                continue
+            entradas.append((estado.st_mtime_ns, tamanho, caminho))
+        total = sum(tamanho for _, tamanho, _ in entradas)
+        if manter is not None and os.path.exists(manter + '.pkl'):
+            total += os.path.getsize(manter + '.pkl')
+        for _, tamanho, caminho in sorted(entradas):
+            if total <= self.limite:
+                break
+            for extensao in ('.json', '.pkl'):
+                if os.path.exists(caminho + extensao):
+                    os.remove(caminho + extensao)
+            total -= tamanho
@@ -0,0 +1,307 @@
+"""
+Exportação colunar do dados-sap.json (<saida>.colunar.json)
+
+Em vez de um objeto por registro, cada seção vira uma lista de colunas (uma por
+campo, com os objetos aninhados achatados), o que elimina a repetição das chaves.
+Cada coluna é codificada conforme os valores que contém:
+
+- faixa: inteiros em progressão aritmética (ex.: números de contrato sequenciais)
+- inteiro: lista de inteiros
+- data: datas como dias desde 1970-01-01, com o formato original para reconstruí-las
+- prefixado: textos "<prefixo><número>" (ex.: "imovel_000123") como inteiros
+- categoria: textos de baixa cardinalidade como dicionário + códigos
+- valor: o valor JSON como está
+
+ler_colunar devolve exatamente o mesmo dicionário que json.load do JSON original;
+ler_colunas decodifica só as colunas pedidas, sem montar os registros.
+"""
+
+import json
+import os
+import re
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .arquivos import gravar_atomico
+
+FORMATO = 'silic-colunar'
+VERSAO_COLUNAR = 1
+
+EPOCA = date(1970, 1, 1).toordinal()
+
+# Formatos de data dos scripts: DD/MM/YYYY (SAP e mocks) e ISO (pandas isoformat)
+FORMATOS_DATA = {
+    'DD/MM/YYYY': (re.compile(r'(\d{2})/(\d{2})/(\d{4})'), lambda d: f"{d.day:02d}/{d.month:02d}/{d.year:04d}"),
+    'YYYY-MM-DD': (re.compile(r'(\d{4})-(\d{2})-(\d{2})'), lambda d: d.isoformat()),
+    'YYYY-MM-DDT00:00:00': (re.compile(r'(\d{4})-(\d{2})-(\d{2})T00:00:00'), lambda d: f"{d.isoformat()}T00:00:00"),
+}
+
+PREFIXADO = re.compile(r'(\D*)(\d+)')
+
+
+def caminho_colunar(caminho_dados: str) -> str:
+    """public/dados-sap.json -> public/dados-sap.colunar.json"""
+    base, extensao = os.path.splitext(caminho_dados)
+    return f"{base}.colunar{extensao or '.json'}"
+
+
+def achatar(registro: Dict, prefixo: Tuple[str, ...] = ()) -> List[Tuple[Tuple[str, ...], object]]:
+    """(caminho, valor) das folhas do registro; objetos aninhados não vazios viram caminhos mais longos"""
+    pares = []
+    for chave, valor in registro.items():
+        caminho = prefixo + (chave,)
+        if isinstance(valor, dict) and valor:
+            pares.extend(achatar(valor, caminho))
+        else:
+            pares.append((caminho, valor))
+    return pares
+
+
+def _eh_inteiro(valor) -> bool:
+    return type(valor) is int
+
+
+def _codificar_inteiros(valores: List[Optional[int]]) -> Dict:
+    if len(valores) > 1 and None not in valores:
+        passo = valores[1] - valores[0]
+        if all(b - a == passo for a, b in zip(valores, valores[1:])):
+            return {'tipo': 'faixa', 'inicio': valores[0], 'passo': passo}
+    return {'tipo': 'inteiro', 'valores': valores}
+
+
+def _codificar_data(textos: List[Optional[str]]) -> Optional[Dict]:
+    amostra = next(t for t in textos if t is not None)
+    for nome, (padrao, formatar) in FORMATOS_DATA.items():
+        if not padrao.fullmatch(amostra):
+            continue
+        dias = []
+        for texto in textos:
+            if texto is None:
+                dias.append(None)
+                continue
+            partes = padrao.fullmatch(texto)
+            if not partes:
+                return None
+            a, b, c = (int(p) for p in partes.groups())
+            dia, mes, ano = (a, b, c) if nome == 'DD/MM/YYYY' else (c, b, a)
+            try:
+                data = date(ano, mes, dia)
+            except ValueError:
+                return None
+            if formatar(data) != texto:
+                return None
+            dias.append(data.toordinal() - EPOCA)
+        return {'tipo': 'data', 'formato': nome, 'valores': dias}
+    return None
+
+
+def _codificar_prefixado(textos: List[Optional[str]]) -> Optional[Dict]:
+    amostra = PREFIXADO.fullmatch(next(t for t in textos if t is not None))
+    if not amostra:
+        return None
+    prefixo, digitos = amostra.groups()
+    largura = len(digitos)
+    numeros = []
+    for texto in textos:
+        if texto is None:
+            numeros.append(None)
+            continue
+        if not texto.startswith(prefixo):
+            return None
+        resto = texto[len(prefixo):]
+        # Largura fixa (com zeros à esquerda), para que f"{n:0{largura}d}" reconstrua o texto
+        if len(resto) != largura or not resto.isdigit() or not resto.isascii():
+            return None
+        numeros.append(int(resto))
+    return {'tipo': 'prefixado', 'prefixo': prefixo, 'largura': largura, 'numeros': _codificar_inteiros(numeros)}
+
+
+def _codificar_categoria(valores: List) -> Optional[Dict]:
+    codigos_por_valor = {}
+    codigos = []
+    for valor in valores:
+        codigo = codigos_por_valor.get(valor)
+        if codigo is None:
+            codigo = codigos_por_valor[valor] = len(codigos_por_valor)
+        codigos.append(codigo)
+    if len(codigos_por_valor) * 2 > len(valores):
+        return None
+    return {'tipo': 'categoria', 'dicionario': list(codigos_por_valor), 'codigos': codigos}
+
+
+def codificar_coluna(valores: List) -> Dict:
+    """Escolhe a codificação mais compacta que reconstrói exatamente os valores"""
+    nao_nulos = [v for v in valores if v is not None]
+    if nao_nulos and all(_eh_inteiro(v) for v in nao_nulos):
+        return _codificar_inteiros(valores)
+    if nao_nulos and all(isinstance(v, str) for v in nao_nulos):
+        for codificar in (_codificar_data, _codificar_prefixado):
+            coluna = codificar(valores)
+            if coluna is not None:
+                return coluna
+    if all(v is None or isinstance(v, (str, bool)) for v in valores):
+        coluna = _codificar_categoria(valores)
+        if coluna is not None:
+            return coluna
+    return {'tipo': 'valor', 'valores': valores}
+
+
+def _decodificar_inteiros(coluna: Dict, total: int) -> List[Optional[int]]:
+    if coluna['tipo'] == 'faixa':
+        inicio, passo = coluna['inicio'], coluna['passo']
+        return [inicio + passo * i for i in range(total)]
+    return coluna['valores']
+
+
+def decodificar_coluna(coluna: Dict, total: int) -> List:
+    tipo = coluna['tipo']
+    if tipo in ('faixa', 'inteiro'):
+        return _decodificar_inteiros(coluna, total)
+    if tipo == 'data':
+        formatar = FORMATOS_DATA[coluna['formato']][1]
+        # Poucas datas distintas se repetem muito; formata cada uma só uma vez
+        textos = {None: None}
+        for dia in set(coluna['valores']).difference(textos):
+            textos[dia] = formatar(date.fromordinal(dia + EPOCA))
+        return list(map(textos.__getitem__, coluna['valores']))
+    if tipo == 'prefixado':
+        prefixo, largura = coluna['prefixo'], coluna['largura']
+        return [None if n is None else f"{prefixo}{n:0{largura}d}"
+                for n in _decodificar_inteiros(coluna['numeros'], total)]
+    if tipo == 'categoria':
+        return list(map(coluna['dicionario'].__getitem__, coluna['codigos']))
+    if tipo == 'valor':
+        return coluna['valores']
+    raise ValueError(f"Tipo de coluna desconhecido: {tipo}")
+
+
+class EscritorColunar:
+    """Acumula os registros coluna a coluna e grava <saida>.colunar.json no final"""
+
+    def __init__(self, caminho_dados: str, secoes: Iterable[str] = ('imoveis', 'locadores')):
+        self.caminho = caminho_colunar(caminho_dados)
+        self.secoes = list(secoes)
+        self.contagens: Dict[str, int] = {secao: 0 for secao in self.secoes}
+        self._caminhos: Dict[str, Tuple[Tuple[str, ...], ...]] = {}
+        self._colunas: Dict[str, List[List]] = {}
+
+    def escrever(self, secao: str, registro: Dict):
+        pares = achatar(registro)
+        caminhos = tuple(caminho for caminho, _ in pares)
+        esperado = self._caminhos.get(secao)
+        if esperado is None:
+            self._caminhos[secao] = esperado = caminhos
+            self._colunas[secao] = [[] for _ in caminhos]
+        elif caminhos != esperado:
+            raise ValueError(
+                f"Registro {registro.get('id')} de '{secao}' tem campos diferentes dos anteriores; "
+                "a exportação colunar exige o mesmo formato em toda a seção"
+            )
+        for coluna, (_, valor) in zip(self._colunas[secao], pares):
+            coluna.append(valor)
+        self.contagens[secao] = self.contagens.get(secao, 0) + 1
+
+    def finalizar(self, metadados: Optional[Dict] = None) -> str:
+        # Mesma ordem de seções do JSON, mesmo que os registros tenham chegado em outra
+        secoes = {}
+        for secao in self.contagens:
+            caminhos = self._caminhos.get(secao, ())
+            secoes[secao] = {
+                'total': self.contagens[secao],
+                'colunas': [
+                    {'caminho': list(caminho), **codificar_coluna(valores)}
+                    for caminho, valores in zip(caminhos, self._colunas.get(secao, ()))
+                ],
+            }
+        dados = {'formato': FORMATO, 'versao': VERSAO_COLUNAR, 'secoes': secoes, 'metadados': metadados}
+
+        # json.dumps usa o codificador em C; json.dump em arquivo cai no de Python puro
+        gravar_atomico(self.caminho, json.dumps(dados, ensure_ascii=False, separators=(',', ':')))
+        self.descartar()
+        return self.caminho
+
+    def descartar(self):
+        self._colunas.clear()
+
+
+def _montar(caminhos: List[Tuple[str, ...]], colunas: List[List], nivel: int, total: int) -> List[Dict]:
+    """Monta os objetos de um nível a partir das colunas, agrupando os caminhos aninhados"""
+    chaves, valores = [], []
+    i = 0
+    while i < len(caminhos):
+        chave = caminhos[i][nivel]
+        fim = i + 1
+        if len(caminhos[i]) > nivel + 1:
+            while fim < len(caminhos) and len(caminhos[fim]) > nivel + 1 and caminhos[fim][nivel] == chave:
+                fim += 1
+            valores.append(_montar(caminhos[i:fim], colunas[i:fim], nivel + 1, total))
+        else:
+            valores.append(colunas[i])
+        chaves.append(chave)
+        i = fim
+    if not chaves:
+        return [{} for _ in range(total)]
+    return [dict(zip(chaves, linha)) for linha in zip(*valores)]
+
+
+def _registros(secao: Dict) -> List[Dict]:
+    total = secao['total']
+    caminhos = [tuple(coluna['caminho']) for coluna in secao['colunas']]
+    colunas = [decodificar_coluna(coluna, total) for coluna in secao['colunas']]
+    return _montar(caminhos, colunas, 0, total)
+
+
+def _carregar(caminho: str) -> Dict:
+    with open(caminho, encoding='utf-8') as f:
+        dados = json.load(f)
+    if dados.get('formato') != FORMATO:
+        raise ValueError(f"{caminho} não está no formato {FORMATO}")
+    if dados.get('versao') != VERSAO_COLUNAR:
+        raise ValueError(f"Versão {dados.get('versao')} do formato colunar não suportada")
+    return dados
+
+
+def ler_colunas(caminho: str, secao: str, campos: Optional[Iterable[str]] = None) -> Dict[str, List]:
+    """
+    Só as colunas pedidas de uma seção ("edificio.status", "locadorId"...), sem montar
+    os registros; para contagens e filtros é bem mais rápido que ler o JSON inteiro
+    """
+    conteudo = _carregar(caminho)['secoes'][secao]
+    pedidos = None if campos is None else set(campos)
+    colunas = {}
+    for coluna in conteudo['colunas']:
+        nome = '.'.join(coluna['caminho'])
+        if pedidos is None or nome in pedidos:
+            colunas[nome] = decodificar_coluna(coluna, conteudo['total'])
+    if pedidos is not None and pedidos.difference(colunas):
+        raise KeyError(f"Colunas inexistentes em '{secao}': {', '.join(sorted(pedidos.difference(colunas)))}")
+    return colunas
+
+
+def ler_colunas_codificadas(caminho: str) -> Dict[str, Tuple[int, Dict[str, Dict]]]:
+    """
+    Seção -> (total, colunas ainda codificadas por nome), lendo o arquivo uma vez só,
+    para quem consegue usar a codificação diretamente (ex.: silic_dados.consulta usa os
+    códigos das categorias e os dias das datas sem reconstruir os textos)
+    """
+    return {
+        secao: (conteudo['total'], {'.'.join(coluna['caminho']): coluna for coluna in conteudo['colunas']})
+        for secao, conteudo in _carregar(caminho)['secoes'].items()
+    }
+
+
+def iterar_colunar(caminho: str) -> Iterator[Tuple[str, Dict]]:
+    """(seção, registro) de cada registro do arquivo colunar, na ordem original"""
+    dados = _carregar(caminho)
+    for secao, conteudo in dados['secoes'].items():
+        for registro in _registros(conteudo):
+            yield secao, registro
+
+
+def ler_colunar(caminho: str) -> Dict:
+    """Reconstrói o dicionário do dados-sap.json a partir do arquivo colunar"""
+    dados = _carregar(caminho)
+    saida = {secao: _registros(conteudo) for secao, conteudo in dados['secoes'].items()}
+    if dados['metadados'] is not None:
+        saida['metadados'] = dados['metadados']
+    return saida
@@ -0,0 +1,252 @@
+"""
+Comparação de dois snapshots do dados-sap.json
+
+Os dois arquivos são lidos em streaming (iterar_registros), registro a registro, sem
+carregar o JSON inteiro. Do snapshot anterior ficam só a chave de cada registro (as
+mesmas da mesclagem: número do contrato e CPF/CNPJ), um hash md5 dos seus bytes e as
+posições em bytes. No atual, um registro com o mesmo hash não mudou; só os outros (e os
+removidos) são relidos do anterior, direto nas posições em bytes, para listar os campos
+alterados. Snapshots com formatação diferente (--compacto) caem todos nessa releitura,
+mas o resultado é o mesmo. O tempo é linear no tamanho dos arquivos e a memória
+proporcional ao número de chaves, não ao conteúdo dos registros.
+"""
+
+import codecs
+import hashlib
+import json
+from array import array
+from json.decoder import WHITESPACE
+from typing import Dict, Iterator, Optional, Tuple
+
+from .mesclagem import CHAVES, diferencas
+
+ACOES = ('inseridos', 'atualizados', 'inalterados', 'removidos')
+
+
+class _Leitor:
+    """Texto do arquivo lido em blocos, com a posição em bytes do ponto de leitura"""
+
+    def __init__(self, arquivo, tamanho_bloco: int):
+        self._arquivo = arquivo
+        self._tamanho_bloco = tamanho_bloco
+        self._decodificador = codecs.getincrementaldecoder('utf-8')()
+        self._json = json.JSONDecoder()
+        self.texto = ''
+        self.pos = 0
+        self.bytes = 0
+        self.fim_arquivo = False
+
+    def _ler(self) -> bool:
+        if self.fim_arquivo:
+            return False
+        bloco = self._arquivo.read(self._tamanho_bloco)
+        self.fim_arquivo = not bloco
+        self.texto = self.texto[self.pos:] + self._decodificador.decode(bloco, final=self.fim_arquivo)
+        self.pos = 0
+        return True
+
+    def _avancar(self, pos: int) -> bytes:
+        bruto = self.texto[self.pos:pos].encode('utf-8')
+        self.bytes += len(bruto)
+        self.pos = pos
+        return bruto
+
+    def proximo(self) -> str:
+        """Próximo caractere que não é espaço ('' no fim do arquivo), sem consumi-lo"""
+        while True:
+            self._avancar(WHITESPACE.match(self.texto, self.pos).end())
+            if self.pos < len(self.texto):
+                return self.texto[self.pos]
+            if not self._ler():
+                return ''
+
+    def consumir(self, esperados: str) -> str:
+        caractere = self.proximo()
+        if not caractere or caractere not in esperados:
+            raise ValueError(f"JSON inválido no byte {self.bytes}: esperado {' ou '.join(esperados)}")
+        self._avancar(self.pos + 1)
+        return caractere
+
+    def valor(self) -> Tuple[object, bytes]:
+        """Próximo valor JSON e os seus bytes no arquivo"""
+        self.proximo()
+        while True:
+            try:
+                valor, fim = self._json.raw_decode(self.texto, self.pos)
+            except json.JSONDecodeError:
+                if not self._ler():
+                    raise
+                continue
+            # Um número no fim do bloco pode continuar no próximo
+            if fim == len(self.texto) and self._ler():
+                continue
+            return valor, self._avancar(fim)
+
+
+def iterar_registros(caminho: str, tamanho_bloco: int = 1 << 20) -> Iterator[Tuple[str, Optional[int], object, int, bytes]]:
+    """
+    (seção, posição, valor, início, bruto) de cada elemento dos arrays do objeto principal
+    ("imoveis", "locadores"): bruto são os bytes do elemento, a partir do byte início do
+    arquivo. Os valores que não são arrays ("metadados") vêm inteiros, com posição None
+    """
+    with open(caminho, 'rb') as arquivo:
+        leitor = _Leitor(arquivo, tamanho_bloco)
+        leitor.consumir('{')
+        if leitor.proximo() == '}':
+            return
+        while True:
+            secao, _ = leitor.valor()
+            leitor.consumir(':')
+            if leitor.proximo() == '[':
+                leitor.consumir('[')
+                if leitor.proximo() == ']':
+                    leitor.consumir(']')
+                else:
+                    posicao = 0
+                    while True:
+                        leitor.proximo()
+                        inicio = leitor.bytes
+                        valor, bruto = leitor.valor()
+                        yield secao, posicao, valor, inicio, bruto
+                        posicao += 1
+                        if leitor.consumir(',]') == ']':
+                            break
+            else:
+                leitor.proximo()
+                inicio = leitor.bytes
+                valor, bruto = leitor.valor()
+                yield secao, None, valor, inicio, bruto
+            if leitor.consumir(',}') == '}':
+                return
+
+
+def chave_registro(secao: str, registro, posicao: int) -> str:
+    """Chave da mesclagem; sem ela, o ID; sem ID, a posição na seção"""
+    chave = None
+    if isinstance(registro, dict):
+        chave_de = CHAVES.get(secao)
+        chave = chave_de(registro) if chave_de else None
+        if chave is None and registro.get('id') is not None:
+            chave = f"id:{registro['id']}"
+    return chave if chave is not None else f"posicao:{posicao}"
+
+
+def _unica(chave: str, vistas) -> str:
+    """Chaves repetidas na mesma seção viram chave#2, chave#3... (na ordem do arquivo)"""
+    if chave not in vistas:
+        return chave
+    n = 2
+    while f"{chave}#{n}" in vistas:
+        n += 1
+    return f"{chave}#{n}"
+
+
+class _Secao:
+    """Chave -> posição, hashes e posições em bytes dos registros de uma seção do snapshot anterior"""
+
+    def __init__(self):
+        self.posicoes: Dict[str, int] = {}
+        self.impressoes = bytearray()
+        self.inicios = array('q')
+        self.fins = array('q')
+        self.casados = bytearray()
+
+    def adicionar(self, chave: str, inicio: int, bruto: bytes):
+        self.posicoes[_unica(chave, self.posicoes)] = len(self.inicios)
+        self.impressoes += hashlib.md5(bruto).digest()
+        self.inicios.append(inicio)
+        self.fins.append(inicio + len(bruto))
+        self.casados.append(0)
+
+    def impressao(self, posicao: int) -> bytes:
+        return bytes(self.impressoes[posicao * 16:(posicao + 1) * 16])
+
+
+class ComparacaoSnapshots:
+    """
+    Indexa o snapshot anterior e compara com ele o atual.
+    comparar devolve as mudanças no formato do log da mesclagem (secao, chave, id, acao e,
+    nas atualizações, campos: {campo: [antes, depois]}); contagens soma as ações por seção.
+    """
+
+    def __init__(self, caminho_anterior: str, incluir_registros: bool = False):
+        self.caminho_anterior = caminho_anterior
+        self.incluir_registros = incluir_registros
+        self.contagens: Dict[str, Dict[str, int]] = {}
+        self._secoes: Dict[str, _Secao] = {}
+        self._valores: Dict[str, object] = {}
+        for secao, posicao, registro, inicio, bruto in iterar_registros(caminho_anterior):
+            if posicao is None:
+                self._valores[secao] = registro
+            else:
+                self._secao(secao).adicionar(chave_registro(secao, registro, posicao), inicio, bruto)
+
+    def __len__(self):
+        return sum(len(secao.inicios) for secao in self._secoes.values())
+
+    def _secao(self, secao: str) -> _Secao:
+        if secao not in self._secoes:
+            self._secoes[secao] = _Secao()
+            self.contagens[secao] = dict.fromkeys(ACOES, 0)
+        return self._secoes[secao]
+
+    def _mudanca(self, secao: str, chave: str, registro, acao: str) -> Dict:
+        mudanca = {'secao': secao, 'chave': chave,
+                   'id': registro.get('id') if isinstance(registro, dict) else None, 'acao': acao}
+        if self.incluir_registros and acao != 'atualizado':
+            mudanca['registro'] = registro
+        return mudanca
+
+    def comparar(self, caminho_atual: str) -> Iterator[Dict]:
+        """
+        Mudanças do anterior para o atual: inserções e atualizações na ordem do atual,
+        depois as remoções, as seções fora dos arrays (metadados) por último
+        """
+        valores = {}
+        vistas: Dict[str, set] = {}
+        with open(self.caminho_anterior, 'rb') as anterior:
+            def reler(indexada: _Secao, posicao: int):
+                anterior.seek(indexada.inicios[posicao])
+                return json.loads(anterior.read(indexada.fins[posicao] - indexada.inicios[posicao]))
+
+            for secao, posicao, registro, _, bruto in iterar_registros(caminho_atual):
+                if posicao is None:
+                    valores[secao] = registro
+                    continue
+                indexada = self._secao(secao)
+                chave = _unica(chave_registro(secao, registro, posicao), vistas.setdefault(secao, set()))
+                vistas[secao].add(chave)
+                contagem = self.contagens[secao]
+                antiga = indexada.posicoes.get(chave)
+                if antiga is None:
+                    contagem['inseridos'] += 1
+                    yield self._mudanca(secao, chave, registro, 'inserido')
+                    continue
+                indexada.casados[antiga] = 1
+                if indexada.impressao(antiga) == hashlib.md5(bruto).digest():
+                    contagem['inalterados'] += 1
+                    continue
+                campos = diferencas(reler(indexada, antiga), registro)
+                if not campos:
+                    contagem['inalterados'] += 1
+                    continue
+                contagem['atualizados'] += 1
+                mudanca = self._mudanca(secao, chave, registro, 'atualizado')
+                mudanca['campos'] = campos
+                yield mudanca
+
+            for secao, indexada in self._secoes.items():
+                for chave, posicao in indexada.posicoes.items():
+                    if not indexada.casados[posicao]:
+                        self.contagens[secao]['removidos'] += 1
+                        yield self._mudanca(secao, chave, reler(indexada, posicao), 'removido')
+
+        for secao in {**self._valores, **valores}:
+            antes, depois = self._valores.get(secao), valores.get(secao)
+            if antes == depois:
+                continue
+            if isinstance(antes, dict) and isinstance(depois, dict):
+                campos = diferencas(antes, depois)
+            else:
+                campos = {secao: [antes, depois]}
+            yield {'secao': secao, 'chave': None, 'id': None, 'acao': 'atualizado', 'campos': campos}
@@ -0,0 +1,365 @@
+"""
+Consultas sobre o portfólio gravado em dados-sap.json
+
+TabelaImoveis carrega os imóveis em colunas tipadas (numpy): textos como códigos
+inteiros + dicionário de valores, datas como datetime64[D]. O dados-sap.json é lido
+uma vez; se houver um <saida>.colunar.json tão recente quanto ele, as colunas vêm
+de lá já codificadas, sem montar nenhum registro.
+
+Os campos têm nomes lógicos (CAMPOS), resolvidos tanto na estrutura REISCNBP +
+REISBU quanto nos formatos planos. estado, status, fimValidade e locadorId têm
+índices secundários: posições agrupadas por valor (igualdade) ou ordenadas por data
+(intervalos, com busca binária). Em uma consulta, o filtro indexado mais seletivo
+escolhe as linhas candidatas e os demais são avaliados só sobre elas, com operações
+vetorizadas; agrupamentos e contagens também são vetorizados (np.unique).
+"""
+
+import json
+import os
+import re
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .colunar import EPOCA, achatar, caminho_colunar, decodificar_coluna, ler_colunas_codificadas
+from .vencimentos import dia_de
+
+# Nome lógico -> caminhos possíveis (REISCNBP + REISBU, protótipo, planilha)
+CAMPOS = {
+    'id': ('id',),
+    'contrato': ('contrato.numero', 'codigo'),
+    'estado': ('edificio.regiao', 'estado'),
+    'cidade': ('edificio.local', 'cidade'),
+    'tipo': ('tipo',),
+    'status': ('status',),
+    'statusEdificio': ('edificio.status',),
+    'locadorId': ('locadorId',),
+    'inicioContrato': ('contrato.inicioContrato', 'caracteristicas.contratoInicio', 'inicioValidade'),
+    'fimValidade': ('contrato.fimValidade', 'caracteristicas.contratoFim', 'objetoValidoAte'),
+    'rescisaoEm': ('contrato.rescisaoEm', 'rescisaoEm'),
+}
+
+CAMPOS_DATA = frozenset(('inicioContrato', 'fimValidade', 'rescisaoEm'))
+
+INDEXADOS = ('estado', 'status', 'fimValidade', 'locadorId')
+
+GRANULARIDADES = {'dia': 'D', 'mes': 'M', 'ano': 'Y'}
+
+OPERADORES = ('<=', '>=', '!=', '=', '<', '>')
+
+_FILTRO = re.compile(r'\s*(\w+)\s*(<=|>=|!=|=|<|>)\s*(.*?)\s*')
+_NAT = np.iinfo(np.int64).min
+
+
+class ErroConsulta(ValueError):
+    """Filtro ou agrupamento inválido"""
+
+
+def _datas(valores: Sequence) -> np.ndarray:
+    """Textos de data -> datetime64[D] (NaT para vazios), convertendo cada valor distinto uma vez"""
+    dias = {}
+    numeros = np.empty(len(valores), dtype=np.int64)
+    for i, valor in enumerate(valores):
+        numero = dias.get(valor)
+        if numero is None:
+            data = dia_de(valor)
+            numero = dias[valor] = _NAT if data is None else data.toordinal() - EPOCA
+        numeros[i] = numero
+    return numeros.view('datetime64[D]')
+
+
+def _categorias(valores: Sequence) -> Tuple[np.ndarray, list]:
+    """Valores -> (códigos int32, dicionário); None vira o código -1"""
+    codigos_por_valor = {}
+    codigos = np.empty(len(valores), dtype=np.int32)
+    for i, valor in enumerate(valores):
+        if valor is None:
+            codigos[i] = -1
+            continue
+        codigo = codigos_por_valor.get(valor)
+        if codigo is None:
+            codigo = codigos_por_valor[valor] = len(codigos_por_valor)
+        codigos[i] = codigo
+    return codigos, list(codigos_por_valor)
+
+
+def _valor(registro: Dict, caminho: Sequence[str]):
+    for chave in caminho:
+        if not isinstance(registro, dict):
+            return None
+        registro = registro.get(chave)
+    return registro
+
+
+class IndiceValores:
+    """Posições das linhas agrupadas por código (ordenação estável): cada valor é uma fatia"""
+
+    def __init__(self, codigos: np.ndarray, quantidade: int):
+        self.ordem = np.argsort(codigos, kind='stable')
+        # Código -1 (vazio) fica na primeira fatia
+        self.limites = np.concatenate(([0], np.cumsum(np.bincount(codigos + 1, minlength=quantidade + 1))))
+
+    def tamanho(self, codigos: Iterable[int]) -> int:
+        return int(sum(self.limites[c + 2] - self.limites[c + 1] for c in codigos))
+
+    def posicoes(self, codigos: Iterable[int]) -> np.ndarray:
+        fatias = [self.ordem[self.limites[c + 1]:self.limites[c + 2]] for c in codigos]
+        if not fatias:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate(fatias)) if len(fatias) > 1 else fatias[0]
+
+
+class IndiceOrdenado:
+    """Posições ordenadas por data (vazios no fim) para consultas de intervalo por busca binária"""
+
+    def __init__(self, datas: np.ndarray):
+        self.ordem = np.argsort(datas, kind='stable')
+        self.ordenadas = datas[self.ordem]
+        self.preenchidas = len(datas) - int(np.isnat(datas).sum())
+
+    def faixa(self, inicio=None, fim=None, incluir_inicio=True, incluir_fim=True) -> Tuple[int, int]:
+        """Limites [lo, hi) em ordenadas das datas entre inicio e fim"""
+        validas = self.ordenadas[:self.preenchidas]
+        lo = 0 if inicio is None else int(np.searchsorted(validas, inicio, 'left' if incluir_inicio else 'right'))
+        hi = self.preenchidas if fim is None else int(np.searchsorted(validas, fim, 'right' if incluir_fim else 'left'))
+        return lo, max(lo, hi)
+
+    def posicoes(self, lo: int, hi: int, ordenar: bool = True) -> np.ndarray:
+        posicoes = self.ordem[lo:hi]
+        return np.sort(posicoes) if ordenar else posicoes
+
+
+class Filtro:
+    """campo operador valor(es): estado=SP,RJ  status!=ativo  fimValidade<=+90  fimValidade>=2025-01-01"""
+
+    def __init__(self, campo: str, operador: str, valores: List):
+        self.campo = campo
+        self.operador = operador
+        self.valores = valores
+
+    @classmethod
+    def interpretar(cls, texto: str, referencia: date) -> 'Filtro':
+        partes = _FILTRO.fullmatch(texto)
+        if not partes:
+            raise ErroConsulta(f"Filtro inválido: {texto!r} (esperado campo{'|'.join(OPERADORES)}valor)")
+        campo, operador, valor = partes.groups()
+        if campo not in CAMPOS:
+            raise ErroConsulta(f"Campo desconhecido: {campo} (disponíveis: {', '.join(CAMPOS)})")
+        if campo in CAMPOS_DATA:
+            if operador == '!=' or ',' in valor:
+                raise ErroConsulta(f"Datas aceitam só =, <, <=, > e >=: {texto!r}")
+            return cls(campo, operador, [data_relativa(valor, referencia)])
+        if operador not in ('=', '!='):
+            raise ErroConsulta(f"{campo} aceita só = e !=: {texto!r}")
+        return cls(campo, operador, [v.strip() for v in valor.split(',')])
+
+    def __repr__(self):
+        return f"{self.campo}{self.operador}{','.join(map(str, self.valores))}"
+
+
+def data_relativa(texto: str, referencia: date) -> date:
+    """'hoje', '+90'/'-30' (dias a partir da referência) ou uma data ISO/DD/MM/AAAA"""
+    texto = texto.strip().lower()
+    if texto == 'hoje':
+        return referencia
+    if re.fullmatch(r'[+-]\d+', texto):
+        return referencia + timedelta(days=int(texto))
+    data = dia_de(texto)
+    if data is None:
+        raise ErroConsulta(f"Data inválida: {texto!r}")
+    return data
+
+
+class TabelaImoveis:
+    """Imóveis de um dados-sap.json em colunas tipadas, com índices em INDEXADOS"""
+
+    def __init__(self, total: int, categorias: Dict[str, Tuple[np.ndarray, list]], datas: Dict[str, np.ndarray],
+                 locadores: Optional[Dict[str, str]] = None):
+        self.total = total
+        self.categorias = categorias
+        self.datas = datas
+        self.locadores = locadores or {}
+        self.indices_valores = {
+            campo: IndiceValores(categorias[campo][0], len(categorias[campo][1]))
+            for campo in INDEXADOS if campo in categorias
+        }
+        self.indices_datas = {campo: IndiceOrdenado(datas[campo]) for campo in INDEXADOS if campo in datas}
+
+    @classmethod
+    def de_registros(cls, imoveis: List[Dict], locadores: Iterable[Dict] = ()) -> 'TabelaImoveis':
+        existentes = {'.'.join(caminho) for caminho, _ in achatar(imoveis[0])} if imoveis else set()
+        caminhos = _resolver_caminhos(existentes)
+        categorias, datas = {}, {}
+        for campo, caminho in caminhos.items():
+            partes = caminho.split('.')
+            valores = [_valor(imovel, partes) for imovel in imoveis]
+            if campo in CAMPOS_DATA:
+                datas[campo] = _datas(valores)
+            else:
+                categorias[campo] = _categorias([None if v is None else str(v) for v in valores])
+        nomes = {locador['id']: locador.get('nome') for locador in locadores}
+        return cls(len(imoveis), categorias, datas, nomes)
+
+    @classmethod
+    def de_colunar(cls, caminho: str) -> 'TabelaImoveis':
+        secoes = ler_colunas_codificadas(caminho)
+        total, colunas = secoes.get('imoveis', (0, {}))
+        categorias, datas = {}, {}
+        for campo, nome in _resolver_caminhos(colunas).items():
+            coluna = colunas[nome]
+            if campo in CAMPOS_DATA:
+                if coluna['tipo'] == 'data':
+                    dias = coluna['valores']
+                    datas[campo] = np.array([_NAT if d is None else d for d in dias], dtype=np.int64).view('datetime64[D]')
+                else:
+                    datas[campo] = _datas(decodificar_coluna(coluna, total))
+            elif coluna['tipo'] == 'categoria' and all(isinstance(v, str) or v is None for v in coluna['dicionario']):
+                dicionario = coluna['dicionario']
+                codigos = np.array(coluna['codigos'], dtype=np.int32)
+                if None in dicionario:
+                    # Vazio tem código próprio no dicionário colunar; aqui é sempre -1
+                    nulo = dicionario.index(None)
+                    codigos = np.where(codigos == nulo, -1, codigos - (codigos > nulo))
+                    dicionario = dicionario[:nulo] + dicionario[nulo + 1:]
+                categorias[campo] = (codigos, list(dicionario))
+            else:
+                valores = decodificar_coluna(coluna, total)
+                categorias[campo] = _categorias([None if v is None else str(v) for v in valores])
+        # Sem locadores (ou sem as colunas id/nome), os imóveis ficam sem nome de locador
+        total_locadores, colunas_locadores = secoes.get('locadores', (0, {}))
+        nomes = {}
+        if 'id' in colunas_locadores and 'nome' in colunas_locadores:
+            nomes = dict(zip(decodificar_coluna(colunas_locadores['id'], total_locadores),
+                             decodificar_coluna(colunas_locadores['nome'], total_locadores)))
+        return cls(total, categorias, datas, nomes)
+
+    # === Filtros ===
+
+    def _codigos(self, campo: str, valores: Iterable[str]) -> List[int]:
+        dicionario = self.categorias[campo][1]
+        posicao = {valor: codigo for codigo, valor in enumerate(dicionario)}
+        return [posicao[v] for v in valores if v in posicao]
+
+    def _limites_data(self, filtro: Filtro):
+        valor = np.datetime64(filtro.valores[0], 'D')
+        return {
+            '=': (valor, valor, True, True), '<': (None, valor, True, False), '<=': (None, valor, True, True),
+            '>': (valor, None, False, True), '>=': (valor, None, True, True),
+        }[filtro.operador]
+
+    def _estimar(self, filtro: Filtro) -> Optional[int]:
+        """Quantas linhas o índice do campo devolve para o filtro (None se não há índice útil)"""
+        if filtro.campo in self.indices_valores and filtro.operador == '=':
+            return self.indices_valores[filtro.campo].tamanho(self._codigos(filtro.campo, filtro.valores))
+        if filtro.campo in self.indices_datas:
+            lo, hi = self.indices_datas[filtro.campo].faixa(*self._limites_data(filtro))
+            return hi - lo
+        return None
+
+    def _pelo_indice(self, filtro: Filtro) -> np.ndarray:
+        if filtro.campo in self.indices_datas:
+            indice = self.indices_datas[filtro.campo]
+            return indice.posicoes(*indice.faixa(*self._limites_data(filtro)))
+        return self.indices_valores[filtro.campo].posicoes(self._codigos(filtro.campo, filtro.valores))
+
+    def _mascara(self, filtro: Filtro, posicoes: np.ndarray) -> np.ndarray:
+        """Avalia o filtro sobre as linhas candidatas, de forma vetorizada"""
+        if filtro.campo in CAMPOS_DATA:
+            if filtro.campo not in self.datas:
+                return np.zeros(len(posicoes), dtype=bool)
+            datas = self.datas[filtro.campo][posicoes]
+            inicio, fim, incluir_inicio, incluir_fim = self._limites_data(filtro)
+            mascara = ~np.isnat(datas)
+            if inicio is not None:
+                mascara &= (datas >= inicio) if incluir_inicio else (datas > inicio)
+            if fim is not None:
+                mascara &= (datas <= fim) if incluir_fim else (datas < fim)
+            return mascara
+        if filtro.campo not in self.categorias:
+            return np.full(len(posicoes), filtro.operador == '!=')
+        dentro = np.isin(self.categorias[filtro.campo][0][posicoes], self._codigos(filtro.campo, filtro.valores))
+        return ~dentro if filtro.operador == '!=' else dentro
+
+    def filtrar(self, filtros: Sequence[Filtro]) -> np.ndarray:
+        """Posições (crescentes) das linhas que atendem a todos os filtros"""
+        estimativas = [(self._estimar(f), i) for i, f in enumerate(filtros)]
+        indexados = [(tamanho, i) for tamanho, i in estimativas if tamanho is not None]
+        if indexados:
+            _, escolhido = min(indexados)
+            posicoes = self._pelo_indice(filtros[escolhido])
+            restantes = [f for i, f in enumerate(filtros) if i != escolhido]
+        else:
+            posicoes = np.arange(self.total)
+            restantes = list(filtros)
+        for filtro in restantes:
+            if not len(posicoes):
+                break
+            posicoes = posicoes[self._mascara(filtro, posicoes)]
+        return posicoes
+
+    # === Agrupamento ===
+
+    def _chaves_grupo(self, campo: str, posicoes: np.ndarray) -> Tuple[np.ndarray, list]:
+        """(código por linha, rótulos) de um campo de agrupamento; datas aceitam campo:dia|mes|ano"""
+        nome, _, granularidade = campo.partition(':')
+        if nome in CAMPOS_DATA:
+            unidade = GRANULARIDADES.get(granularidade or 'dia')
+            if unidade is None:
+                raise ErroConsulta(f"Granularidade inválida: {granularidade} (use {', '.join(GRANULARIDADES)})")
+            if nome not in self.datas:
+                return np.zeros(len(posicoes), dtype=np.int64), [None]
+            # Sobre os inteiros, para que todos os NaT caiam no mesmo grupo
+            numeros = self.datas[nome][posicoes].astype(f'datetime64[{unidade}]').view(np.int64)
+            unicos, codigos = np.unique(numeros, return_inverse=True)
+            rotulos = [None if u == _NAT else str(np.datetime64(u, unidade)) for u in unicos.tolist()]
+            return codigos.ravel(), rotulos
+        if nome not in CAMPOS:
+            raise ErroConsulta(f"Campo desconhecido: {nome} (disponíveis: {', '.join(CAMPOS)})")
+        if granularidade:
+            raise ErroConsulta(f"Granularidade só vale para datas ({', '.join(sorted(CAMPOS_DATA))}): {campo}")
+        if nome not in self.categorias:
+            return np.zeros(len(posicoes), dtype=np.int64), [None]
+        codigos, valores = self.categorias[nome]
+        # -1 (vazio) vai para a última posição dos rótulos
+        return np.where(codigos[posicoes] < 0, len(valores), codigos[posicoes]), valores + [None]
+
+    def agrupar(self, posicoes: np.ndarray, campos: Sequence[str], minimo: int = 1) -> List[Tuple[tuple, int]]:
+        """Contagem por combinação de valores dos campos, em ordem decrescente de contagem"""
+        if not campos:
+            return [((), len(posicoes))] if len(posicoes) >= minimo else []
+        chaves = [self._chaves_grupo(campo, posicoes) for campo in campos]
+        dimensoes = tuple(len(rotulos) for _, rotulos in chaves)
+        combinadas = np.ravel_multi_index([codigos for codigos, _ in chaves], dimensoes)
+        unicas, contagens = np.unique(combinadas, return_counts=True)
+        selecao = contagens >= minimo
+        unicas, contagens = unicas[selecao], contagens[selecao]
+        ordem = np.lexsort((unicas, -contagens))
+        codigos = np.unravel_index(unicas[ordem], dimensoes)
+        rotulos = [[chaves[j][1][c] for c in codigos[j].tolist()] for j in range(len(campos))]
+        return [(tuple(r[i] for r in rotulos), int(n)) for i, n in enumerate(contagens[ordem].tolist())]
+
+
+def _resolver_caminhos(existentes) -> Dict[str, str]:
+    """Para cada campo lógico, o primeiro caminho de CAMPOS presente nos registros"""
+    caminhos = {}
+    for campo, candidatos in CAMPOS.items():
+        for caminho in candidatos:
+            if caminho in existentes:
+                caminhos[campo] = caminho
+                break
+    return caminhos
+
+
+def carregar_tabela(caminho: str) -> TabelaImoveis:
+    """
+    Tabela dos imóveis de caminho. Usa <caminho>.colunar.json quando ele existe e não é
+    mais antigo que o JSON (ou quando o próprio caminho já é o arquivo colunar).
+    """
+    colunar = caminho if caminho.endswith('.colunar.json') else caminho_colunar(caminho)
+    if os.path.exists(colunar) and (
+            colunar == caminho or not os.path.exists(caminho) or os.path.getmtime(colunar) >= os.path.getmtime(caminho)):
+        return TabelaImoveis.de_colunar(colunar)
+    with open(caminho, encoding='utf-8') as f:
+        dados = json.load(f)
+    return TabelaImoveis.de_registros(dados.get('imoveis', []), dados.get('locadores', []))
@@ -0,0 +1,34 @@
+"""
+Contexto de uma execução dos importadores
+
+O instante da importação é capturado uma única vez e repassado a todas as funções
+que montam registros (dataRegistro, dataAtualizacao, status calculado por data,
+metadados), em vez de cada uma chamar datetime.now(). Assim todos os registros de
+uma execução têm o mesmo carimbo e, com --data-execucao, duas execuções sobre a
+mesma planilha geram exatamente o mesmo JSON.
+"""
+
+import argparse
+from datetime import datetime
+from typing import Optional
+
+
+class ContextoExecucao:
+    """Instante de referência de uma execução e sua forma ISO, calculada uma vez"""
+
+    __slots__ = ('agora', 'carimbo')
+
+    def __init__(self, agora: Optional[datetime] = None):
+        self.agora = agora if agora is not None else datetime.now()
+        self.carimbo = self.agora.isoformat()
+
+    def __repr__(self):
+        return f"ContextoExecucao({self.carimbo!r})"
+
+
+def data_execucao(texto: str) -> datetime:
+    """Tipo de argparse para --data-execucao (ISO, ex.: 2024-01-31 ou 2024-01-31T08:00:00)"""
+    try:
+        return datetime.fromisoformat(texto)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"data inválida: {texto!r} (use o formato ISO, ex.: 2024-01-31T08:00:00)")
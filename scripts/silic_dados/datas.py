@@ -0,0 +1,126 @@
+"""
+Normalização das datas dos relatórios SAP para ISO
+
+As colunas de data (início/fim da relação, início do contrato, fim da validade,
+rescisão) repetem poucos valores distintos em muitas linhas (ex.: 31/12/9999).
+NormalizadorDatas converte colunas inteiras guardando cada conversão distinta num
+dicionário, com um caminho rápido para o formato estrito DD/MM/YYYY. Valores que
+não são datas viram None e são contados por coluna, em vez de sumirem em silêncio.
+"""
+
+import re
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional
+
+# Variante de DD/MM/YYYY com dia/mês sem zero à esquerda
+_FLEXIVEL = re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})', re.ASCII)
+_ISO = re.compile(r'\d{4}-\d\d-\d\d(?:[T ][\d:.+\-]+)?', re.ASCII)
+
+_INVALIDA = object()
+_AUSENTE = object()
+
+
+def _data_valida(ano: int, mes: int, dia: int) -> bool:
+    try:
+        date(ano, mes, dia)
+    except ValueError:
+        return False
+    return True
+
+
+def _converter(valor):
+    """ISO de um valor de célula, None para vazio ou _INVALIDA se não for data"""
+    if valor is None or valor != valor:  # None, NaN e NaT
+        return None
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if not isinstance(valor, str):
+        return _INVALIDA
+    texto = valor.strip()
+    if not texto:
+        return None
+    # Caminho rápido: DD/MM/YYYY exato, o formato do SAP, sem expressão regular
+    dia, mes, ano = texto[:2], texto[3:5], texto[6:]
+    if not (len(texto) == 10 and texto[2] == '/' and texto[5] == '/'
+            and (dia + mes + ano).isdigit() and texto.isascii()):
+        partes = _FLEXIVEL.fullmatch(texto)
+        if partes is None:
+            if _ISO.fullmatch(texto):
+                try:
+                    datetime.fromisoformat(texto)
+                except ValueError:
+                    return _INVALIDA
+                return texto
+            return _INVALIDA
+        dia, mes, ano = partes[1].zfill(2), partes[2].zfill(2), partes[3]
+    if not _data_valida(int(ano), int(mes), int(dia)):
+        return _INVALIDA
+    return f"{ano}-{mes}-{dia}"
+
+
+def data_invalida(valor) -> bool:
+    """True se o valor está preenchido mas não é uma data reconhecida"""
+    return _converter(valor) is _INVALIDA
+
+
+class NormalizadorDatas:
+    """Converte datas para ISO com cache das conversões e contagem dos valores inválidos"""
+
+    def __init__(self):
+        self.cache: Dict = {}
+        self.invalidas: Dict[str, int] = {}
+
+    def normalizar(self, valor, coluna: str = '') -> Optional[str]:
+        """ISO de um único valor (ex.: "31/12/9999" -> "9999-12-31")"""
+        if valor is None or valor != valor:
+            # Cada NaN é um objeto diferente; não vale a pena guardá-los no cache
+            return None
+        try:
+            convertido = self.cache[valor]
+        except KeyError:
+            convertido = self.cache[valor] = _converter(valor)
+        except TypeError:  # valor não hashable
+            convertido = _converter(valor)
+        if convertido is _INVALIDA:
+            self.invalidas[coluna] = self.invalidas.get(coluna, 0) + 1
+            return None
+        return convertido
+
+    def coluna(self, valores: Iterable, coluna: str = '') -> List[Optional[str]]:
+        """Converte uma coluna inteira: cada valor distinto uma vez, depois um map por linha"""
+        valores = list(valores)
+        try:
+            distintos = dict.fromkeys(valores)
+        except TypeError:  # algum valor não hashable
+            return [self.normalizar(valor, coluna) for valor in valores]
+        invalidos = False
+        for valor in distintos:
+            convertido = self.cache.get(valor, _AUSENTE)
+            if convertido is _AUSENTE:
+                convertido = _converter(valor)
+                if valor == valor:  # NaN fica fora do cache
+                    self.cache[valor] = convertido
+            distintos[valor] = convertido
+            invalidos = invalidos or convertido is _INVALIDA
+        saida = list(map(distintos.__getitem__, valores))
+        if invalidos:
+            for i, convertido in enumerate(saida):
+                if convertido is _INVALIDA:
+                    self.invalidas[coluna] = self.invalidas.get(coluna, 0) + 1
+                    saida[i] = None
+        return saida
+
+    def registrar(self, metricas):
+        """Soma as datas inválidas aos contadores de metricas (datasInvalidas e por coluna)"""
+        for coluna, quantidade in self.invalidas.items():
+            metricas.contar('datasInvalidas', quantidade)
+            metricas.contar(f"datasInvalidas[{coluna}]", quantidade)
+
+
+def descrever_invalidas(contadores: Dict[str, int]) -> List[str]:
+    """Linhas "<coluna>: N" para o resumo, a partir dos contadores de Metricas"""
+    return [
+        f"{nome[len('datasInvalidas['):-1]}: {quantidade}"
+        for nome, quantidade in contadores.items()
+        if nome.startswith('datasInvalidas[') and quantidade
+    ]
@@ -0,0 +1,102 @@
+"""
+Interpretação da "Denominação do contrato" do SAP
+
+Um único padrão pré-compilado reconhece os prefixos usados na base real
+("CT - AG", "CT- AG.", "CT - AGÊNCIA", "CT - PA", "CT - PAB", "CT - PAE",
+"CT - EDIFÍCIO", "CONTRATO AG.", "SIPAT") e separa o local e a UF. Os dois
+importadores usam esta função, então extraem a mesma cidade/UF da mesma linha.
+
+Como a mesma denominação se repete em muitas linhas, os resultados ficam num
+cache LRU limitado; registrar_cache soma acertos e falhas às métricas da execução.
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, NamedTuple, Optional
+
+TAMANHO_CACHE = 16384
+
+# Prefixo reconhecido -> (prefixo normalizado, categoria)
+PREFIXOS = {
+    'AG': ('CT - AG', 'agencia'),
+    'AG.': ('CT - AG', 'agencia'),
+    'AGÊNCIA': ('CT - AGÊNCIA', 'agencia'),
+    'PA': ('CT - PA', 'posto'),
+    'PAB': ('CT - PAB', 'posto'),
+    'PAE': ('CT - PAE', 'posto'),
+    'EDIFÍCIO': ('CT - EDIFÍCIO', 'edificio'),
+}
+
+# Locais que trazem o nome da cidade depois de um termo fixo
+_CIDADE_NO_LOCAL = re.compile(r'(?:JUSTIÇA FEDERAL DE|BATALHÃO)\s+(?P<cidade>.+)')
+
+# Mais longos antes dos mais curtos (AGÊNCIA antes de AG, PAB/PAE antes de PA)
+_PADRAO = re.compile(r"""
+    \s*(?:
+        (?P<sipat>SIPAT)\b.*?
+      | CONTRATO\s+AG\.\s*(?P<local_contrato>.*?)
+      | CT\s*-\s*(?P<tipo>AGÊNCIA|AG\.|AG|PAB|PAE|PA|EDIFÍCIO)(?:\s+|(?<=\.))(?P<local>.*?)
+      | CT\s*-\s*(?P<local_ct>.*?)
+      | (?P<local_livre>.*?)
+    )
+    (?:\s*[,/]\s*(?P<uf>[A-Z]{2}))?\s*
+""", re.VERBOSE | re.DOTALL)
+
+
+class Denominacao(NamedTuple):
+    """Resultado da interpretação; campos ausentes ficam como ''"""
+    prefixo: str
+    categoria: str
+    local: str
+    cidade: str
+    uf: str
+
+
+VAZIA = Denominacao('', 'outro', '', '', '')
+
+
+def _interpretar(denominacao) -> Denominacao:
+    if not isinstance(denominacao, str) or not denominacao.strip():
+        return VAZIA
+    partes = _PADRAO.fullmatch(denominacao)
+    uf = partes['uf'] or ''
+    if partes['sipat']:
+        return Denominacao('SIPAT', 'sipat', '', '', uf)
+    if partes['local_contrato'] is not None:
+        prefixo, categoria, local = 'CONTRATO AG.', 'agencia', partes['local_contrato']
+    elif partes['tipo']:
+        (prefixo, categoria), local = PREFIXOS[partes['tipo']], partes['local']
+    elif partes['local_ct'] is not None:
+        prefixo, categoria, local = 'CT', 'outro', partes['local_ct']
+    else:
+        prefixo, categoria, local = '', 'outro', partes['local_livre']
+    local = local.strip()
+    cidade = _CIDADE_NO_LOCAL.fullmatch(local)
+    return Denominacao(prefixo, categoria, local, cidade['cidade'] if cidade else local, uf)
+
+
+@lru_cache(maxsize=TAMANHO_CACHE)
+def interpretar_denominacao(denominacao) -> Denominacao:
+    """Prefixo, categoria, local, cidade e UF de uma denominação (ex.: "CT - AG VIÇOSA, AL")"""
+    return _interpretar(denominacao)
+
+
+def estatisticas_cache() -> Dict[str, int]:
+    """Acertos e falhas acumulados do cache neste processo"""
+    info = interpretar_denominacao.cache_info()
+    return {'denominacoesCacheAcertos': info.hits, 'denominacoesCacheFalhas': info.misses}
+
+
+def registrar_cache(metricas, antes: Optional[Dict[str, int]] = None):
+    """Soma aos contadores de metricas as consultas ao cache feitas desde antes (estatisticas_cache())"""
+    for nome, quantidade in estatisticas_cache().items():
+        metricas.contar(nome, quantidade - (antes or {}).get(nome, 0))
+
+
+def descrever_cache(contadores: Dict[str, int]) -> Optional[str]:
+    """Ex.: "98.7% de acerto em 10.000 consultas", ou None se o cache não foi usado"""
+    acertos = contadores.get('denominacoesCacheAcertos', 0)
+    consultas = acertos + contadores.get('denominacoesCacheFalhas', 0)
+    if not consultas:
+        return None
+    return f"{acertos / consultas:.1%} de acerto em {consultas:,} consultas".replace(',', '.')
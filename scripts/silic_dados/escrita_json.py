@@ -0,0 +1,229 @@
+"""
+Escrita incremental do dados-sap.json
+
+Os registros são gravados em disco à medida que são produzidos, sem montar o
+dicionário completo em memória. A primeira seção vai direto para o arquivo de
+saída; as demais ficam em arquivos temporários e são anexadas ao final, junto
+com os metadados. O resultado é idêntico ao de json.dump(dados, indent=2).
+
+Para geração em paralelo, cada processo grava suas seções com um
+EscritorFragmentos e o processo principal junta os fragmentos, na ordem, com
+EscritorJSONIncremental.anexar, sem desserializar os registros.
+
+Os arquivos são gravados em modo binário para que as posições em bytes de cada
+registro sejam conhecidas; com um IndiceDados elas vão para o dados-sap.indice.json.
+Com um EscritorPaginado (silic_dados.paginacao) os mesmos registros também são
+gravados em páginas para o carregamento sob demanda no navegador, com um
+EscritorColunar (silic_dados.colunar) no formato colunar compacto, com um
+EscritorSQLite (silic_dados.banco) num banco SQLite e, com um IndiceVencimentos
+(silic_dados.vencimentos), alimentam a linha do tempo de vencimentos.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from typing import Dict, Iterable, Optional
+
+from .arquivos import permissoes_usuais
+from .indice import IndiceDados
+
+
+class _FormatoJSON:
+    """Formatação comum aos registros: indentação de 2 espaços ou compacta"""
+
+    def __init__(self, secoes: Iterable[str], compacto: bool, indice: Optional[IndiceDados] = None):
+        self.secoes = list(secoes)
+        self.compacto = compacto
+        self.indent = None if compacto else 2
+        self.separadores = (',', ':') if compacto else (',', ': ')
+        self.contagens = {secao: 0 for secao in self.secoes}
+        self.indice = indice
+
+    def _quebra(self, nivel: int) -> str:
+        return '' if self.compacto else '\n' + ' ' * (self.indent * nivel)
+
+    def _serializar(self, valor, nivel: int) -> str:
+        texto = json.dumps(valor, ensure_ascii=False, indent=self.indent,
+                           separators=self.separadores)
+        if self.compacto:
+            return texto
+        # Strings JSON nunca contêm quebras de linha literais, então é seguro reindentar
+        return texto.replace('\n', '\n' + ' ' * (self.indent * nivel))
+
+    def _arquivo(self, secao: str):
+        raise NotImplementedError
+
+    def escrever(self, secao: str, registro: Dict):
+        """Grava um registro ao final da seção informada"""
+        arquivo = self._arquivo(secao)
+        if self.contagens[secao]:
+            arquivo.write(b',')
+        arquivo.write(self._quebra(2).encode('utf-8'))
+        texto = self._serializar(registro, 2).encode('utf-8')
+        if self.indice is not None:
+            inicio = arquivo.tell()
+            self.indice.registrar(secao, registro, inicio, inicio + len(texto))
+        arquivo.write(texto)
+        self.contagens[secao] += 1
+
+
+class EscritorJSONIncremental(_FormatoJSON):
+    """Grava {"<seção>": [...], ..., "metadados": {...}} registro a registro"""
+
+    def __init__(self, caminho: str, secoes: Iterable[str] = ('imoveis', 'locadores'),
+                 compacto: bool = False, indice: Optional[IndiceDados] = None, paginas=None,
+                 colunar=None, vencimentos=None, banco=None):
+        super().__init__(secoes, compacto, indice)
+        self.caminho = caminho
+        self.paginas = paginas
+        self.colunar = colunar
+        self.vencimentos = vencimentos
+        self.banco = banco
+        self.caminho_indice = None
+        self.caminho_manifesto = None
+        self.caminho_colunar = None
+        self.caminho_vencimentos = None
+        self.caminho_banco = None
+        self.finalizado = False
+
+        diretorio = os.path.dirname(os.path.abspath(caminho))
+        self._tmp_saida = tempfile.NamedTemporaryFile(
+            'wb', dir=diretorio, suffix='.tmp', delete=False
+        )
+        # Seções além da primeira são acumuladas em disco até o fechamento
+        self._spools = {
+            secao: tempfile.TemporaryFile('w+b', dir=diretorio)
+            for secao in self.secoes[1:]
+        }
+
+        self._tmp_saida.write(b'{' if compacto else b'{\n')
+        self._abrir_secao(self._tmp_saida, self.secoes[0])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo_erro, erro, tb):
+        if not self.finalizado:
+            self.descartar()
+        return False
+
+    def _abrir_secao(self, arquivo, secao: str):
+        prefixo = '' if self.compacto else ' ' * self.indent
+        arquivo.write(f"{prefixo}{json.dumps(secao)}{self.separadores[1]}[".encode('utf-8'))
+
+    def _arquivo(self, secao: str):
+        return self._tmp_saida if secao == self.secoes[0] else self._spools[secao]
+
+    def escrever(self, secao: str, registro: Dict):
+        super().escrever(secao, registro)
+        if self.paginas is not None:
+            self.paginas.escrever(secao, registro)
+        if self.colunar is not None:
+            self.colunar.escrever(secao, registro)
+        if self.vencimentos is not None:
+            self.vencimentos.escrever(secao, registro)
+        if self.banco is not None:
+            self.banco.escrever(secao, registro)
+
+    def anexar(self, secao: str, caminho: str, quantidade: int, indice: Optional[IndiceDados] = None):
+        """
+        Anexa à seção os registros já serializados por um EscritorFragmentos de mesmo
+        formato; com índice, o índice do fragmento é incorporado ao deste escritor
+        """
+        if not quantidade:
+            return
+        if any(destino is not None for destino in (self.paginas, self.colunar, self.vencimentos, self.banco)):
+            raise ValueError("Fragmentos já serializados não podem ser paginados, exportados em colunas "
+                             "ou para o SQLite nem entrar na linha do tempo de vencimentos")
+        arquivo = self._arquivo(secao)
+        if self.contagens[secao]:
+            arquivo.write(b',')
+        if self.indice is not None:
+            if indice is None:
+                raise ValueError(f"Fragmento de '{secao}' sem índice para um escritor com índice")
+            self.indice.incorporar(secao, indice, arquivo.tell())
+        with open(caminho, 'rb') as fragmento:
+            shutil.copyfileobj(fragmento, arquivo)
+        self.contagens[secao] += quantidade
+
+    def _fechar_secao(self, secao: str):
+        if self.contagens[secao]:
+            self._tmp_saida.write(self._quebra(1).encode('utf-8'))
+        self._tmp_saida.write(b']')
+
+    def finalizar(self, metadados: Optional[Dict] = None):
+        """Anexa as demais seções e os metadados e move o arquivo para o destino"""
+        saida = self._tmp_saida
+        self._fechar_secao(self.secoes[0])
+        for secao in self.secoes[1:]:
+            saida.write((',' + self._quebra(0)).encode('utf-8'))
+            self._abrir_secao(saida, secao)
+            if self.indice is not None:
+                self.indice.deslocar(secao, saida.tell())
+            spool = self._spools[secao]
+            spool.seek(0)
+            shutil.copyfileobj(spool, saida)
+            spool.close()
+            self._fechar_secao(secao)
+        if metadados is not None:
+            prefixo = '' if self.compacto else ' ' * self.indent
+            saida.write((
+                f",{self._quebra(0)}{prefixo}\"metadados\"{self.separadores[1]}"
+                f"{self._serializar(metadados, 1)}"
+            ).encode('utf-8'))
+        saida.write(b'}' if self.compacto else b'\n}')
+        saida.close()
+        permissoes_usuais(saida.name)
+        os.replace(saida.name, self.caminho)
+        self.finalizado = True
+        if self.indice is not None:
+            self.caminho_indice = self.indice.salvar(self.caminho, metadados)
+        if self.paginas is not None:
+            self.caminho_manifesto = self.paginas.finalizar(metadados)
+        if self.colunar is not None:
+            self.caminho_colunar = self.colunar.finalizar(metadados)
+        if self.vencimentos is not None:
+            self.caminho_vencimentos = self.vencimentos.finalizar(metadados)
+        if self.banco is not None:
+            self.caminho_banco = self.banco.finalizar(metadados)
+
+    def descartar(self):
+        """Remove os arquivos temporários sem tocar no destino"""
+        for spool in self._spools.values():
+            spool.close()
+        self._tmp_saida.close()
+        if os.path.exists(self._tmp_saida.name):
+            os.remove(self._tmp_saida.name)
+        if self.paginas is not None:
+            self.paginas.descartar()
+        if self.colunar is not None:
+            self.colunar.descartar()
+        if self.vencimentos is not None:
+            self.vencimentos.descartar()
+        if self.banco is not None:
+            self.banco.descartar()
+
+
+class EscritorFragmentos(_FormatoJSON):
+    """Grava cada seção em <prefixo>.<seção>.part, pronta para EscritorJSONIncremental.anexar"""
+
+    def __init__(self, prefixo: str, secoes: Iterable[str] = ('imoveis', 'locadores'),
+                 compacto: bool = False, indice: Optional[IndiceDados] = None):
+        super().__init__(secoes, compacto, indice)
+        self.caminhos = {secao: f"{prefixo}.{secao}.part" for secao in self.secoes}
+        self._arquivos = {secao: open(caminho, 'wb') for secao, caminho in self.caminhos.items()}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo_erro, erro, tb):
+        self.fechar()
+        return False
+
+    def _arquivo(self, secao: str):
+        return self._arquivos[secao]
+
+    def fechar(self):
+        for arquivo in self._arquivos.values():
+            arquivo.close()
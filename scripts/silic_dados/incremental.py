@@ -0,0 +1,126 @@
+"""
+Importação incremental do import-sap-data
+
+EstadoIncremental guarda uma impressão digital (md5) das células de cada Contrato
+e, na execução seguinte, devolve os registros já gravados para as linhas que não
+mudaram, sem remapeá-las (ver mapeamento.mapear_sap).
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from .arquivos import gravar_atomico
+from .mapeamento import gerar_id
+
+
+def valor_canonico(valor):
+    """Representação textual estável de uma célula, igual na leitura inteira e em blocos"""
+    if valor is None or (not isinstance(valor, str) and pd.isna(valor)):
+        return ''
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    return str(valor)
+
+
+class EstadoIncremental:
+    """
+    Impressões digitais (md5) do conteúdo de cada Contrato na execução anterior,
+    junto com os registros já gravados em dados-sap.json, para reaproveitar
+    as linhas que não mudaram
+    """
+
+    def __init__(self, impressoes_path, output_path, contexto):
+        self.impressoes_path = impressoes_path
+        self.contexto = contexto
+        self.impressoes_anteriores = {}
+        self.impressoes = {}
+        self.origens_anteriores = {}
+        self.origens = {}
+        self.imoveis = {}
+        self.locadores = {}
+        self.novos = 0
+        self.alterados = 0
+        self.inalterados = 0
+        self.prefixo = hashlib.md5()
+        # Motivo pelo qual o estado anterior foi ignorado (arquivo ilegível ou truncado)
+        self.aviso = None
+
+        if os.path.exists(impressoes_path) and os.path.exists(output_path):
+            try:
+                self._carregar(impressoes_path, output_path)
+            except (OSError, ValueError, KeyError, TypeError) as erro:
+                # Sem estado anterior, todas as linhas são processadas de novo
+                self.impressoes_anteriores, self.origens_anteriores = {}, {}
+                self.imoveis, self.locadores = {}, {}
+                self.aviso = f"Estado incremental ilegível ({type(erro).__name__}: {erro})"
+
+    def _carregar(self, impressoes_path, output_path):
+        with open(impressoes_path, encoding='utf-8') as f:
+            estado = json.load(f)
+        self.impressoes_anteriores = dict(estado['contratos'])
+        self.origens_anteriores = dict(estado['locadores'])
+        with open(output_path, encoding='utf-8') as f:
+            dados = json.load(f)
+        self.imoveis = {imovel['id']: imovel for imovel in dados.get('imoveis', [])}
+        self.locadores = {locador['id']: locador for locador in dados.get('locadores', [])}
+
+    def definir_colunas(self, colunas, formato=''):
+        """As colunas e o formato de saída entram na impressão: mudar qualquer um invalida tudo"""
+        self.prefixo = hashlib.md5('\x1f'.join([formato, *map(str, colunas)]).encode())
+
+    def impressao(self, valores):
+        md5 = self.prefixo.copy()
+        md5.update('\x1f'.join(map(valor_canonico, valores)).encode())
+        return md5.hexdigest()
+
+    def reaproveitar(self, contrato, impressao, status, locador_id=None):
+        """
+        Retorna (imóvel, locador) da execução anterior se a linha não mudou,
+        ou None se ela precisa ser processada. Se o locador resolvido agora
+        (locador_id) não é o da execução anterior, a linha também é remapeada.
+        """
+        self.impressoes[contrato] = {'impressao': impressao, 'status': status}
+        anterior = self.impressoes_anteriores.get(contrato)
+        if anterior is None:
+            self.novos += 1
+            return None
+        imovel = self.imoveis.get(gerar_id(f"imovel_{contrato}"))
+        locador = self.locadores.get(imovel['locadorId']) if imovel else None
+        # O status depende da data de hoje, então um contrato pode vencer sem mudar no SAP
+        if (anterior != self.impressoes[contrato] or locador is None
+                or (locador_id is not None and locador['id'] != locador_id)):
+            self.alterados += 1
+            return None
+        self.inalterados += 1
+        return imovel, locador
+
+    def registrar_locador(self, locador, contrato, remontar=None):
+        """
+        Registra o contrato cuja linha deu origem ao locador nesta execução.
+        Um locador reaproveitado (remontar informado) que veio de outra linha da
+        vez anterior, que pode ter mudado ou sumido, é remontado com remontar()
+        a partir desta, como numa importação completa.
+        """
+        locador_id = locador['id']
+        if remontar is not None and self.origens_anteriores.get(locador_id) != contrato:
+            locador = remontar()
+        anterior = self.locadores.get(locador_id, {})
+        if 'dataRegistro' in locador and 'dataRegistro' in anterior:
+            locador['dataRegistro'] = anterior['dataRegistro']
+        self.origens[locador_id] = contrato
+        return locador
+
+    @property
+    def removidos(self):
+        return len(self.impressoes_anteriores.keys() - self.impressoes.keys())
+
+    def salvar(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.impressoes_path)), exist_ok=True)
+        gravar_atomico(self.impressoes_path,
+                       json.dumps({'contratos': self.impressoes, 'locadores': self.origens}, ensure_ascii=False))
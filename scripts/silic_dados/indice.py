@@ -0,0 +1,123 @@
+"""
+Índice auxiliar do dados-sap.json (dados-sap.indice.json)
+
+Gravado pelo EscritorJSONIncremental ao lado do JSON, com as posições em bytes de
+cada registro e os mapas locadorId/estado/cidade/status/contrato -> imóveis. Assim o
+SAPDataLoader resolve filtros e junções sem percorrer os registros e, em arquivos
+grandes, busca só os registros que precisa (HTTP Range) em vez do arquivo inteiro.
+
+Os mapas guardam posições (índice no array "ids" da seção), não os IDs em si, o que
+deixa o arquivo menor e permite ir direto às posições em bytes.
+"""
+
+import json
+import os
+from array import array
+from typing import Dict, List, Optional
+
+from .arquivos import gravar_atomico
+
+VERSAO_INDICE = 1
+
+MAPAS = ('porLocador', 'porEstado', 'porCidade', 'porStatus')
+
+
+def caminho_indice(caminho_dados: str) -> str:
+    """public/dados-sap.json -> public/dados-sap.indice.json"""
+    base, extensao = os.path.splitext(caminho_dados)
+    return f"{base}.indice{extensao or '.json'}"
+
+
+def chaves_imovel(imovel: Dict) -> Dict[str, Optional[str]]:
+    """Chaves indexadas de um imóvel, tanto no formato REISCNBP + REISBU quanto no plano"""
+    edificio = imovel.get('edificio')
+    if isinstance(edificio, dict):
+        contrato = (imovel.get('contrato') or {}).get('numero')
+        estado, cidade, status = edificio.get('regiao'), edificio.get('local'), edificio.get('status')
+    else:
+        contrato = imovel.get('codigo')
+        estado, cidade, status = imovel.get('estado'), imovel.get('cidade'), imovel.get('status')
+    return {
+        'porLocador': imovel.get('locadorId'),
+        'porEstado': estado,
+        'porCidade': cidade,
+        'porStatus': status,
+        'porContrato': None if contrato is None else str(contrato),
+    }
+
+
+class IndiceDados:
+    """Acumula IDs, posições em bytes e mapas de busca enquanto o JSON é gravado"""
+
+    def __init__(self):
+        self.ids: Dict[str, List[str]] = {}
+        self.inicios: Dict[str, array] = {}
+        self.fins: Dict[str, array] = {}
+        self.mapas: Dict[str, Dict[str, List[int]]] = {mapa: {} for mapa in MAPAS}
+        self.por_contrato: Dict[str, int] = {}
+
+    def _secao(self, secao: str):
+        if secao not in self.ids:
+            self.ids[secao] = []
+            self.inicios[secao] = array('q')
+            self.fins[secao] = array('q')
+        return self.ids[secao]
+
+    def registrar(self, secao: str, registro: Dict, inicio: int, fim: int):
+        """Registra um registro gravado entre os bytes [inicio, fim) da seção"""
+        ids = self._secao(secao)
+        posicao = len(ids)
+        ids.append(registro.get('id'))
+        self.inicios[secao].append(inicio)
+        self.fins[secao].append(fim)
+        if secao != 'imoveis':
+            return
+        chaves = chaves_imovel(registro)
+        for mapa in MAPAS:
+            if chaves[mapa] is not None:
+                self.mapas[mapa].setdefault(str(chaves[mapa]), []).append(posicao)
+        if chaves['porContrato'] is not None:
+            self.por_contrato[chaves['porContrato']] = posicao
+
+    def deslocar(self, secao: str, deslocamento: int):
+        """Soma deslocamento às posições em bytes da seção (seções gravadas em arquivo temporário)"""
+        if secao in self.ids and deslocamento:
+            self.inicios[secao] = array('q', (p + deslocamento for p in self.inicios[secao]))
+            self.fins[secao] = array('q', (p + deslocamento for p in self.fins[secao]))
+
+    def incorporar(self, secao: str, outro: 'IndiceDados', deslocamento: int):
+        """Anexa ao final da seção os registros de outro índice, gravados a partir de deslocamento"""
+        ids = self._secao(secao)
+        if secao not in outro.ids:
+            return
+        primeira = len(ids)
+        ids.extend(outro.ids[secao])
+        self.inicios[secao].extend(p + deslocamento for p in outro.inicios[secao])
+        self.fins[secao].extend(p + deslocamento for p in outro.fins[secao])
+        if secao != 'imoveis':
+            return
+        for mapa in MAPAS:
+            for chave, posicoes in outro.mapas[mapa].items():
+                self.mapas[mapa].setdefault(chave, []).extend(p + primeira for p in posicoes)
+        for contrato, posicao in outro.por_contrato.items():
+            self.por_contrato[contrato] = posicao + primeira
+
+    def salvar(self, caminho_dados: str, metadados: Optional[Dict] = None):
+        """Grava <dados>.indice.json de forma atômica, referenciando o arquivo de dados já gravado"""
+        dados = {
+            'versao': VERSAO_INDICE,
+            'arquivo': os.path.basename(caminho_dados),
+            'tamanhoArquivo': os.path.getsize(caminho_dados),
+            'metadados': metadados,
+        }
+        for secao, ids in self.ids.items():
+            dados[secao] = {
+                'ids': ids,
+                'inicio': self.inicios[secao].tolist(),
+                'fim': self.fins[secao].tolist(),
+            }
+        dados.update(self.mapas)
+        dados['porContrato'] = self.por_contrato
+
+        return gravar_atomico(caminho_indice(caminho_dados),
+                              json.dumps(dados, ensure_ascii=False, separators=(',', ':')))
@@ -0,0 +1,174 @@
+"""
+Leitura da planilha SAP (rel-SAP.xlsx)
+
+Por padrão a primeira aba é lida inteira com pd.read_excel. Com tamanho_bloco
+definido, as linhas são percorridas direto do xlsx (openpyxl em modo read-only)
+e entregues em DataFrames de até tamanho_bloco linhas, sem carregar a aba
+inteira em memória.
+
+Com cache (silic_dados.cache_planilha.CachePlanilha), os blocos lidos são gravados
+e, enquanto a planilha não mudar, as execuções seguintes os leem do cache sem abrir
+o xlsx. Na leitura em blocos o cache guarda pedaços de até LINHAS_AMOSTRA linhas, que
+são reagrupados no tamanho_bloco e no limite de memória da execução que os lê.
+"""
+
+from typing import Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Tamanho do primeiro bloco quando há limite de memória: serve para estimar
+# quantos bytes cada linha ocupa antes de dimensionar os blocos seguintes
+LINHAS_AMOSTRA = 1000
+
+
+def converter_celula(valor):
+    """Converte o valor de uma célula como o pd.read_excel faz (vazio vira NaN, floats inteiros viram int)"""
+    if valor is None:
+        return np.nan
+    if isinstance(valor, float) and valor.is_integer():
+        return int(valor)
+    return valor
+
+
+class LeitorPlanilha:
+    """Lê a primeira aba de um xlsx inteira ou em blocos de linhas"""
+
+    def __init__(self, caminho: str, tamanho_bloco: Optional[int] = None,
+                 limite_memoria_mb: Optional[float] = None, cache=None):
+        self.caminho = caminho
+        self.tamanho_bloco = tamanho_bloco
+        self.limite_memoria = limite_memoria_mb * 1024 * 1024 if limite_memoria_mb else None
+        self.linhas_lidas = 0
+        self.do_cache = False
+        self._df = None
+        self._workbook = None
+        self._cache = cache
+        self._entrada_cache = None
+
+        if cache is not None:
+            self._nome_cache = cache.nome(caminho, 'blocos' if tamanho_bloco else 'inteira')
+            self._entrada_cache = cache.abrir(self._nome_cache)
+            if self._entrada_cache is not None:
+                self.do_cache = True
+                self.colunas = self._entrada_cache.colunas
+                self.total_estimado = self._entrada_cache.total
+                return
+
+        if tamanho_bloco:
+            from openpyxl import load_workbook
+
+            self._workbook = load_workbook(caminho, read_only=True, data_only=True)
+            self._aba = self._workbook.worksheets[0]
+            cabecalho = next(self._aba.iter_rows(max_row=1, values_only=True), ())
+            self.colunas = self._nomear_colunas(cabecalho)
+            # A dimensão gravada no xlsx pode faltar ou estar desatualizada
+            self.total_estimado = (self._aba.max_row - 1) if self._aba.max_row else None
+        else:
+            self._df = pd.read_excel(caminho, sheet_name=0)
+            self.colunas = self._df.columns.tolist()
+            self.total_estimado = len(self._df)
+
+    @staticmethod
+    def _nomear_colunas(cabecalho) -> List[str]:
+        colunas = [
+            str(nome) if nome is not None else f"Unnamed: {i}"
+            for i, nome in enumerate(cabecalho)
+        ]
+        while colunas and colunas[-1].startswith('Unnamed: '):
+            colunas.pop()
+        return colunas
+
+    def blocos(self) -> Iterator[pd.DataFrame]:
+        """Gera os DataFrames da planilha; o índice continua de um bloco para o outro"""
+        if self._entrada_cache is not None:
+            if self.tamanho_bloco:
+                yield from self._reagrupar(self._entrada_cache.blocos())
+                return
+            for bloco in self._entrada_cache.blocos():
+                self.linhas_lidas += len(bloco)
+                yield bloco
+            return
+        if self._cache is None:
+            yield from self._ler_blocos()
+            return
+
+        # Só uma leitura completa vira entrada do cache
+        gravacao = self._cache.gravar(self._nome_cache, self.colunas)
+        concluida = False
+        try:
+            for bloco in self._ler_blocos():
+                if self.tamanho_bloco:
+                    for inicio in range(0, len(bloco), LINHAS_AMOSTRA):
+                        gravacao.adicionar(bloco.iloc[inicio:inicio + LINHAS_AMOSTRA])
+                else:
+                    gravacao.adicionar(bloco)
+                yield bloco
+            concluida = True
+        finally:
+            if concluida:
+                gravacao.concluir()
+            else:
+                gravacao.descartar()
+
+    def _ler_blocos(self) -> Iterator[pd.DataFrame]:
+        if self._df is not None:
+            self.linhas_lidas = len(self._df)
+            yield self._df
+            return
+
+        num_colunas = len(self.colunas)
+        tamanho = min(self.tamanho_bloco, LINHAS_AMOSTRA) if self.limite_memoria else self.tamanho_bloco
+        linhas = []
+        try:
+            for valores in self._aba.iter_rows(min_row=2, values_only=True):
+                valores = valores[:num_colunas]
+                # Linhas em branco são ignoradas, como no pd.read_excel
+                if all(valor is None for valor in valores):
+                    continue
+                linha = [converter_celula(valor) for valor in valores]
+                linha.extend([np.nan] * (num_colunas - len(linha)))
+                linhas.append(linha)
+                if len(linhas) >= tamanho:
+                    bloco = self._montar_bloco(linhas)
+                    tamanho = self._ajustar_tamanho(bloco)
+                    linhas = []
+                    yield bloco
+            if linhas:
+                yield self._montar_bloco(linhas)
+        finally:
+            self._workbook.close()
+
+    def _reagrupar(self, pedacos: Iterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Junta/fatia os pedaços gravados no cache em blocos do tamanho (e limite de memória) desta leitura"""
+        tamanho = min(self.tamanho_bloco, LINHAS_AMOSTRA) if self.limite_memoria else self.tamanho_bloco
+        partes, linhas = [], 0
+        for pedaco in pedacos:
+            while len(pedaco):
+                parte = pedaco.iloc[:tamanho - linhas]
+                pedaco = pedaco.iloc[len(parte):]
+                partes.append(parte)
+                linhas += len(parte)
+                if linhas >= tamanho:
+                    bloco = partes[0] if len(partes) == 1 else pd.concat(partes)
+                    self.linhas_lidas += len(bloco)
+                    tamanho = self._ajustar_tamanho(bloco)
+                    partes, linhas = [], 0
+                    yield bloco
+        if partes:
+            bloco = partes[0] if len(partes) == 1 else pd.concat(partes)
+            self.linhas_lidas += len(bloco)
+            yield bloco
+
+    def _montar_bloco(self, linhas: List[list]) -> pd.DataFrame:
+        inicio = self.linhas_lidas
+        self.linhas_lidas += len(linhas)
+        return pd.DataFrame(linhas, columns=self.colunas, dtype=object,
+                            index=pd.RangeIndex(inicio, self.linhas_lidas))
+
+    def _ajustar_tamanho(self, bloco: pd.DataFrame) -> int:
+        """Dimensiona o próximo bloco para caber no limite de memória"""
+        if not self.limite_memoria:
+            return self.tamanho_bloco
+        bytes_por_linha = bloco.memory_usage(deep=True).sum() / len(bloco)
+        return max(1, min(self.tamanho_bloco, int(self.limite_memoria / bytes_por_linha)))
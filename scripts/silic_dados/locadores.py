@@ -0,0 +1,137 @@
+"""
+Deduplicação de locadores com IDs estáveis entre execuções
+
+Os dois importadores identificam o locador pelo CPF/CNPJ normalizado (só dígitos,
+completado com zeros à esquerda quando o Excel o leu como número) e, sem documento,
+pelo nome normalizado. O ID é derivado dessa chave, e não da ordem das linhas, então
+reordenar ou filtrar a planilha não muda os IDs.
+
+O mapa chave -> ID pode ser gravado entre execuções (.cache/locadores/ids.json). Com
+ele, um locador que apareceu só pelo nome e depois ganhou documento mantém o ID, e
+uma eventual colisão de hash é resolvida sempre do mesmo jeito.
+"""
+
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from typing import Dict, Optional, Tuple
+
+from .arquivos import gravar_atomico
+
+VERSAO_MAPA = 1
+
+CAMINHO_MAPA_PADRAO = os.path.join('.cache', 'locadores', 'ids.json')
+
+_NAO_DIGITOS = re.compile(r'\D')
+_ESPACOS = re.compile(r'\s+')
+
+
+def normalizar_documento(documento) -> str:
+    """CPF/CNPJ só com dígitos: 11 (CPF) ou 14 (CNPJ), recompondo zeros perdidos; '' se ausente"""
+    if documento is None or documento != documento:  # None e NaN
+        return ''
+    if isinstance(documento, float) and documento.is_integer():
+        documento = int(documento)
+    digitos = _NAO_DIGITOS.sub('', str(documento))
+    if not digitos.strip('0'):
+        return ''
+    if len(digitos) <= 11:
+        return digitos.zfill(11)
+    if len(digitos) <= 14:
+        return digitos.zfill(14)
+    return digitos
+
+
+def normalizar_nome(nome) -> str:
+    """Nome em maiúsculas, sem acentos e com espaços simples; '' se ausente"""
+    if not isinstance(nome, str):
+        return ''
+    sem_acentos = unicodedata.normalize('NFKD', nome).encode('ascii', 'ignore').decode('ascii')
+    return _ESPACOS.sub(' ', sem_acentos).strip().upper()
+
+
+def _derivar_id(chave: str, tentativa: int = 0) -> str:
+    semente = f"locador_{chave.split(':', 1)[1]}" if chave.startswith('doc:') else f"locador_{chave}"
+    if tentativa:
+        semente += f"#{tentativa}"
+    return hashlib.md5(semente.encode()).hexdigest()[:12]
+
+
+class DeduplicadorLocadores:
+    """Resolve (documento, nome) para o ID estável do locador e diz se ele já apareceu nesta execução"""
+
+    def __init__(self, caminho_mapa: Optional[str] = None):
+        self.caminho_mapa = caminho_mapa
+        self.ids: Dict[str, str] = {}
+        self.novos: Dict[str, str] = {}
+        self.emitidos = set()
+        if caminho_mapa and os.path.exists(caminho_mapa):
+            with open(caminho_mapa, encoding='utf-8') as f:
+                dados = json.load(f)
+            if dados.get('versao') == VERSAO_MAPA:
+                self.ids = dados['ids']
+        self._ids_usados = set(self.ids.values())
+        self._ids_com_documento = {i for chave, i in self.ids.items() if chave.startswith('doc:')}
+
+    def _atribuir(self, chave: str, locador_id: str):
+        self.ids[chave] = locador_id
+        self.novos[chave] = locador_id
+        self._ids_usados.add(locador_id)
+        if chave.startswith('doc:'):
+            self._ids_com_documento.add(locador_id)
+
+    def _novo_id(self, chave: str) -> str:
+        tentativa = 0
+        locador_id = _derivar_id(chave)
+        while locador_id in self._ids_usados:
+            tentativa += 1
+            locador_id = _derivar_id(chave, tentativa)
+        return locador_id
+
+    def identificar(self, documento, nome) -> Tuple[Optional[str], bool]:
+        """
+        (ID, novo) do locador: novo é True na primeira vez que o ID aparece nesta
+        execução. (None, False) se não há documento nem nome.
+        """
+        doc = normalizar_documento(documento)
+        nome_normalizado = normalizar_nome(nome)
+        chave_nome = f"nome:{nome_normalizado}" if nome_normalizado else None
+        chave = f"doc:{doc}" if doc else chave_nome
+        if chave is None:
+            return None, False
+
+        locador_id = self.ids.get(chave)
+        if locador_id is None:
+            # Conhecido antes só pelo nome: o primeiro documento com esse nome herda o ID
+            herdado = self.ids.get(chave_nome) if doc and chave_nome else None
+            if herdado is not None and herdado not in self._ids_com_documento:
+                locador_id = herdado
+            else:
+                locador_id = self._novo_id(chave)
+            self._atribuir(chave, locador_id)
+        return locador_id, self.emitir(locador_id)
+
+    def emitir(self, locador_id: str) -> bool:
+        """Marca o locador como gravado nesta execução; False se ele já tinha sido"""
+        if locador_id in self.emitidos:
+            return False
+        self.emitidos.add(locador_id)
+        return True
+
+    def incorporar(self, novos: Dict[str, str]):
+        """Junta as atribuições feitas por outro processo (ex.: um worker do pool)"""
+        for chave, locador_id in novos.items():
+            if chave not in self.ids:
+                self._atribuir(chave, locador_id)
+
+    def salvar(self) -> Optional[str]:
+        """Grava o mapa chave -> ID de forma atômica, se houver caminho e algo novo"""
+        if not self.caminho_mapa or not self.novos:
+            return None
+        os.makedirs(os.path.dirname(os.path.abspath(self.caminho_mapa)), exist_ok=True)
+        gravar_atomico(self.caminho_mapa,
+                       json.dumps({'versao': VERSAO_MAPA, 'ids': self.ids}, ensure_ascii=False, separators=(',', ':')))
+        self.novos = {}
+        return self.caminho_mapa
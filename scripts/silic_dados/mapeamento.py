@@ -0,0 +1,448 @@
+"""
+Mapeamento dos lotes normalizados para os registros gravados em dados-sap.json
+
+Última etapa antes da escrita no pipeline (silic_dados.pipeline). Cada formato de
+saída é um gerador que recebe os lotes deduplicados e produz (seção, registro):
+
+- mapear_sap com formato 'reis' (padrão dos dois importadores): estrutura REISCNBP +
+  REISBU lida diretamente pelo SAPDataLoader do front-end, a mesma do
+  gerar-dados-mockados, com o tipo e o status do imóvel já derivados;
+- mapear_sap com formato 'prototipo': formato plano do protótipo SILIC 2.0;
+- mapear_planilha: formato plano do converter-excel-para-json, próximo das colunas do SAP,
+  com o status derivado das datas como no formato 'reis' (determinar_status_edificio).
+"""
+
+import hashlib
+import re
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional, Tuple
+
+from .contexto import ContextoExecucao
+from .progresso import Metricas
+
+_NAO_DIGITOS = re.compile(r'\D')
+
+
+def mapear_planilha(lotes: Iterable, metricas: Optional[Metricas] = None,
+                    contexto: Optional[ContextoExecucao] = None) -> Iterator[Tuple[str, dict]]:
+    """Registros no formato do converter-excel-para-json, lote a lote"""
+    metricas = metricas if metricas is not None else Metricas()
+    contexto = contexto if contexto is not None else ContextoExecucao()
+    for lote in lotes:
+        nomes = lote.valores('Nome/ender.')
+        documentos = lote.valores('NºID fiscal')
+        tipos_id = lote.valores('Tipo ID Fiscal')
+        emails = lote.valores('Endereço de e-mail', None)
+        telefones = lote.valores('Nº telefone', None)
+        celulares = lote.valores('Telefone celular', None)
+        ruas = lote.valores('Rua')
+        numeros = lote.valores('Nº')
+        bairros = lote.valores('Bairro')
+        locais = lote.valores('Local')
+        regioes = lote.valores('Região')
+        ceps = lote.valores('Código postal')
+        funcoes = lote.valores('Denom.função PN')
+        parceiros = lote.valores('Parceiro de negócios')
+        inicios_relacao = lote.valores('Início da relação', None)
+        fins_relacao = lote.valores('Fim da relação', None)
+        codigos = lote.valores('Contrato')
+        denominacoes = lote.valores('Denominação do contrato')
+        tipos_contrato = lote.valores('Denom.tipo contrato')
+        inicios_contrato = lote.valores('Início do contrato', None)
+        fins_validade = lote.valores('Fim da validade', None)
+        rescisoes = lote.valores('Rescisão em', None)
+
+        for i, idx in enumerate(lote.indice):
+            locador_id = lote.locadores[i]
+            if lote.novos[i]:
+                tipo_id = tipos_id[i]
+                yield 'locadores', {
+                    "id": locador_id,
+                    "nome": nomes[i],
+                    "tipo": 'juridica' if tipo_id and 'BR2' in str(tipo_id) else 'fisica',
+                    "tipoIdFiscal": tipo_id,
+                    "documento": documentos[i],
+                    "email": emails[i],
+                    "telefone": telefones[i],
+                    "telefoneCelular": celulares[i],
+                    "endereco": {
+                        "logradouro": ruas[i],
+                        "numero": numeros[i],
+                        "bairro": bairros[i],
+                        "cidade": locais[i],
+                        "estado": regioes[i],
+                        "cep": ceps[i]
+                    },
+                    "funcao": funcoes[i],
+                    "parceiroNegocio": parceiros[i],
+                    "inicioRelacao": inicios_relacao[i],
+                    "fimRelacao": fins_relacao[i],
+                    "status": "ativo",
+                    "dataRegistro": contexto.carimbo
+                }
+            elif locador_id:
+                metricas.contar('locadoresDeduplicados')
+
+            partes = lote.denominacoes[i]
+            yield 'imoveis', {
+                "id": f"imovel_{str(idx + 1).zfill(6)}",
+                "codigo": codigos[i],
+                "denominacao": denominacoes[i],
+                "tipoContrato": tipos_contrato[i] or 'Contrato de Locação - Imóveis',
+                "local": partes.local,
+                "cidade": partes.cidade,
+                "estado": partes.uf,
+                "endereco": ruas[i],
+                "numero": numeros[i],
+                "bairro": bairros[i],
+                "cep": ceps[i],
+                "utilizacaoPrincipal": "Próprio",  # Pode ser ajustado conforme regra de negócio
+                "status": determinar_status_edificio(
+                    {'Rescisão em': rescisoes[i], 'Fim da validade': fins_validade[i]}, contexto),
+                "inicioValidade": inicios_contrato[i],
+                "objetoValidoAte": fins_validade[i],
+                "rescisaoEm": rescisoes[i],
+                "parceiroNegocio": parceiros[i],
+                "inscricaoIPTU": None,
+                "numeroITR": None,
+                "area": None,
+                "valorAluguel": None,
+                "locadorId": locador_id,
+                "dataRegistro": contexto.carimbo
+            }
+
+
+# === Formato do protótipo SILIC 2.0 (import-sap-data) ===
+# As funções abaixo recebem uma linha normalizada (Lote.linha): textos sem espaços
+# nas pontas, vazios como None e datas como texto ISO.
+
+def formatar_telefone(telefone):
+    """Formata telefone removendo código do país se necessário"""
+    if telefone is None:
+        return ""
+    if isinstance(telefone, float):
+        telefone = int(telefone)
+    tel = _NAO_DIGITOS.sub('', str(telefone))
+    # Remove código do país (55) se presente
+    if tel.startswith('55') and len(tel) > 11:
+        tel = tel[2:]
+    return tel
+
+
+def gerar_id(seed):
+    """Gera um ID único baseado em uma seed"""
+    return hashlib.md5(str(seed).encode()).hexdigest()[:12]
+
+
+def determinar_tipo_imovel(denominacao):
+    """Determina o tipo do imóvel baseado na denominação"""
+    denominacao_lower = (denominacao or '').lower()
+
+    if 'ag ' in denominacao_lower or 'agência' in denominacao_lower:
+        return 'comercial'
+    elif 'residencial' in denominacao_lower or 'casa' in denominacao_lower or 'apartamento' in denominacao_lower:
+        return 'residencial'
+    elif 'terreno' in denominacao_lower or 'lote' in denominacao_lower:
+        return 'terreno'
+    elif 'galpão' in denominacao_lower or 'industrial' in denominacao_lower:
+        return 'industrial'
+    else:
+        return 'comercial'  # Default para agências
+
+
+def determinar_status_contrato(row, contexto):
+    """Determina o status do contrato baseado nas datas, na data da execução"""
+    # Se tem data de rescisão, está inativo/vendido
+    if row['Rescisão em'] is not None:
+        return 'vendido'
+
+    # Verifica se o contrato está vigente (datas ISO se comparam como texto)
+    fim_validade = row['Fim da validade']
+    if fim_validade is not None:
+        if fim_validade < contexto.carimbo:
+            return 'manutencao'  # Contrato vencido
+        else:
+            return 'ocupado'  # Contrato vigente
+
+    return 'disponivel'
+
+
+def mapear_locador(row, documento, locador_id, contexto):
+    """Monta o registro do locador a partir de uma linha do SAP"""
+    # Extrai nome do campo "Nome/ender." (formato: NOME / ENDEREÇO)
+    nome_completo = row['Nome/ender.'] or ''
+    nome = nome_completo.split('/')[0].strip() if '/' in nome_completo else nome_completo
+
+    locador = {
+        'id': locador_id,
+        'nome': nome,
+        'tipo': 'fisica' if row['Tipo ID Fiscal'] == 'CPF' else 'juridica',
+        'documento': documento,
+        'email': None,  # Não disponível no arquivo
+        'telefone': formatar_telefone(row['Nº telefone']) if row['Nº telefone'] is not None else None,
+        'endereco': {
+            'logradouro': row['Rua'],
+            'numero': str(row['Nº']) if row['Nº'] is not None else None,
+            'bairro': row['Bairro'],
+            'cidade': row['Local'],
+            'estado': row['Região'],
+            'cep': row['Código postal'],
+        },
+        'status': 'ativo' if row['Denom.função PN'] == 'Proponente Credor' else 'inativo',
+        'dataRegistro': contexto.carimbo,
+        'dataAtualizacao': contexto.carimbo
+    }
+    return locador
+
+
+def mapear_imovel(row, partes, locador_id, contexto):
+    """Monta o registro do imóvel a partir de uma linha do SAP e da denominação interpretada"""
+    imovel_id = gerar_id(f"imovel_{row['Contrato']}")
+
+    # Endereço do imóvel vem da denominação do contrato (ex.: "CT - AG VIÇOSA DE ALAGOAS, AL")
+    denominacao = row['Denominação do contrato']
+
+    imovel = {
+        'id': imovel_id,
+        'codigo': str(row['Contrato']),
+        'endereco': denominacao,  # Usa a denominação completa como endereço
+        'bairro': row['Bairro'] if row['Bairro'] is not None else 'Centro',
+        'cidade': partes.cidade,
+        'cep': row['Código postal'] if row['Código postal'] is not None else '',
+        'estado': partes.uf,
+        'tipo': determinar_tipo_imovel(denominacao),
+        'status': determinar_status_contrato(row, contexto),
+        'area': None,  # Não disponível no arquivo
+        'valor': None,  # Não disponível no arquivo
+        'descricao': f"Contrato nº {row['Contrato']} - {row['Denom.tipo contrato']}",
+        'fotos': [],
+        'caracteristicas': {
+            'contratoInicio': row['Início do contrato'],
+            'contratoFim': row['Fim da validade'],
+            'tipoContrato': row['Denom.tipo contrato'],
+            'parceiroNegocio': str(row['Parceiro de negócios']),
+        },
+        'locadorId': locador_id,
+        'dataRegistro': row['Início do contrato'] or contexto.carimbo,
+        'dataAtualizacao': contexto.carimbo
+    }
+
+    return imovel
+
+
+# === Formato REISCNBP + REISBU (SAPDataLoader) ===
+
+ESTRUTURA_REIS = 'SAP REISCNBP + REISBU'
+VERSAO_REIS = '2.0'
+
+
+def tipo_por_edificio(tipo_edificio):
+    """Tipo do imóvel no front-end a partir do tipo de edifício do REISBU (regra do SAPDataLoader)"""
+    nome = (tipo_edificio or '').lower()
+    if 'terreno' in nome:
+        return 'terreno'
+    elif 'galpão' in nome:
+        return 'industrial'
+    elif 'casa' in nome:
+        return 'residencial'
+    return 'comercial'
+
+
+def status_por_edificio(status_edificio):
+    """Status do imóvel no front-end a partir do status do edifício do REISBU (regra do SAPDataLoader)"""
+    status = (status_edificio or '').lower()
+    if 'prospecção' in status:
+        return 'prospeccao'
+    elif 'mobilização' in status and 'des' not in status:
+        return 'mobilizacao'
+    elif 'desmobilização' in status:
+        return 'desmobilizacao'
+    return 'ativo'
+
+
+def determinar_status_edificio(row, contexto):
+    """Status do edifício no vocabulário do REISBU, pelas datas do contrato na data da execução"""
+    rescisao = row['Rescisão em']
+    if rescisao is not None:
+        return 'Desativado' if rescisao <= contexto.carimbo else 'Em Desmobilização'
+    fim_validade = row['Fim da validade']
+    if fim_validade is not None and fim_validade < contexto.carimbo:
+        return 'Desativado'
+    return 'Ativo'
+
+
+def _inteiro(valor):
+    """Números que o Excel leu como float (10000000.0) voltam a ser inteiros"""
+    if isinstance(valor, float) and valor.is_integer():
+        return int(valor)
+    return valor
+
+
+def mapear_locador_reis(row, documento, locador_id, contexto):
+    """Monta o locador no formato REISCNBP a partir de uma linha do SAP"""
+    nome_completo = row['Nome/ender.'] or ''
+    tipo_id = row.get('Tipo ID Fiscal')
+    if documento:
+        tipo = 'juridica' if len(documento) == 14 else 'fisica'
+    else:
+        tipo = 'juridica' if tipo_id and 'BR2' in str(tipo_id) else 'fisica'
+    return {
+        'id': locador_id,
+        'parceiroNegocio': _inteiro(row.get('Parceiro de negócios')),
+        'tipoIdFiscal': tipo_id,
+        'numeroIdFiscal': documento,
+        'nome': nome_completo.split('/')[0].strip(),
+        'nomeEndereco': nome_completo,
+        'funcaoPN': row.get('Denom.função PN'),
+        'tipo': tipo,
+        'endereco': {
+            'rua': row.get('Rua'),
+            'numero': _inteiro(row.get('Nº')),
+            'bairro': row.get('Bairro'),
+            'cidade': row.get('Local'),
+            'regiao': row.get('Região'),
+            'cep': row.get('Código postal'),
+        },
+        'email': row.get('Endereço de e-mail'),
+        'telefone': formatar_telefone(row.get('Nº telefone')) or None,
+        'telefoneCelular': formatar_telefone(row.get('Telefone celular')) or None,
+        'inicioRelacao': row.get('Início da relação'),
+        'fimRelacao': row.get('Fim da relação'),
+        'status': 'ativo' if row.get('Denom.função PN') == 'Proponente Credor' else 'inativo',
+    }
+
+
+def mapear_imovel_reis(row, partes, locador_id, contexto):
+    """
+    Monta o imóvel no formato REISCNBP (contrato) + REISBU (edifício). O relatório de
+    contratos não traz os dados cadastrais do edifício, que ficam null; cidade e UF
+    vêm da denominação. tipo e status já saem derivados, como o SAPDataLoader os usa.
+    """
+    denominacao = row['Denominação do contrato']
+    status = determinar_status_edificio(row, contexto)
+    return {
+        'id': gerar_id(f"imovel_{row['Contrato']}"),
+        'contrato': {
+            'numero': _inteiro(row['Contrato']),
+            'denominacao': denominacao,
+            'tipoContrato': row['Denom.tipo contrato'],
+            'inicioContrato': row['Início do contrato'],
+            'fimValidade': row['Fim da validade'],
+            'rescisaoEm': row['Rescisão em'],
+            'parceiroNegocio': _inteiro(row.get('Parceiro de negócios')),
+        },
+        'edificio': {
+            'codigo': None,
+            'denominacao': None,
+            'status': status,
+            'cep': row.get('Código postal'),
+            'local': partes.cidade,
+            'rua': row.get('Rua'),
+            'numero': _inteiro(row.get('Nº')),
+            'bairro': row.get('Bairro'),
+            'regiao': partes.uf,
+            'inicioValidadeObj': None,
+            'objetoValidoAte': row['Fim da validade'],
+            'tipoEdificio': {'codigo': None, 'nome': None},
+            'criadoPor': None,
+            'chavePais': 'BR',
+            'endereco': denominacao,
+            'estadoConservacao': None,
+            'funcao': {'codigo': None, 'nome': None},
+            'denominacaoImovel': None,
+            'utilizacaoPrincipal': None,
+            'tipoApolice': None,
+            'inscricaoIPTU': None,
+            'numeroITR': None,
+            'grupoAutorizacoes': None,
+        },
+        'locadorId': locador_id,
+        'tipo': determinar_tipo_imovel(denominacao),
+        'status': status_por_edificio(status),
+    }
+
+
+def metadados_reis(carimbo, fonte, total_imoveis, total_locadores):
+    """Metadados no formato lido pelo SAPDataLoader"""
+    return {
+        'dataGeracao': carimbo,
+        'fonte': fonte,
+        'versao': VERSAO_REIS,
+        'totalImoveis': total_imoveis,
+        'totalLocadores': total_locadores,
+        'estrutura': ESTRUTURA_REIS,
+    }
+
+
+class FormatoSAP(NamedTuple):
+    """Montagem do locador e do imóvel e o status que entra na impressão do modo incremental"""
+    locador: Callable
+    imovel: Callable
+    status: Callable
+
+
+FORMATOS = {
+    'reis': FormatoSAP(mapear_locador_reis, mapear_imovel_reis, determinar_status_edificio),
+    'prototipo': FormatoSAP(mapear_locador, mapear_imovel, determinar_status_contrato),
+}
+
+
+def mapear_sap(lotes: Iterable, formato: str = 'reis', metricas: Optional[Metricas] = None,
+               contexto: Optional[ContextoExecucao] = None, incremental=None,
+               verboso: bool = False, total: Optional[int] = None) -> Iterator[Tuple[str, dict]]:
+    """
+    Registros no formato informado (ver FORMATOS), lote a lote. Com incremental
+    (EstadoIncremental), contratos inalterados desde a última execução reaproveitam
+    os registros anteriores. verboso imprime uma linha por registro.
+    """
+    metricas = metricas if metricas is not None else Metricas()
+    contexto = contexto if contexto is not None else ContextoExecucao()
+    montagem = FORMATOS[formato]
+    for lote in lotes:
+        for i, idx in enumerate(lote.indice):
+            row = lote.linha(i)
+            locador_id, novo_locador = lote.locadores[i], lote.novos[i]
+            documento = lote.documentos[i]
+            if incremental is not None:
+                with metricas.medir('impressao'):
+                    contrato = str(row['Contrato'])
+                    anterior = incremental.reaproveitar(
+                        contrato, incremental.impressao(lote.brutos(i)), montagem.status(row, contexto),
+                        locador_id
+                    )
+                if anterior is not None:
+                    imovel, locador = anterior
+                    if novo_locador:
+                        locador = incremental.registrar_locador(
+                            locador, contrato, lambda: montagem.locador(row, documento, locador_id, contexto)
+                        )
+                        yield 'locadores', locador
+                    else:
+                        metricas.contar('locadoresDeduplicados')
+                    yield 'imoveis', imovel
+                    continue
+
+            if verboso:
+                print(f"🔄 Processando registro {idx + 1}/{total}: {row['Denominação do contrato']}")
+
+            # === PROCESSAR LOCADOR ===
+            if novo_locador:
+                locador = montagem.locador(row, documento, locador_id, contexto)
+                if incremental is not None:
+                    locador = incremental.registrar_locador(locador, contrato)
+                yield 'locadores', locador
+                if verboso:
+                    print(f"  👤 Locador criado: {locador['nome']} ({documento})")
+            elif locador_id is None:
+                if verboso:
+                    print("  👤 Linha sem CPF/CNPJ nem nome de locador")
+            else:
+                metricas.contar('locadoresDeduplicados')
+                if verboso:
+                    print(f"  👤 Locador já existente: {documento}")
+
+            # === PROCESSAR IMÓVEL ===
+            imovel = montagem.imovel(row, lote.denominacoes[i], locador_id, contexto)
+            yield 'imoveis', imovel
+            if verboso:
+                print(f"  🏢 Imóvel criado: {row['Denominação do contrato']} (Código: {row['Contrato']})")
+                print()
@@ -0,0 +1,170 @@
+"""
+Mesclagem de uma nova importação do SAP com o dados-sap.json existente
+
+Em vez de substituir o dataset inteiro (e perder o que foi editado à mão), a nova
+importação é aplicada sobre o existente: imóveis casados pelo número do contrato e
+locadores pelo CPF/CNPJ normalizado (sem documento, pelo ID). Os campos que o SAP
+não fornece (CAMPOS_PRESERVADOS) mantêm o valor existente quando a importação os
+traz vazios. Cada seção existente vira um dicionário chave -> registro (hash join):
+cada registro novo é casado com uma consulta, sem laços aninhados.
+
+O locador casado mantém o ID existente, e os imóveis da importação que apontavam
+para o ID novo são redirecionados para ele. Registros que só existem no dataset
+atual são mantidos, a menos que remover_ausentes seja pedido. Cada inserção,
+atualização e remoção vai para o log de mudanças, com os campos alterados.
+"""
+
+import json
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .colunar import achatar
+from .locadores import normalizar_documento
+
+# Campos que não vêm da planilha SAP, por seção (caminhos com pontos nos objetos aninhados)
+CAMPOS_PRESERVADOS = {
+    'imoveis': ('area', 'valorAluguel', 'inscricaoIPTU', 'edificio.inscricaoIPTU'),
+    'locadores': ('email',),
+}
+
+
+def chave_imovel(imovel: Dict) -> Optional[str]:
+    """Número do contrato: contrato.numero no formato REIS, codigo nos formatos planos (como indice.chaves_imovel)"""
+    contrato = imovel.get('contrato')
+    numero = contrato.get('numero') if isinstance(contrato, dict) else imovel.get('codigo')
+    return None if numero is None else f"contrato:{numero}"
+
+
+def chave_locador(locador: Dict) -> Optional[str]:
+    documento = normalizar_documento(locador.get('numeroIdFiscal', locador.get('documento')))
+    if documento:
+        return f"documento:{documento}"
+    return None if locador.get('id') is None else f"id:{locador['id']}"
+
+
+CHAVES = {'imoveis': chave_imovel, 'locadores': chave_locador}
+
+
+def _vazio(valor) -> bool:
+    return valor is None or valor == ''
+
+
+def _preservar(antigo: Dict, novo: Dict, campos: Iterable[str]) -> List[str]:
+    """Copia para novo os campos vazios nele e preenchidos em antigo; devolve os campos copiados"""
+    preservados = []
+    for campo in campos:
+        *caminho, chave = campo.split('.')
+        origem, destino = antigo, novo
+        for parte in caminho:
+            origem, destino = origem.get(parte), destino.get(parte)
+            if not isinstance(origem, dict) or not isinstance(destino, dict):
+                break
+        else:
+            if chave in origem and not _vazio(origem[chave]) and _vazio(destino.get(chave)):
+                destino[chave] = origem[chave]
+                preservados.append(campo)
+    return preservados
+
+
+def diferencas(antigo: Dict, novo: Dict) -> Dict[str, list]:
+    """Campos (com pontos) que mudaram de antigo para novo: {campo: [antes, depois]}"""
+    if antigo == novo:
+        return {}
+    a = {'.'.join(caminho): valor for caminho, valor in achatar(antigo)}
+    b = {'.'.join(caminho): valor for caminho, valor in achatar(novo)}
+    return {campo: [a.get(campo), b.get(campo)] for campo in {**a, **b} if a.get(campo) != b.get(campo)}
+
+
+class MesclagemDados:
+    """
+    Aplica os registros de uma importação sobre os de um dataset existente.
+    registrar recebe cada mudança (dicionário do log); contagens soma as ações por seção.
+    """
+
+    def __init__(self, existentes: Dict[str, List[Dict]], preservados: Optional[Dict[str, Iterable[str]]] = None,
+                 remover_ausentes: bool = False, registrar: Optional[Callable[[Dict], None]] = None):
+        self.preservados = preservados if preservados is not None else CAMPOS_PRESERVADOS
+        self.remover_ausentes = remover_ausentes
+        self.registrar = registrar if registrar is not None else (lambda mudanca: None)
+        self.contagens = {secao: dict.fromkeys(('inseridos', 'atualizados', 'inalterados', 'mantidos', 'removidos'), 0)
+                          for secao in CHAVES}
+        self.campos_preservados = 0
+        self._existentes = {secao: existentes.get(secao, []) for secao in CHAVES}
+        # Hash join: chave -> posição do registro existente
+        self._por_chave: Dict[str, Dict[str, int]] = {}
+        for secao, chave_de in CHAVES.items():
+            indice = self._por_chave[secao] = {}
+            for posicao, registro in enumerate(self._existentes[secao]):
+                chave = chave_de(registro)
+                if chave is not None:
+                    indice.setdefault(chave, posicao)
+        self._casados = {secao: set() for secao in CHAVES}
+        self.ids_locador: Dict[str, str] = {}
+
+    def _aplicar(self, secao: str, novo: Dict) -> Dict:
+        chave = CHAVES[secao](novo)
+        posicao = self._por_chave[secao].get(chave) if chave is not None else None
+        if posicao is None or posicao in self._casados[secao]:
+            self.contagens[secao]['inseridos'] += 1
+            self.registrar({'secao': secao, 'chave': chave, 'id': novo.get('id'), 'acao': 'inserido'})
+            return novo
+        self._casados[secao].add(posicao)
+        antigo = self._existentes[secao][posicao]
+        preservados = _preservar(antigo, novo, self.preservados.get(secao, ()))
+        self.campos_preservados += len(preservados)
+        if secao == 'locadores' and antigo.get('id') != novo.get('id'):
+            self.ids_locador[novo['id']] = antigo['id']
+            novo['id'] = antigo['id']
+        mudancas = diferencas(antigo, novo)
+        if not mudancas:
+            self.contagens[secao]['inalterados'] += 1
+            return novo
+        self.contagens[secao]['atualizados'] += 1
+        mudanca = {'secao': secao, 'chave': chave, 'id': novo.get('id'), 'acao': 'atualizado', 'campos': mudancas}
+        if preservados:
+            mudanca['preservados'] = preservados
+        self.registrar(mudanca)
+        return novo
+
+    def _ausentes(self, secao: str) -> Iterator[Dict]:
+        for posicao, antigo in enumerate(self._existentes[secao]):
+            if posicao in self._casados[secao]:
+                continue
+            if self.remover_ausentes:
+                self.contagens[secao]['removidos'] += 1
+                self.registrar({'secao': secao, 'chave': CHAVES[secao](antigo), 'id': antigo.get('id'),
+                                'acao': 'removido'})
+            else:
+                self.contagens[secao]['mantidos'] += 1
+                yield antigo
+
+    def mesclar(self, importados: Dict[str, List[Dict]]) -> Iterator[Tuple[str, Dict]]:
+        """
+        (seção, registro) do dataset mesclado: os locadores primeiro (os IDs que mudam são
+        conhecidos antes dos imóveis), depois os imóveis; em cada seção, os importados na
+        ordem da importação e em seguida os existentes que não vieram nela
+        """
+        for locador in importados.get('locadores', []):
+            yield 'locadores', self._aplicar('locadores', locador)
+        for locador in self._ausentes('locadores'):
+            yield 'locadores', locador
+        for imovel in importados.get('imoveis', []):
+            locador_id = imovel.get('locadorId')
+            if locador_id in self.ids_locador:
+                imovel['locadorId'] = self.ids_locador[locador_id]
+            yield 'imoveis', self._aplicar('imoveis', imovel)
+        for imovel in self._ausentes('imoveis'):
+            yield 'imoveis', imovel
+
+
+class LogMudancas:
+    """Grava o log de mudanças em JSON Lines, uma mudança por linha"""
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self._arquivo = open(caminho, 'w', encoding='utf-8')
+
+    def __call__(self, mudanca: Dict):
+        self._arquivo.write(json.dumps(mudanca, ensure_ascii=False) + '\n')
+
+    def fechar(self):
+        self._arquivo.close()
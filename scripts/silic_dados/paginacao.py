@@ -0,0 +1,182 @@
+"""
+Saída paginada do dados-sap.json para o carregamento no navegador
+
+Além do JSON completo, grava páginas de tamanho fixo em <saida>/ e um manifesto
+(<saida>.manifesto.json) com as contagens e URLs das páginas. O SAPDataLoader
+busca a primeira página logo de início e as demais sob demanda, então o tempo até
+a primeira linha não cresce com a carteira.
+
+Páginas de imóveis podem ser só por quantidade de registros ou agrupadas por
+estado; locadores ficam em páginas próprias e cada página de imóveis lista, nos
+metadados, as páginas de locadores que referencia.
+"""
+
+import json
+import os
+import re
+import shutil
+import tempfile
+from typing import Dict, List, Optional
+
+from .arquivos import gravar_atomico, permissoes_usuais
+from .escrita_json import EscritorJSONIncremental
+from .indice import chaves_imovel
+
+VERSAO_MANIFESTO = 1
+
+AGRUPAMENTOS = ('registros', 'estado')
+
+
+def caminho_manifesto(caminho_dados: str) -> str:
+    """public/dados-sap.json -> public/dados-sap.manifesto.json"""
+    base, extensao = os.path.splitext(caminho_dados)
+    return f"{base}.manifesto{extensao or '.json'}"
+
+
+def _nome_seguro(valor) -> str:
+    return re.sub(r'[^A-Za-z0-9]+', '-', str(valor)).strip('-') or 'SEM-VALOR'
+
+
+class _Pagina:
+    """Uma página em gravação: {"<seção>": [...], "metadados": {...}}"""
+
+    def __init__(self, diretorio: str, nome: str, secao: str, compacto: bool):
+        self.nome = nome
+        self.escritor = EscritorJSONIncremental(os.path.join(diretorio, nome), (secao,), compacto)
+        self.secao = secao
+        self.primeiro_id = None
+        self.ultimo_id = None
+        self.paginas_locadores = set()
+
+    @property
+    def total(self) -> int:
+        return self.escritor.contagens[self.secao]
+
+    def escrever(self, registro: Dict):
+        if self.primeiro_id is None:
+            self.primeiro_id = registro.get('id')
+        self.ultimo_id = registro.get('id')
+        self.escritor.escrever(self.secao, registro)
+
+
+class EscritorPaginado:
+    """Grava páginas de imóveis e locadores e o manifesto, registro a registro"""
+
+    def __init__(self, caminho_dados: str, tamanho_pagina: int = 1000, agrupar_por: str = 'registros',
+                 compacto: bool = True):
+        if agrupar_por not in AGRUPAMENTOS:
+            raise ValueError(f"Agrupamento inválido: {agrupar_por} (use {', '.join(AGRUPAMENTOS)})")
+        if tamanho_pagina < 1:
+            raise ValueError("O tamanho da página deve ser positivo")
+        self.caminho_dados = caminho_dados
+        self.tamanho_pagina = tamanho_pagina
+        self.agrupar_por = agrupar_por
+        self.compacto = compacto
+        self.contagens = {'imoveis': 0, 'locadores': 0}
+
+        base = os.path.splitext(os.path.abspath(caminho_dados))[0]
+        self.diretorio = base
+        self.nome_diretorio = os.path.basename(base)
+        # As páginas vão para um diretório temporário e só substituem as anteriores no final
+        self._tmp_diretorio = tempfile.mkdtemp(dir=os.path.dirname(base), prefix=f".{self.nome_diretorio}-")
+
+        self._abertas: Dict[str, _Pagina] = {}
+        self._sequencias: Dict[str, int] = {}
+        self._fechadas: Dict[str, List[Dict]] = {'imoveis': [], 'locadores': []}
+        # locadorId -> número da página de locadores (1-based), para as referências das páginas de imóveis
+        self._pagina_do_locador: Dict[str, int] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo_erro, erro, tb):
+        if os.path.isdir(self._tmp_diretorio):
+            self.descartar()
+        return False
+
+    def _chave(self, secao: str, registro: Dict) -> str:
+        if secao == 'imoveis' and self.agrupar_por == 'estado':
+            return f"imoveis-{_nome_seguro(chaves_imovel(registro)['porEstado'] or 'SEM-UF')}"
+        return secao
+
+    def _pagina(self, secao: str, chave: str) -> _Pagina:
+        pagina = self._abertas.get(chave)
+        if pagina is None:
+            self._sequencias[chave] = self._sequencias.get(chave, 0) + 1
+            nome = f"{chave}-{self._sequencias[chave]:04d}.json"
+            pagina = self._abertas[chave] = _Pagina(self._tmp_diretorio, nome, secao, self.compacto)
+        return pagina
+
+    def _fechar(self, chave: str):
+        pagina = self._abertas.pop(chave)
+        entrada = {
+            'url': f"{self.nome_diretorio}/{pagina.nome}",
+            'total': pagina.total,
+            'primeiroId': pagina.primeiro_id,
+            'ultimoId': pagina.ultimo_id,
+        }
+        metadados = {'total': pagina.total}
+        if pagina.secao == 'imoveis':
+            if self.agrupar_por == 'estado':
+                entrada['estado'] = chave[len('imoveis-'):]
+            metadados['paginasLocadores'] = sorted(pagina.paginas_locadores)
+            entrada['paginasLocadores'] = metadados['paginasLocadores']
+        pagina.escritor.finalizar(metadados)
+        self._fechadas[pagina.secao].append(entrada)
+
+    def escrever(self, secao: str, registro: Dict):
+        """Grava o registro na página aberta da seção (ou do estado), abrindo outra quando enche"""
+        chave = self._chave(secao, registro)
+        pagina = self._pagina(secao, chave)
+        pagina.escrever(registro)
+        if secao == 'locadores':
+            # A página de locadores que ainda está aberta recebe o próximo número
+            self._pagina_do_locador[registro.get('id')] = len(self._fechadas['locadores']) + 1
+        else:
+            numero = self._pagina_do_locador.get(registro.get('locadorId'))
+            if numero is not None:
+                pagina.paginas_locadores.add(numero)
+        self.contagens[secao] += 1
+        if pagina.total >= self.tamanho_pagina:
+            self._fechar(chave)
+
+    def finalizar(self, metadados: Optional[Dict] = None):
+        """Fecha as páginas abertas, grava o manifesto e move as páginas para <saida>/"""
+        # Locadores primeiro: a última página de locadores pode ser referenciada pelas de imóveis
+        for chave in sorted(self._abertas, key=lambda c: (c != 'locadores', c)):
+            self._fechar(chave)
+
+        paginas_imoveis = self._fechadas['imoveis']
+        if self.agrupar_por == 'estado':
+            paginas_imoveis.sort(key=lambda p: p['url'])
+        manifesto = {
+            'versao': VERSAO_MANIFESTO,
+            'agrupamento': self.agrupar_por,
+            'tamanhoPagina': self.tamanho_pagina,
+            'totalImoveis': self.contagens['imoveis'],
+            'totalLocadores': self.contagens['locadores'],
+            'metadados': metadados,
+            'paginasImoveis': paginas_imoveis,
+            'paginasLocadores': self._fechadas['locadores'],
+        }
+
+        anterior = None
+        if os.path.isdir(self.diretorio):
+            anterior = tempfile.mkdtemp(dir=os.path.dirname(self.diretorio), prefix=f".{self.nome_diretorio}-old-")
+            os.rmdir(anterior)
+            os.replace(self.diretorio, anterior)
+        permissoes_usuais(self._tmp_diretorio, 0o777)
+        os.replace(self._tmp_diretorio, self.diretorio)
+        if anterior:
+            shutil.rmtree(anterior, ignore_errors=True)
+
+        self.caminho_manifesto = gravar_atomico(caminho_manifesto(self.caminho_dados),
+                                                json.dumps(manifesto, ensure_ascii=False, indent=2))
+        return self.caminho_manifesto
+
+    def descartar(self):
+        """Remove as páginas gravadas sem tocar nas anteriores"""
+        for pagina in self._abertas.values():
+            pagina.escritor.descartar()
+        self._abertas.clear()
+        shutil.rmtree(self._tmp_diretorio, ignore_errors=True)
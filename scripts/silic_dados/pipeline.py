@@ -0,0 +1,193 @@
+"""
+Pipeline de importação da planilha SAP
+
+leitura → validação → normalização → deduplicação → mapeamento → escrita. Cada etapa
+é um gerador que consome o iterador da anterior, então os dados fluem um bloco por
+vez. Pipeline mede cada etapa separadamente: com Metricas.iterar aninhado, o tempo
+de uma etapa não inclui o das etapas anteriores que ela puxa.
+
+As etapas intermediárias trabalham com Lote: o DataFrame lido junto com as colunas
+já limpas (uma conversão por valor distinto), as datas em ISO, as denominações
+interpretadas e, depois da deduplicação, o ID do locador de cada linha. Os dois
+importadores montam seus registros a partir do Lote (silic_dados.mapeamento), em
+vez de cada um limpar e interpretar as células por conta própria.
+"""
+
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .datas import NormalizadorDatas
+from .denominacao import estatisticas_cache, interpretar_denominacao, registrar_cache
+from .leitura_xlsx import LeitorPlanilha
+from .locadores import DeduplicadorLocadores, normalizar_documento
+from .progresso import Metricas
+from .validacao import COLUNAS_DATA
+
+# Tipos inferidos para os quais pd.factorize não mistura valores distintos
+# (em colunas object, 1, 1.0 e True cairiam no mesmo código)
+TIPOS_FATORAVEIS = {'string', 'integer', 'floating', 'boolean', 'datetime', 'datetime64', 'empty'}
+
+
+class Pipeline:
+    """Sequência de etapas (nome, função): a primeira gera o fluxo, as demais recebem o da anterior"""
+
+    def __init__(self, metricas: Optional[Metricas] = None):
+        self.metricas = metricas if metricas is not None else Metricas()
+        self.etapas: List[tuple] = []
+
+    def etapa(self, nome: str, funcao: Callable[..., Iterator]) -> 'Pipeline':
+        """Acrescenta uma etapa; o tempo gasto nela é somado em metricas.etapas[nome]"""
+        self.etapas.append((nome, funcao))
+        return self
+
+    def executar(self) -> Iterator:
+        fluxo = None
+        for i, (nome, funcao) in enumerate(self.etapas):
+            fluxo = self.metricas.iterar(nome, funcao() if i == 0 else funcao(fluxo))
+        return fluxo
+
+
+# === Normalização ===
+
+def limpar_valor(valor):
+    """Limpa e converte valores, tratando NaN"""
+    if pd.isna(valor):
+        return None
+    if isinstance(valor, (int, float)):
+        return valor
+    return str(valor).strip()
+
+
+def mapear_unicos(df, coluna, func, padrao=None):
+    """Aplica func uma vez por valor distinto da coluna e devolve a lista por linha"""
+    if coluna not in df.columns:
+        return [func(padrao)] * len(df)
+    serie = df[coluna]
+    if pd.api.types.infer_dtype(serie, skipna=True) not in TIPOS_FATORAVEIS:
+        return [func(valor) for valor in serie.tolist()]
+    codigos, unicos = pd.factorize(serie)
+    convertidos = np.empty(len(unicos) + 1, dtype=object)
+    for i, valor in enumerate(unicos):
+        convertidos[i] = func(valor)
+    # Código -1 (valor nulo) aponta para a última posição
+    convertidos[-1] = func(None)
+    return convertidos[codigos].tolist()
+
+
+def limpar_coluna(df, coluna, padrao=''):
+    """Versão colunar de limpar_valor"""
+    if coluna in df.columns and pd.api.types.is_numeric_dtype(df[coluna]):
+        valores = np.array(df[coluna].tolist(), dtype=object)
+        valores[df[coluna].isna().to_numpy()] = None
+        return valores.tolist()
+    return mapear_unicos(df, coluna, limpar_valor, padrao)
+
+
+class Lote:
+    """Um bloco da planilha com as colunas normalizadas e, após a deduplicação, os locadores"""
+
+    __slots__ = ('df', 'indice', 'colunas', 'denominacoes', 'documentos', 'locadores', 'novos', '_brutos')
+
+    def __init__(self, df: pd.DataFrame, colunas: Dict[str, list]):
+        self.df = df
+        self.indice = df.index.tolist()
+        self.colunas = colunas
+        self.denominacoes: List = []
+        self.documentos: List[str] = []
+        self.locadores: List[Optional[str]] = []
+        self.novos: List[bool] = []
+        self._brutos = None
+
+    def __len__(self):
+        return len(self.indice)
+
+    def valores(self, coluna: str, padrao='') -> list:
+        """Coluna normalizada; se a planilha não a tem, limpar_valor(padrao) em todas as linhas"""
+        valores = self.colunas.get(coluna)
+        return valores if valores is not None else [limpar_valor(padrao)] * len(self)
+
+    def linha(self, i: int) -> Dict[str, Any]:
+        """Valores normalizados da i-ésima linha do lote, por nome de coluna"""
+        return {coluna: valores[i] for coluna, valores in self.colunas.items()}
+
+    def brutos(self, i: int) -> list:
+        """Células da i-ésima linha como foram lidas, antes da normalização"""
+        if self._brutos is None:
+            self._brutos = self.df.to_numpy(dtype=object)
+        return self._brutos[i]
+
+
+def normalizar(blocos: Iterable[pd.DataFrame], metricas: Optional[Metricas] = None,
+               datas: Optional[NormalizadorDatas] = None) -> Iterator[Lote]:
+    """
+    Etapa de normalização: limpa cada coluna, converte as datas para ISO,
+    interpreta a denominação do contrato e normaliza o CPF/CNPJ, uma vez por valor
+    distinto. No fim soma às métricas as datas inválidas e o uso do cache de denominações.
+    """
+    metricas = metricas if metricas is not None else Metricas()
+    datas = datas if datas is not None else NormalizadorDatas()
+    cache_antes = estatisticas_cache()
+    for df in blocos:
+        colunas = {
+            coluna: datas.coluna(df[coluna].tolist(), coluna) if coluna in COLUNAS_DATA else limpar_coluna(df, coluna)
+            for coluna in df.columns
+        }
+        lote = Lote(df, colunas)
+        lote.denominacoes = [interpretar_denominacao(d) for d in lote.valores('Denominação do contrato')]
+        lote.documentos = mapear_unicos(df, 'NºID fiscal', normalizar_documento)
+        yield lote
+    registrar_cache(metricas, cache_antes)
+    datas.registrar(metricas)
+
+
+def deduplicar(lotes: Iterable[Lote], locadores: Optional[DeduplicadorLocadores] = None) -> Iterator[Lote]:
+    """
+    Etapa de deduplicação: resolve o ID estável do locador de cada linha (pelo CPF/CNPJ
+    ou, sem ele, pelo nome) e marca em lote.novos a primeira aparição de cada um
+    """
+    locadores = locadores if locadores is not None else DeduplicadorLocadores()
+    identificar = locadores.identificar
+    for lote in lotes:
+        resolvidos = [identificar(doc, nome) for doc, nome in zip(lote.documentos, lote.valores('Nome/ender.'))]
+        lote.locadores = [locador_id for locador_id, _ in resolvidos]
+        lote.novos = [novo for _, novo in resolvidos]
+        yield lote
+
+
+def pipeline_sap(caminho: str, mapear: Callable[[Iterable[Lote]], Iterator], metricas: Optional[Metricas] = None,
+                 tamanho_bloco: Optional[int] = None, limite_memoria_mb: Optional[float] = None, cache=None,
+                 validador=None, locadores: Optional[DeduplicadorLocadores] = None, por_lote: bool = True):
+    """
+    Monta o pipeline completo de uma planilha e devolve (leitor, pipeline). As colunas
+    obrigatórias são conferidas aqui (ErroValidacao), antes de qualquer linha ser lida.
+    mapear recebe os lotes deduplicados e gera (seção, registro). Com por_lote=False
+    não há normalização nem deduplicação: mapear recebe os DataFrames validados
+    (usado pelo caminho de referência linha a linha do converter).
+    """
+    metricas = metricas if metricas is not None else Metricas()
+    with metricas.medir('leitura'):
+        leitor = LeitorPlanilha(caminho, tamanho_bloco, limite_memoria_mb, cache)
+    if leitor.do_cache:
+        metricas.contar('planilhasDoCache')
+    pipeline = Pipeline(metricas).etapa('leitura', leitor.blocos)
+    if validador is not None:
+        validador.verificar_colunas(leitor.colunas)
+        pipeline.etapa('validacao', validador.filtrar)
+    if por_lote:
+        pipeline.etapa('normalizacao', lambda blocos: normalizar(blocos, metricas))
+        pipeline.etapa('deduplicacao', lambda lotes: deduplicar(lotes, locadores))
+    pipeline.etapa('mapeamento', mapear)
+    return leitor, pipeline
+
+
+def gravar(registros: Iterable, escritor, metricas: Optional[Metricas] = None,
+           ao_gravar: Optional[Callable[[str, dict], None]] = None):
+    """Etapa de escrita: grava cada (seção, registro) no escritor e avisa ao_gravar"""
+    metricas = metricas if metricas is not None else Metricas()
+    for secao, registro in registros:
+        with metricas.medir('escrita'):
+            escritor.escrever(secao, registro)
+        if ao_gravar is not None:
+            ao_gravar(secao, registro)
@@ -0,0 +1,159 @@
+"""
+Métricas de execução e progresso dos scripts de dados
+
+Metricas acumula o tempo gasto em cada etapa (leitura, mapeamento, deduplicação,
+escrita...) e contadores livres, e gera um resumo em JSON. As medições podem ser
+aninhadas: enquanto uma etapa interna é medida, a externa fica pausada, então
+cada segundo é contado em uma única etapa. RelatorioProgresso
+mostra linhas processadas, taxa e ETA no máximo uma vez por intervalo, em vez
+de uma linha de console por registro.
+"""
+
+import json
+import sys
+import time
+from datetime import timedelta
+from typing import Dict, Iterable, Iterator, Optional
+
+
+class _Cronometro:
+    """Context manager leve (sem contextlib) para medir trechos executados por linha"""
+
+    __slots__ = ('metricas', 'etapa', 'inicio', 'externo')
+
+    def __init__(self, metricas: 'Metricas', etapa: str):
+        self.metricas = metricas
+        self.etapa = etapa
+
+    def __enter__(self):
+        agora = time.perf_counter()
+        self.externo = self.metricas._ativo
+        if self.externo is not None:
+            self.metricas._acumular(self.externo.etapa, agora - self.externo.inicio)
+        self.metricas._ativo = self
+        self.inicio = agora
+        return self
+
+    def __exit__(self, *exc):
+        agora = time.perf_counter()
+        self.metricas._acumular(self.etapa, agora - self.inicio)
+        self.metricas._ativo = self.externo
+        if self.externo is not None:
+            self.externo.inicio = agora
+        return False
+
+
+class Metricas:
+    """Tempo acumulado por etapa e contadores de uma execução"""
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.etapas: Dict[str, float] = {}
+        self.contadores: Dict[str, int] = {}
+        self._ativo: Optional[_Cronometro] = None
+
+    def _acumular(self, etapa: str, segundos: float):
+        self.etapas[etapa] = self.etapas.get(etapa, 0.0) + segundos
+
+    def medir(self, etapa: str) -> _Cronometro:
+        """
+        Soma à etapa o tempo gasto dentro do bloco with, descontado o das etapas
+        medidas dentro dele. O bloco não deve conter yield.
+        """
+        return _Cronometro(self, etapa)
+
+    def iterar(self, etapa: str, iteravel: Iterable) -> Iterator:
+        """Repassa os itens de iteravel somando à etapa o tempo gasto para obtê-los"""
+        iterador = iter(iteravel)
+        while True:
+            with self.medir(etapa):
+                try:
+                    item = next(iterador)
+                except StopIteration:
+                    return
+            yield item
+
+    def contar(self, nome: str, quantidade: int = 1):
+        self.contadores[nome] = self.contadores.get(nome, 0) + quantidade
+
+    def incorporar(self, etapas: Dict[str, float], contadores: Dict[str, int]):
+        """Soma as métricas de outro processo (ex.: um worker do pool)"""
+        for etapa, segundos in etapas.items():
+            self._acumular(etapa, segundos)
+        for nome, quantidade in contadores.items():
+            self.contar(nome, quantidade)
+
+    def resumo(self) -> Dict:
+        return {
+            'duracaoTotal': round(time.perf_counter() - self.inicio, 6),
+            'etapas': {etapa: round(segundos, 6) for etapa, segundos in self.etapas.items()},
+            'contadores': dict(self.contadores),
+        }
+
+    def imprimir(self):
+        """Tabela legível do tempo por etapa"""
+        resumo = self.resumo()
+        print(f"⏱️  Tempo por etapa (total {resumo['duracaoTotal']:.2f}s):")
+        for etapa, segundos in resumo['etapas'].items():
+            print(f"   • {etapa}: {segundos:.2f}s")
+
+    def salvar(self, caminho: str):
+        with open(caminho, 'w', encoding='utf-8') as f:
+            json.dump(self.resumo(), f, ensure_ascii=False, indent=2)
+
+
+class RelatorioProgresso:
+    """Progresso com taxa e ETA, atualizado no máximo uma vez por intervalo (segundos)"""
+
+    def __init__(self, total: Optional[int] = None, metricas: Optional[Metricas] = None,
+                 intervalo: float = 1.0, ativo: bool = True, rotulo: str = 'linhas',
+                 saida=None):
+        self.total = total
+        self.metricas = metricas
+        self.intervalo = intervalo
+        self.ativo = ativo
+        self.rotulo = rotulo
+        self.saida = saida or sys.stdout
+        self.processadas = 0
+        self.inicio = time.perf_counter()
+        self.proxima_exibicao = self.inicio + intervalo
+        self.em_terminal = self.saida.isatty()
+
+    def avancar(self, quantidade: int = 1):
+        if not self.processadas:
+            # A taxa conta a partir do primeiro registro, não da abertura do arquivo
+            self.inicio = time.perf_counter()
+            self.proxima_exibicao = self.inicio + self.intervalo
+        self.processadas += quantidade
+        if self.ativo and time.perf_counter() >= self.proxima_exibicao:
+            self._exibir()
+            self.proxima_exibicao = time.perf_counter() + self.intervalo
+
+    def _exibir(self, final: bool = False):
+        decorrido = time.perf_counter() - self.inicio
+        taxa = self.processadas / decorrido if decorrido else 0.0
+        partes = [f"{self.processadas:,}".replace(',', '.')]
+        if self.total:
+            partes[0] += f"/{self.total:,}".replace(',', '.')
+            partes[0] += f" {self.rotulo} ({self.processadas / self.total:.0%})"
+        else:
+            partes[0] += f" {self.rotulo}"
+        partes.append(f"{taxa:,.0f} {self.rotulo}/s".replace(',', '.'))
+        if self.total and taxa and not final:
+            restante = max(self.total - self.processadas, 0) / taxa
+            partes.append(f"ETA {timedelta(seconds=round(restante))}")
+        deduplicados = self.metricas.contadores.get('locadoresDeduplicados') if self.metricas else None
+        if deduplicados:
+            partes.append(f"{deduplicados:,} locadores deduplicados".replace(',', '.'))
+
+        linha = '⏳ ' + ' • '.join(partes)
+        if self.em_terminal:
+            self.saida.write('\r\033[K' + linha + ('\n' if final else ''))
+        else:
+            self.saida.write(linha + '\n')
+        self.saida.flush()
+
+    def concluir(self):
+        """Exibe a linha final (sempre, se ativo)"""
+        if self.ativo:
+            self._exibir(final=True)
@@ -0,0 +1,222 @@
+"""
+Validação da planilha SAP antes do mapeamento
+
+ValidadorPlanilha confere se as colunas obrigatórias existem (sem elas a importação
+não começa) e valida cada bloco coluna a coluna: contrato preenchido, dígitos
+verificadores do CPF/CNPJ, CEP, UF e datas. Cada verificação é feita uma vez por
+valor distinto da coluna (ou com numpy, no caso dos dígitos verificadores), não por
+linha. As linhas reprovadas saem do bloco e vão para <saida>.rejeitados.csv com os
+motivos; o restante segue para o mapeamento.
+
+Campos vazios não reprovam a linha: sem documento o locador é identificado pelo
+nome, e datas vazias viram null.
+"""
+
+import os
+import re
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .datas import data_invalida
+from .locadores import normalizar_documento
+
+# Colunas sem as quais nenhum dos importadores consegue montar os registros
+COLUNAS_OBRIGATORIAS = (
+    'Contrato', 'Denominação do contrato', 'Denom.tipo contrato', 'Início do contrato',
+    'Fim da validade', 'Rescisão em', 'NºID fiscal', 'Nome/ender.',
+)
+
+COLUNAS_DATA = ('Início do contrato', 'Fim da validade', 'Rescisão em', 'Início da relação', 'Fim da relação')
+
+UFS = frozenset((
+    'AC', 'AL', 'AM', 'AP', 'BA', 'CE', 'DF', 'ES', 'GO', 'MA', 'MG', 'MS', 'MT', 'PA', 'PB', 'PE',
+    'PI', 'PR', 'RJ', 'RN', 'RO', 'RR', 'RS', 'SC', 'SE', 'SP', 'TO',
+))
+
+_CEP = re.compile(r'\d{5}-?\d{3}', re.ASCII)
+
+_PESOS_CPF = (np.arange(10, 1, -1), np.arange(11, 1, -1))
+_PESOS_CNPJ = (np.array([5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]), np.array([6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]))
+
+
+class ErroValidacao(ValueError):
+    """A planilha não tem as colunas necessárias para a importação"""
+
+
+def caminho_rejeitados(caminho_dados: str) -> str:
+    """public/dados-sap.json -> public/dados-sap.rejeitados.csv"""
+    base, _ = os.path.splitext(caminho_dados)
+    return f"{base}.rejeitados.csv"
+
+
+def verificar_colunas(colunas: Iterable[str], obrigatorias: Sequence[str] = COLUNAS_OBRIGATORIAS):
+    """Levanta ErroValidacao listando as colunas obrigatórias ausentes"""
+    existentes = set(colunas)
+    ausentes = [coluna for coluna in obrigatorias if coluna not in existentes]
+    if ausentes:
+        raise ErroValidacao(f"Colunas obrigatórias ausentes na planilha: {', '.join(ausentes)}")
+
+
+def _digitos_verificadores(matriz: np.ndarray, pesos: Tuple[np.ndarray, np.ndarray]) -> np.ndarray:
+    """Confere os dois últimos dígitos de cada linha da matriz (módulo 11)"""
+    validos = np.ones(len(matriz), dtype=bool)
+    for posicao, peso in zip((-2, -1), pesos):
+        resto = (matriz[:, :len(peso)] * peso).sum(axis=1) % 11
+        validos &= matriz[:, posicao] == np.where(resto < 2, 0, 11 - resto)
+    # 000.000.000-00, 111.111.111-11 etc. passam no cálculo mas não são documentos
+    return validos & (matriz != matriz[:, :1]).any(axis=1)
+
+
+def documentos_validos(documentos: Sequence[str]) -> np.ndarray:
+    """Para cada documento normalizado (só dígitos), se é um CPF ou CNPJ com dígitos verificadores corretos"""
+    documentos = np.asarray(documentos, dtype=object)
+    validos = np.zeros(len(documentos), dtype=bool)
+    tamanhos = np.fromiter((len(d) for d in documentos), dtype=np.int64, count=len(documentos))
+    for tamanho, pesos in ((11, _PESOS_CPF), (14, _PESOS_CNPJ)):
+        selecao = np.flatnonzero(tamanhos == tamanho)
+        if len(selecao):
+            texto = ''.join(documentos[selecao]).encode('ascii')
+            matriz = (np.frombuffer(texto, dtype=np.uint8) - ord('0')).reshape(-1, tamanho).astype(np.int64)
+            validos[selecao] = _digitos_verificadores(matriz, pesos)
+    return validos
+
+
+def _cep_valido(valor) -> bool:
+    if isinstance(valor, (int, np.integer)) and not isinstance(valor, bool):
+        return 0 < valor < 100_000_000  # numérico: o Excel pode ter comido o zero à esquerda
+    if isinstance(valor, float):
+        return valor.is_integer() and 0 < valor < 100_000_000
+    return isinstance(valor, str) and (not valor.strip() or _CEP.fullmatch(valor.strip()) is not None)
+
+
+def _uf_valida(valor) -> bool:
+    return isinstance(valor, str) and (not valor.strip() or valor.strip().upper() in UFS)
+
+
+def _invalidos_por_valor(serie: pd.Series, valido: Callable) -> np.ndarray:
+    """Máscara das linhas reprovadas, chamando valido uma vez por valor distinto (vazios passam)"""
+    codigos, unicos = pd.factorize(serie)
+    resultado = np.fromiter((not valido(valor) for valor in unicos), dtype=bool, count=len(unicos))
+    return np.append(resultado, False)[codigos]
+
+
+def _documentos_invalidos(serie: pd.Series) -> np.ndarray:
+    codigos, unicos = pd.factorize(serie)
+    normalizados = [normalizar_documento(valor) for valor in unicos]
+    preenchidos = np.array([bool(d) for d in normalizados], dtype=bool)
+    resultado = preenchidos & ~documentos_validos([d if d else '0' for d in normalizados])
+    return np.append(resultado, False)[codigos]
+
+
+class ValidadorPlanilha:
+    """Valida os blocos da planilha e guarda as linhas reprovadas com os motivos"""
+
+    def __init__(self, obrigatorias: Sequence[str] = COLUNAS_OBRIGATORIAS, planilha: str = ''):
+        self.obrigatorias = tuple(obrigatorias)
+        self.planilha = planilha
+        self.rejeitadas: List[pd.DataFrame] = []
+        self.total_rejeitadas = 0
+        self.motivos: Dict[str, int] = {}
+
+    def verificar_colunas(self, colunas: Iterable[str]):
+        verificar_colunas(colunas, self.obrigatorias)
+
+    def _verificacoes(self, df: pd.DataFrame) -> Iterator[Tuple[str, str, np.ndarray]]:
+        """(motivo, coluna, máscara das linhas reprovadas) de cada verificação aplicável ao bloco"""
+        if 'Contrato' in df.columns:
+            contratos = df['Contrato']
+            vazios = contratos.isna() | (contratos.astype(str).str.strip() == '')
+            yield 'Contrato vazio', 'Contrato', vazios.to_numpy()
+        if 'NºID fiscal' in df.columns:
+            yield 'CPF/CNPJ inválido', 'NºID fiscal', _documentos_invalidos(df['NºID fiscal'])
+        if 'Código postal' in df.columns:
+            yield 'CEP inválido', 'Código postal', _invalidos_por_valor(df['Código postal'], _cep_valido)
+        if 'Região' in df.columns:
+            yield 'UF inválida', 'Região', _invalidos_por_valor(df['Região'], _uf_valida)
+        for coluna in COLUNAS_DATA:
+            # Colunas que o pandas já leu como datas não têm o que reprovar
+            if coluna in df.columns and not pd.api.types.is_datetime64_any_dtype(df[coluna]):
+                yield f"Data inválida em {coluna}", coluna, _invalidos_por_valor(
+                    df[coluna], lambda valor: not data_invalida(valor)
+                )
+
+    def validar(self, df: pd.DataFrame) -> pd.Series:
+        """Motivos de reprovação por linha ('' para as linhas válidas)"""
+        reprovadas = np.zeros(len(df), dtype=bool)
+        verificacoes = []
+        for motivo, coluna, mascara in self._verificacoes(df):
+            if mascara.any():
+                reprovadas |= mascara
+                verificacoes.append((motivo, coluna, mascara))
+        motivos = pd.Series('', index=df.index, dtype=object)
+        if not reprovadas.any():
+            return motivos
+        # Só as linhas reprovadas (poucas) têm o texto dos motivos montado
+        posicoes = np.flatnonzero(reprovadas)
+        textos = [[] for _ in posicoes]
+        for motivo, coluna, mascara in verificacoes:
+            valores = df[coluna].to_numpy()
+            for i, posicao in enumerate(posicoes):
+                if mascara[posicao]:
+                    valor = valores[posicao]
+                    textos[i].append(motivo if motivo == 'Contrato vazio' else f"{motivo}: {valor}")
+            self.motivos[motivo] = self.motivos.get(motivo, 0) + int(mascara.sum())
+        motivos.iloc[posicoes] = ['; '.join(t) for t in textos]
+        return motivos
+
+    def filtrar(self, blocos: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Repassa os blocos sem as linhas reprovadas, que ficam guardadas em rejeitadas"""
+        for df in blocos:
+            motivos = self.validar(df)
+            reprovadas = (motivos != '').to_numpy()
+            if not reprovadas.any():
+                yield df
+                continue
+            rejeitadas = df[reprovadas].copy()
+            # Número da linha no Excel: índice a partir de 0 + cabeçalho
+            rejeitadas.insert(0, 'Motivos', motivos[reprovadas])
+            rejeitadas.insert(0, 'Linha', rejeitadas.index + 2)
+            rejeitadas.insert(0, 'Planilha', os.path.basename(self.planilha))
+            self.rejeitadas.append(rejeitadas)
+            self.total_rejeitadas += int(reprovadas.sum())
+            if not reprovadas.all():
+                yield df[~reprovadas]
+
+    def incorporar(self, rejeitadas: List[pd.DataFrame], motivos: Dict[str, int]):
+        """Junta as linhas reprovadas por outro processo (ex.: um worker do pool)"""
+        self.rejeitadas.extend(rejeitadas)
+        self.total_rejeitadas += sum(len(df) for df in rejeitadas)
+        for motivo, quantidade in motivos.items():
+            self.motivos[motivo] = self.motivos.get(motivo, 0) + quantidade
+
+    def registrar(self, metricas):
+        """Soma as reprovações aos contadores de metricas (linhasRejeitadas e por motivo)"""
+        if self.total_rejeitadas:
+            metricas.contar('linhasRejeitadas', self.total_rejeitadas)
+        for motivo, quantidade in self.motivos.items():
+            metricas.contar(f"linhasRejeitadas[{motivo}]", quantidade)
+
+    def gravar(self, caminho_dados: str) -> Optional[str]:
+        """
+        Grava as linhas reprovadas em <saida>.rejeitados.csv (separado por ';', para
+        abrir no Excel) e devolve o caminho; sem reprovações, apaga o arquivo de uma
+        execução anterior e devolve None
+        """
+        caminho = caminho_rejeitados(caminho_dados)
+        if not self.rejeitadas:
+            if os.path.exists(caminho):
+                os.remove(caminho)
+            return None
+        pd.concat(self.rejeitadas).to_csv(caminho, sep=';', index=False, encoding='utf-8-sig')
+        return caminho
+
+
+def descrever_rejeitadas(contadores: Dict[str, int]) -> List[str]:
+    """Linhas "<motivo>: N" para o resumo, a partir dos contadores de Metricas"""
+    return [
+        f"{nome[len('linhasRejeitadas['):-1]}: {quantidade}"
+        for nome, quantidade in contadores.items()
+        if nome.startswith('linhasRejeitadas[') and quantidade
+    ]
@@ -0,0 +1,211 @@
+"""
+Linha do tempo de vencimentos dos contratos (dados-sap.vencimentos.json)
+
+Gravada pelo EscritorJSONIncremental ao lado do JSON, como o índice auxiliar: para
+cada contrato, o fim da validade e a rescisão em dias ordinais (date.toordinal),
+em colunas ordenadas pelo fim da validade (contratos sem data no fim), mais a ordem
+dos contratos por data de rescisão. Assim "o que vence nos próximos N dias" é uma
+busca binária seguida da leitura das k posições encontradas (O(log n + k)), sem
+percorrer os imóveis, e o status de todos os contratos numa outra data de
+referência sai de poucos cortes nas mesmas listas.
+
+O status recalculado usa as mesmas regras que os mapeamentos aplicam na importação,
+com a data de referência às 0h (como --data-execucao AAAA-MM-DD):
+determinar_status_edificio nos formatos reis e planilha (converter-excel-para-json),
+determinar_status_contrato no protótipo.
+"""
+
+import json
+import os
+from bisect import bisect_left, bisect_right
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from .arquivos import gravar_atomico
+
+VERSAO_VENCIMENTOS = 1
+
+
+def caminho_vencimentos(caminho_dados: str) -> str:
+    """public/dados-sap.json -> public/dados-sap.vencimentos.json"""
+    base, extensao = os.path.splitext(caminho_dados)
+    return f"{base}.vencimentos{extensao or '.json'}"
+
+
+def dia_de(texto) -> Optional[date]:
+    """Data de um texto ISO (com ou sem hora) ou DD/MM/AAAA; None se vazio ou irreconhecível"""
+    if not texto or not isinstance(texto, str):
+        return None
+    try:
+        if '/' in texto:
+            dia, mes, ano = texto.split('/')
+            return date(int(ano), int(mes), int(dia))
+        return date.fromisoformat(texto[:10])
+    except ValueError:
+        return None
+
+
+def _ordinal(texto) -> Optional[int]:
+    data = dia_de(texto)
+    return None if data is None else data.toordinal()
+
+
+def datas_imovel(imovel: Dict) -> Tuple[str, Optional[str], Optional[str], Optional[str], Optional[str]]:
+    """(formato, contrato, fim da validade, rescisão, status do contrato) de um imóvel em qualquer formato"""
+    edificio = imovel.get('edificio')
+    if isinstance(edificio, dict):
+        contrato = imovel.get('contrato') or {}
+        return ('reis', contrato.get('numero'), contrato.get('fimValidade'), contrato.get('rescisaoEm'),
+                edificio.get('status'))
+    caracteristicas = imovel.get('caracteristicas')
+    if isinstance(caracteristicas, dict):
+        # O protótipo não guarda a rescisão, só o status 'vendido' que ela gera
+        rescindido = imovel.get('status') == 'vendido'
+        return ('prototipo', imovel.get('codigo'), caracteristicas.get('contratoFim'),
+                '' if rescindido else None, imovel.get('status'))
+    return ('planilha', imovel.get('codigo'), imovel.get('objetoValidoAte'), imovel.get('rescisaoEm'),
+            imovel.get('status'))
+
+
+class IndiceVencimentos:
+    """
+    Acumula (contrato, fim, rescisão, status) enquanto o JSON é gravado e, no final,
+    grava as colunas ordenadas. Carregado de volta (carregar), responde às consultas
+    por intervalo de datas e recalcula o status em lote.
+    """
+
+    def __init__(self, caminho_dados: str):
+        self.caminho = caminho_vencimentos(caminho_dados)
+        self.caminho_dados = caminho_dados
+        self.formato: Optional[str] = None
+        self.contratos: List[Optional[str]] = []
+        self.fim: List[Optional[int]] = []
+        self.rescisao: List[Optional[int]] = []
+        self.status: List[Optional[str]] = []
+        self.ordem_rescisao: List[int] = []
+        self.preenchidas = 0
+        self.metadados: Optional[Dict] = None
+
+    def __len__(self):
+        return len(self.contratos)
+
+    # === Montagem ===
+
+    def escrever(self, secao: str, registro: Dict):
+        if secao != 'imoveis':
+            return
+        formato, contrato, fim, rescisao, status = datas_imovel(registro)
+        if self.formato is None:
+            self.formato = formato
+        self.contratos.append(None if contrato is None else str(contrato))
+        self.fim.append(_ordinal(fim))
+        # Rescisão sem data legível ('' no protótipo) ainda conta como rescindido
+        self.rescisao.append(None if rescisao is None else (_ordinal(rescisao) or 0))
+        self.status.append(status)
+
+    def _ordenar(self):
+        """Reordena as colunas pelo fim da validade (vazios no fim) e monta a ordem das rescisões"""
+        ordem = sorted(range(len(self.fim)), key=lambda i: (self.fim[i] is None, self.fim[i] or 0))
+        self.contratos = [self.contratos[i] for i in ordem]
+        self.fim = [self.fim[i] for i in ordem]
+        self.rescisao = [self.rescisao[i] for i in ordem]
+        self.status = [self.status[i] for i in ordem]
+        self.preenchidas = sum(1 for dia in self.fim if dia is not None)
+        self.ordem_rescisao = sorted((i for i, dia in enumerate(self.rescisao) if dia is not None),
+                                     key=self.rescisao.__getitem__)
+
+    def finalizar(self, metadados: Optional[Dict] = None) -> str:
+        """Grava <dados>.vencimentos.json de forma atômica"""
+        self._ordenar()
+        dados = {
+            'versao': VERSAO_VENCIMENTOS,
+            'arquivo': os.path.basename(self.caminho_dados),
+            'formato': self.formato,
+            'metadados': metadados,
+            'contratos': self.contratos,
+            'fimValidade': self.fim,
+            'rescisaoEm': self.rescisao,
+            'status': self.status,
+            'ordemRescisao': self.ordem_rescisao,
+        }
+        return gravar_atomico(self.caminho, json.dumps(dados, ensure_ascii=False, separators=(',', ':')))
+
+    def descartar(self):
+        self.contratos, self.fim, self.rescisao, self.status = [], [], [], []
+
+    # === Leitura ===
+
+    @classmethod
+    def carregar(cls, caminho_dados: str) -> 'IndiceVencimentos':
+        """
+        Linha do tempo de caminho_dados. Usa <dados>.vencimentos.json quando ele existe e
+        não é mais antigo que o JSON; senão monta a partir dos imóveis (dados anteriores
+        a este índice ou gravados com --sem-vencimentos).
+        """
+        indice = cls(caminho_dados)
+        if os.path.exists(indice.caminho) and (
+                not os.path.exists(caminho_dados)
+                or os.path.getmtime(indice.caminho) >= os.path.getmtime(caminho_dados)):
+            with open(indice.caminho, encoding='utf-8') as f:
+                dados = json.load(f)
+            indice.formato = dados['formato']
+            indice.metadados = dados.get('metadados')
+            indice.contratos = dados['contratos']
+            indice.fim = dados['fimValidade']
+            indice.rescisao = dados['rescisaoEm']
+            indice.status = dados['status']
+            indice.ordem_rescisao = dados['ordemRescisao']
+            indice.preenchidas = sum(1 for dia in indice.fim if dia is not None)
+            return indice
+        with open(caminho_dados, encoding='utf-8') as f:
+            dados = json.load(f)
+        for imovel in dados.get('imoveis', []):
+            indice.escrever('imoveis', imovel)
+        indice.metadados = dados.get('metadados')
+        indice._ordenar()
+        return indice
+
+    def faixa(self, inicio: date, fim: date) -> Tuple[int, int]:
+        """Posições [lo, hi) dos contratos cujo fim da validade está entre inicio e fim (inclusive)"""
+        lo = bisect_left(self.fim, inicio.toordinal(), 0, self.preenchidas)
+        hi = bisect_right(self.fim, fim.toordinal(), lo, self.preenchidas)
+        return lo, hi
+
+    def vencendo(self, referencia: date, dias: int) -> List[Tuple[str, date, Optional[str]]]:
+        """(contrato, fim da validade, status) dos contratos que vencem entre referencia e referencia + dias"""
+        lo, hi = self.faixa(referencia, date.fromordinal(referencia.toordinal() + dias))
+        return [(self.contratos[i], date.fromordinal(self.fim[i]), self.status[i]) for i in range(lo, hi)]
+
+    def rescindindo(self, inicio: date, fim: date) -> List[Tuple[str, Optional[date]]]:
+        """(contrato, data da rescisão) dos contratos com rescisão entre inicio e fim (inclusive)"""
+        chave = self.rescisao.__getitem__
+        lo = bisect_left(self.ordem_rescisao, inicio.toordinal(), key=chave)
+        hi = bisect_right(self.ordem_rescisao, fim.toordinal(), lo, key=chave)
+        return [(self.contratos[i], date.fromordinal(self.rescisao[i]) if self.rescisao[i] else None)
+                for i in self.ordem_rescisao[lo:hi]]
+
+    def recalcular_status(self, referencia: date) -> List[str]:
+        """Status de todos os contratos (na ordem de self.contratos) na data de referência, em lote"""
+        dia = referencia.toordinal()
+        vencidos = bisect_left(self.fim, dia, 0, self.preenchidas)
+        n = len(self.contratos)
+        if self.formato == 'prototipo':
+            status = ['manutencao'] * vencidos + ['ocupado'] * (self.preenchidas - vencidos) \
+                + ['disponivel'] * (n - self.preenchidas)
+            for i in self.ordem_rescisao:
+                status[i] = 'vendido'
+            return status
+        status = ['Desativado'] * vencidos + ['Ativo'] * (n - vencidos)
+        efetivadas = bisect_right(self.ordem_rescisao, dia, key=self.rescisao.__getitem__)
+        for j, i in enumerate(self.ordem_rescisao):
+            status[i] = 'Desativado' if j < efetivadas else 'Em Desmobilização'
+        return status
+
+    def mudancas_status(self, referencia: date) -> List[Tuple[str, Optional[str], str]]:
+        """(contrato, status gravado, status na referência) dos contratos cujo status muda"""
+        return [
+            (contrato, antes, depois)
+            for contrato, antes, depois in zip(self.contratos, self.status, self.recalcular_status(referencia))
+            if antes != depois
+        ]
+
@@ -1,7 +1,8 @@
 import { Imovel, Locador } from '../types/index.js';
 
 /**
- * Interface para os dados brutos do SAP (estrutura REISCNBP + REISBU)
+ * Interface para os dados brutos do SAP (estrutura REISCNBP + REISBU), gravada tanto
+ * pelos importadores da planilha quanto pelo gerador de dados mockados
  */
 interface DadosSAPBruto {
   imoveis: Array<{
@@ -47,6 +48,9 @@ interface DadosSAPBruto {
       grupoAutorizacoes: number;
     };
     locadorId: string;
+    // Já derivados pelos scripts Python; ausentes em arquivos gerados antes disso
+    tipo?: Imovel['tipo'];
+    status?: Imovel['status'];
   }>;
   locadores: Array<{
     id: string;
@@ -82,6 +86,88 @@ interface DadosSAPBruto {
   };
 }
 
+/**
+ * Posições em bytes dos registros de uma seção do dados-sap.json
+ */
+interface SecaoIndiceSAP {
+  ids: string[];
+  inicio: number[];
+  fim: number[];
+}
+
+/**
+ * Índice auxiliar (dados-sap.indice.json) gravado pelos scripts Python ao lado do JSON.
+ * Os mapas apontam para posições nos arrays de ids, não para os ids.
+ */
+interface IndiceSAPBruto {
+  versao: number;
+  arquivo: string;
+  tamanhoArquivo: number;
+  metadados: DadosSAPBruto['metadados'] | null;
+  imoveis: SecaoIndiceSAP;
+  locadores: SecaoIndiceSAP;
+  porLocador: Record<string, number[]>;
+  porEstado: Record<string, number[]>;
+  porCidade: Record<string, number[]>;
+  porStatus: Record<string, number[]>;
+  porContrato: Record<string, number>;
+}
+
+/**
+ * Índice pronto para consultas, com os ids já resolvidos para posições
+ */
+export interface IndiceSAP {
+  bruto: IndiceSAPBruto;
+  posicaoImovel: Map<string, number>;
+  posicaoLocador: Map<string, number>;
+}
+
+/**
+ * Filtros resolvidos pelo índice, sem percorrer os imóveis
+ */
+export interface FiltrosIndiceSAP {
+  estado?: string;
+  cidade?: string;
+  status?: string;
+  locadorId?: string;
+}
+
+/**
+ * Página listada no manifesto (dados-sap.manifesto.json)
+ */
+interface PaginaManifestoSAP {
+  url: string;
+  total: number;
+  primeiroId: string | null;
+  ultimoId: string | null;
+  estado?: string;
+  paginasLocadores?: number[];
+}
+
+/**
+ * Manifesto da saída paginada gravada pelos scripts Python com --paginar
+ */
+export interface ManifestoSAP {
+  versao: number;
+  agrupamento: 'registros' | 'estado';
+  tamanhoPagina: number;
+  totalImoveis: number;
+  totalLocadores: number;
+  metadados: DadosSAPBruto['metadados'] | null;
+  paginasImoveis: PaginaManifestoSAP[];
+  paginasLocadores: PaginaManifestoSAP[];
+}
+
+/**
+ * Uma página de imóveis já mapeada, com os locadores que ela referencia
+ */
+export interface PaginaSAP {
+  numero: number;
+  estado?: string;
+  imoveis: Imovel[];
+  locadores: Locador[];
+}
+
 /**
  * Interface para os dados processados
  */
@@ -102,6 +188,14 @@ interface DadosSAP {
 export class SAPDataLoader {
   // Em desenvolvimento, Vite serve arquivos de public/ com o base path
   private static readonly DATA_PATH = '/silic-input-doc/dados-sap.json';
+  private static readonly INDEX_PATH = '/silic-input-doc/dados-sap.indice.json';
+  private static readonly MANIFEST_PATH = '/silic-input-doc/dados-sap.manifesto.json';
+  // As URLs do manifesto são relativas ao diretório dele
+  private static readonly BASE_PATH = '/silic-input-doc/';
+  // Páginas de locadores já pedidas, compartilhadas entre as páginas de imóveis
+  private static paginasLocadores = new Map<string, Promise<Locador[]>>();
+  // Registros separados por até 64 KB são buscados na mesma requisição Range
+  private static readonly DISTANCIA_AGRUPAMENTO = 64 * 1024;
   
   /**
    * Obtém o caminho correto baseado no ambiente
@@ -128,13 +222,10 @@ export class SAPDataLoader {
   }
 
   /**
-   * Mapeia dados brutos do SAP para estrutura da aplicação
+   * Mapeia um locador bruto do SAP para a estrutura da aplicação
    */
-  private static mapearDadosSAP(dadosBrutos: DadosSAPBruto): DadosSAP {
-    console.log('🔄 Mapeando dados do SAP para estrutura da aplicação...');
-
-    // Mapear locadores
-    const locadores: Locador[] = dadosBrutos.locadores.map(loc => ({
+  private static mapearLocador(loc: DadosSAPBruto['locadores'][number]): Locador {
+    return {
       id: loc.id,
       nome: loc.nome,
       tipo: loc.tipo,
@@ -143,7 +234,7 @@ export class SAPDataLoader {
       telefone: loc.telefone || undefined,
       endereco: {
         logradouro: loc.endereco.rua,
-        numero: loc.endereco.numero.toString(),
+        numero: loc.endereco.numero != null ? String(loc.endereco.numero) : '',
         bairro: loc.endereco.bairro,
         cidade: loc.endereco.cidade,
         estado: loc.endereco.regiao,
@@ -151,59 +242,81 @@ export class SAPDataLoader {
       },
       status: loc.status as 'ativo' | 'inativo',
       dataRegistro: new Date().toISOString()
-    }));
+    };
+  }
 
-    // Mapear imóveis
-    const imoveis: Imovel[] = dadosBrutos.imoveis.map(im => {
-      // Extrair cidade e estado
-      const cidade = im.edificio.local;
-      const estado = im.edificio.regiao;
-      
-      // Determinar tipo baseado no tipo de edifício
-      let tipo: 'residencial' | 'comercial' | 'terreno' | 'industrial' = 'comercial';
-      const tipoEdificio = im.edificio.tipoEdificio.nome.toLowerCase();
-      if (tipoEdificio.includes('terreno')) tipo = 'terreno';
-      else if (tipoEdificio.includes('galpão')) tipo = 'industrial';
-      else if (tipoEdificio.includes('casa')) tipo = 'residencial';
-      
-      // Mapear status
-      let status: 'ativo' | 'prospeccao' | 'mobilizacao' | 'desmobilizacao' = 'ativo';
-      const statusEdificio = im.edificio.status.toLowerCase();
-      if (statusEdificio.includes('prospecção')) status = 'prospeccao';
-      else if (statusEdificio.includes('mobilização') && !statusEdificio.includes('des')) status = 'mobilizacao';
-      else if (statusEdificio.includes('desmobilização')) status = 'desmobilizacao';
-      else if (statusEdificio.includes('ativo')) status = 'ativo';
-      
-      return {
-        id: im.id,
-        codigo: im.contrato.numero.toString(),
-        denominacao: im.contrato.denominacao,
+  /**
+   * Tipo do imóvel pelo tipo de edifício. Só usado em arquivos sem o campo tipo:
+   * os scripts Python (silic_dados/mapeamento.py) já gravam o valor derivado.
+   */
+  private static derivarTipo(tipoEdificio: string | null): Imovel['tipo'] {
+    const nome = (tipoEdificio || '').toLowerCase();
+    if (nome.includes('terreno')) return 'terreno';
+    if (nome.includes('galpão')) return 'industrial';
+    if (nome.includes('casa')) return 'residencial';
+    return 'comercial';
+  }
+
+  /**
+   * Status do imóvel pelo status do edifício. Só usado em arquivos sem o campo status.
+   */
+  private static derivarStatus(statusEdificio: string | null): Imovel['status'] {
+    const status = (statusEdificio || '').toLowerCase();
+    if (status.includes('prospecção')) return 'prospeccao';
+    if (status.includes('mobilização') && !status.includes('des')) return 'mobilizacao';
+    if (status.includes('desmobilização')) return 'desmobilizacao';
+    return 'ativo';
+  }
+
+  /**
+   * Mapeia um imóvel bruto do SAP para a estrutura da aplicação
+   */
+  private static mapearImovel(im: DadosSAPBruto['imoveis'][number]): Imovel {
+    // Extrair cidade e estado
+    const cidade = im.edificio.local;
+    const estado = im.edificio.regiao;
+    const tipo = im.tipo ?? this.derivarTipo(im.edificio.tipoEdificio.nome);
+    const status = im.status ?? this.derivarStatus(im.edificio.status);
+    
+    return {
+      id: im.id,
+      codigo: im.contrato.numero.toString(),
+      denominacao: im.contrato.denominacao,
+      tipoContrato: im.contrato.tipoContrato,
+      utilizacaoPrincipal: im.edificio.utilizacaoPrincipal,
+      fimValidade: im.contrato.fimValidade,
+      endereco: im.edificio.rua,
+      bairro: im.edificio.bairro,
+      cidade: cidade,
+      estado: estado,
+      cep: im.edificio.cep,
+      tipo: tipo,
+      status: status,
+      descricao: im.contrato.denominacao,
+      caracteristicas: {
         tipoContrato: im.contrato.tipoContrato,
         utilizacaoPrincipal: im.edificio.utilizacaoPrincipal,
+        inicioContrato: im.contrato.inicioContrato,
         fimValidade: im.contrato.fimValidade,
-        endereco: im.edificio.rua,
-        bairro: im.edificio.bairro,
-        cidade: cidade,
-        estado: estado,
-        cep: im.edificio.cep,
-        tipo: tipo,
-        status: status,
-        descricao: im.contrato.denominacao,
-        caracteristicas: {
-          tipoContrato: im.contrato.tipoContrato,
-          utilizacaoPrincipal: im.edificio.utilizacaoPrincipal,
-          inicioContrato: im.contrato.inicioContrato,
-          fimValidade: im.contrato.fimValidade,
-          inscricaoIPTU: im.edificio.inscricaoIPTU,
-          numeroITR: im.edificio.numeroITR,
-          tipoEdificio: im.edificio.tipoEdificio.nome,
-          funcao: im.edificio.funcao.nome,
-          estadoConservacao: im.edificio.estadoConservacao
-        },
-        locadorId: im.locadorId,
-        dataRegistro: new Date().toISOString()
-      };
-    });
+        inscricaoIPTU: im.edificio.inscricaoIPTU,
+        numeroITR: im.edificio.numeroITR,
+        tipoEdificio: im.edificio.tipoEdificio.nome,
+        funcao: im.edificio.funcao.nome,
+        estadoConservacao: im.edificio.estadoConservacao
+      },
+      locadorId: im.locadorId,
+      dataRegistro: new Date().toISOString()
+    };
+  }
+
+  /**
+   * Mapeia dados brutos do SAP para estrutura da aplicação
+   */
+  private static mapearDadosSAP(dadosBrutos: DadosSAPBruto): DadosSAP {
+    console.log('🔄 Mapeando dados do SAP para estrutura da aplicação...');
+
+    const locadores: Locador[] = dadosBrutos.locadores.map(loc => this.mapearLocador(loc));
+    const imoveis: Imovel[] = dadosBrutos.imoveis.map(im => this.mapearImovel(im));
 
     console.log(`✅ Mapeamento concluído: ${imoveis.length} imóveis, ${locadores.length} locadores`);
 
@@ -256,6 +369,204 @@ export class SAPDataLoader {
     }
   }
 
+  /**
+   * Carrega o índice auxiliar (dados-sap.indice.json), se os scripts o tiverem gerado
+   */
+  static async carregarIndice(): Promise<IndiceSAP | null> {
+    try {
+      const response = await fetch(this.INDEX_PATH);
+      if (!response.ok) return null;
+
+      const bruto: IndiceSAPBruto = await response.json();
+      const posicoes = (ids: string[]) => new Map(ids.map((id, posicao) => [id, posicao] as [string, number]));
+      console.log(`🗂️ Índice SAP carregado: ${bruto.imoveis.ids.length} imóveis, ${bruto.locadores.ids.length} locadores`);
+      return {
+        bruto,
+        posicaoImovel: posicoes(bruto.imoveis.ids),
+        posicaoLocador: posicoes(bruto.locadores.ids)
+      };
+    } catch (error) {
+      console.warn('⚠️ Não foi possível carregar o índice SAP:', error);
+      return null;
+    }
+  }
+
+  /**
+   * Posições dos imóveis que atendem a todos os filtros (interseção dos mapas do índice)
+   */
+  static filtrarImoveis(indice: IndiceSAP, filtros: FiltrosIndiceSAP): number[] {
+    const { bruto } = indice;
+    const listas: number[][] = [];
+    if (filtros.estado !== undefined) listas.push(bruto.porEstado[filtros.estado] || []);
+    if (filtros.cidade !== undefined) listas.push(bruto.porCidade[filtros.cidade] || []);
+    if (filtros.status !== undefined) listas.push(bruto.porStatus[filtros.status] || []);
+    if (filtros.locadorId !== undefined) listas.push(bruto.porLocador[filtros.locadorId] || []);
+    if (listas.length === 0) return bruto.imoveis.ids.map((_, posicao) => posicao);
+
+    // Começa pela menor lista; as listas já vêm em ordem crescente de posição
+    listas.sort((a, b) => a.length - b.length);
+    const demais = listas.slice(1).map(lista => new Set(lista));
+    return listas[0].filter(posicao => demais.every(conjunto => conjunto.has(posicao)));
+  }
+
+  /**
+   * Id do imóvel de um número de contrato, sem percorrer os imóveis
+   */
+  static imovelPorContrato(indice: IndiceSAP, numeroContrato: string | number): string | null {
+    const posicao = indice.bruto.porContrato[String(numeroContrato)];
+    return posicao === undefined ? null : indice.bruto.imoveis.ids[posicao];
+  }
+
+  /**
+   * Ids dos imóveis de um locador
+   */
+  static imoveisDoLocador(indice: IndiceSAP, locadorId: string): string[] {
+    return (indice.bruto.porLocador[locadorId] || []).map(posicao => indice.bruto.imoveis.ids[posicao]);
+  }
+
+  /**
+   * Lê só os registros pedidos do dados-sap.json com requisições Range, agrupando
+   * registros próximos. Se o servidor ignorar o Range, usa o arquivo inteiro devolvido.
+   */
+  private static async lerRegistros<T>(indice: IndiceSAP, secao: 'imoveis' | 'locadores', posicoes: number[]): Promise<T[]> {
+    const { inicio, fim } = indice.bruto[secao];
+    const ordenadas = [...new Set(posicoes)].sort((a, b) => a - b);
+    const grupos: number[][] = [];
+    for (const posicao of ordenadas) {
+      const grupo = grupos[grupos.length - 1];
+      if (grupo && inicio[posicao] - fim[grupo[grupo.length - 1]] <= this.DISTANCIA_AGRUPAMENTO) {
+        grupo.push(posicao);
+      } else {
+        grupos.push([posicao]);
+      }
+    }
+
+    const decoder = new TextDecoder();
+    const registros = new Map<number, T>();
+    let arquivoInteiro: Uint8Array | null = null;
+    for (const grupo of grupos) {
+      let bytes = arquivoInteiro;
+      let base = 0;
+      if (!bytes) {
+        const de = inicio[grupo[0]];
+        const ate = fim[grupo[grupo.length - 1]];
+        const response = await fetch(this.DATA_PATH, { headers: { Range: `bytes=${de}-${ate - 1}` } });
+        if (!response.ok) throw new Error(`Falha ao ler dados SAP: ${response.status} ${response.statusText}`);
+        bytes = new Uint8Array(await response.arrayBuffer());
+        if (response.status === 206) {
+          const total = Number((response.headers.get('Content-Range') || '').split('/')[1]);
+          if (total && total !== indice.bruto.tamanhoArquivo) {
+            throw new Error('Índice SAP desatualizado em relação ao dados-sap.json');
+          }
+          base = de;
+        } else {
+          arquivoInteiro = bytes;
+        }
+      }
+      for (const posicao of grupo) {
+        const trecho = bytes.subarray(inicio[posicao] - base, fim[posicao] - base);
+        registros.set(posicao, JSON.parse(decoder.decode(trecho)) as T);
+      }
+    }
+    return posicoes.map(posicao => registros.get(posicao) as T);
+  }
+
+  /**
+   * Carrega e mapeia só os imóveis das posições informadas (ex.: resultado de filtrarImoveis)
+   */
+  static async carregarImoveis(indice: IndiceSAP, posicoes: number[]): Promise<Imovel[]> {
+    const brutos = await this.lerRegistros<DadosSAPBruto['imoveis'][number]>(indice, 'imoveis', posicoes);
+    return brutos.map(im => this.mapearImovel(im));
+  }
+
+  /**
+   * Carrega um locador pelo id, sem baixar o arquivo inteiro
+   */
+  static async carregarLocador(indice: IndiceSAP, locadorId: string): Promise<Locador | null> {
+    const posicao = indice.posicaoLocador.get(locadorId);
+    if (posicao === undefined) return null;
+    const [bruto] = await this.lerRegistros<DadosSAPBruto['locadores'][number]>(indice, 'locadores', [posicao]);
+    return this.mapearLocador(bruto);
+  }
+
+  /**
+   * Mapa locadorId → locador, para junções sem busca linear em dados já carregados
+   */
+  static indexarLocadores(dados: DadosSAP): Map<string, Locador> {
+    return new Map(dados.locadores.map(locador => [locador.id, locador] as [string, Locador]));
+  }
+
+  /**
+   * Carrega o manifesto da saída paginada, se os scripts o tiverem gerado
+   */
+  static async carregarManifesto(): Promise<ManifestoSAP | null> {
+    try {
+      const response = await fetch(this.MANIFEST_PATH);
+      if (!response.ok) return null;
+
+      const manifesto: ManifestoSAP = await response.json();
+      console.log(`📑 Manifesto SAP: ${manifesto.paginasImoveis.length} páginas de imóveis (${manifesto.totalImoveis} no total)`);
+      return manifesto;
+    } catch (error) {
+      console.warn('⚠️ Não foi possível carregar o manifesto SAP:', error);
+      return null;
+    }
+  }
+
+  /**
+   * Carrega uma página de locadores, reaproveitando a requisição se já foi pedida
+   */
+  private static carregarPaginaLocadores(pagina: PaginaManifestoSAP): Promise<Locador[]> {
+    let promessa = this.paginasLocadores.get(pagina.url);
+    if (!promessa) {
+      promessa = fetch(this.BASE_PATH + pagina.url)
+        .then(response => {
+          if (!response.ok) throw new Error(`Falha ao carregar ${pagina.url}: ${response.status}`);
+          return response.json() as Promise<{ locadores: DadosSAPBruto['locadores'] }>;
+        })
+        .then(dados => dados.locadores.map(loc => this.mapearLocador(loc)));
+      // Em caso de erro, permite tentar de novo na próxima página
+      promessa.catch(() => this.paginasLocadores.delete(pagina.url));
+      this.paginasLocadores.set(pagina.url, promessa);
+    }
+    return promessa;
+  }
+
+  /**
+   * Carrega a página de imóveis de número informado (0-based) e só os locadores que ela referencia
+   */
+  static async carregarPagina(manifesto: ManifestoSAP, numero: number): Promise<PaginaSAP> {
+    const pagina = manifesto.paginasImoveis[numero];
+    if (!pagina) throw new Error(`Página ${numero} inexistente no manifesto SAP`);
+
+    const [dados, locadores] = await Promise.all([
+      fetch(this.BASE_PATH + pagina.url).then(response => {
+        if (!response.ok) throw new Error(`Falha ao carregar ${pagina.url}: ${response.status}`);
+        return response.json() as Promise<{ imoveis: DadosSAPBruto['imoveis'] }>;
+      }),
+      Promise.all((pagina.paginasLocadores || []).map(n => this.carregarPaginaLocadores(manifesto.paginasLocadores[n - 1])))
+    ]);
+
+    const referenciados = new Set(dados.imoveis.map(im => im.locadorId));
+    return {
+      numero,
+      estado: pagina.estado,
+      imoveis: dados.imoveis.map(im => this.mapearImovel(im)),
+      locadores: locadores.flat().filter(locador => referenciados.has(locador.id))
+    };
+  }
+
+  /**
+   * Percorre as páginas em ordem (opcionalmente só as de um estado), buscando cada uma
+   * só quando a anterior foi consumida: a primeira renderização espera uma página só
+   */
+  static async *carregarPaginas(manifesto: ManifestoSAP, estado?: string): AsyncGenerator<PaginaSAP> {
+    for (let numero = 0; numero < manifesto.paginasImoveis.length; numero++) {
+      if (estado !== undefined && manifesto.paginasImoveis[numero].estado !== estado) continue;
+      yield await this.carregarPagina(manifesto, numero);
+    }
+  }
+
   /**
    * Verifica se existem dados do SAP disponíveis
    */